@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 
 application = get_asgi_application()
+
+# /metrics: faqat server process lari METRICS_DIR ga yozadi
+from backend.metrics import mark_server_process  # noqa: E402
+
+mark_server_process()
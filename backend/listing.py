@@ -0,0 +1,70 @@
+"""
+Ro'yxat endpointlari uchun umumiy pagination va filtrlar.
+
+CursorPagination indekslangan kalit (id) bo'yicha keyingi sahifani
+`WHERE id < ...` bilan oladi: OFFSET ham, COUNT(*) ham yo'q, shuning uchun
+javob vaqti jadval kattalashgani sari o'zgarmaydi.
+"""
+from datetime import datetime, time
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination
+
+
+class IdCursorPagination(CursorPagination):
+    ordering = "-id"
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
+
+
+class ListFilterMixin:
+    """
+    ?date_from=YYYY-MM-DD&date_to=YYYY-MM-DD (ikkalasi ham inklyuziv) va ?user=<id>.
+    date_filter_field / user_filter_field — qaysi maydon bo'yicha filtrlash.
+    """
+    date_filter_field = None
+    user_filter_field = None
+
+    def _date_param(self, name):
+        value = self.request.query_params.get(name)
+        if not value:
+            return None
+        try:
+            day = parse_date(value)
+        except ValueError:  # to'g'ri formatdagi mavjud bo'lmagan sana (2025-02-30)
+            day = None
+        if day is None:
+            raise ValidationError({name: "Sana YYYY-MM-DD formatida bo'lishi kerak."})
+        return day
+
+    def _bound(self, model, day, end):
+        """DateField uchun sananing o'zi, DateTimeField uchun kun boshi/oxiri (aware)"""
+        for name in self.date_filter_field.split("__"):
+            field = model._meta.get_field(name)
+            model = field.related_model or model
+        if field.get_internal_type() == "DateField":
+            return day
+        return timezone.make_aware(datetime.combine(day, time.max if end else time.min))
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if getattr(self, "action", "list") != "list":
+            return queryset  # detail/update/destroy filtrlarga bog'liq emas
+        params = self.request.query_params
+        if self.date_filter_field:
+            date_from, date_to = self._date_param("date_from"), self._date_param("date_to")
+            if date_from:
+                bound = self._bound(queryset.model, date_from, end=False)
+                queryset = queryset.filter(**{f"{self.date_filter_field}__gte": bound})
+            if date_to:
+                bound = self._bound(queryset.model, date_to, end=True)
+                queryset = queryset.filter(**{f"{self.date_filter_field}__lte": bound})
+        if self.user_filter_field and params.get("user"):
+            user = params["user"]
+            if not user.isdigit():
+                raise ValidationError({"user": "Butun son bo'lishi kerak."})
+            queryset = queryset.filter(**{self.user_filter_field: user})
+        return queryset
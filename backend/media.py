@@ -0,0 +1,173 @@
+"""
+Media fayllarni (listening audio, rasmlar) berish.
+
+django.conf.urls.static.static() dan farqli ravishda:
+- HTTP Range (audio pleyerda seek qilish butun faylni qayta yuklamaydi), If-Range;
+- ETag / Last-Modified bo'yicha 304 javoblar va uzoq Cache-Control;
+- MEDIA_SENDFILE_MODE = "x-accel-redirect" (nginx) yoki "x-sendfile" (apache)
+  bo'lsa, baytlarni proxy o'zi yuboradi va Python worker darhol bo'shaydi.
+"""
+import mimetypes
+import os
+import posixpath
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from django.views.decorators.http import require_safe
+
+from .storage import is_content_addressed
+
+
+CHUNK_SIZE = 64 * 1024
+# Kontent xeshi bo'yicha nomlangan fayllar hech qachon o'zgarmaydi
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def _cache_seconds():
+    return getattr(settings, "MEDIA_CACHE_MAX_AGE", 60 * 60 * 24 * 30)
+
+
+def file_etag(stat):
+    return quote_etag(f"{stat.st_mtime_ns:x}-{stat.st_size:x}")
+
+
+def parse_range(header, size):
+    """
+    "bytes=a-b" -> (start, end) (end inklyuziv). Faqat bitta diapazon qo'llanadi;
+    bir nechta diapazon yoki noto'g'ri sarlavha bo'lsa None (butun fayl beriladi).
+    Qondirib bo'lmaydigan diapazon uchun ValueError.
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # "bytes=-500" — oxirgi 500 bayt
+        length = int(last)
+        if length == 0:
+            raise ValueError(header)
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError(header)
+    return start, end
+
+
+def _if_range_matches(request, etag, last_modified):
+    value = request.META.get("HTTP_IF_RANGE")
+    if value is None:
+        return True
+    if value.startswith('"') or value.startswith("W/"):
+        return value == etag  # If-Range faqat kuchli ETag bilan solishtiriladi
+    date = parse_http_date_safe(value)
+    return date is not None and int(last_modified) <= date
+
+
+def _iter_range(path, start, length):
+    with open(path, "rb") as fileobj:
+        fileobj.seek(start)
+        while length > 0:
+            chunk = fileobj.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def _sendfile_response(path, content_type):
+    mode = getattr(settings, "MEDIA_SENDFILE_MODE", None)
+    if not mode:
+        return None
+    response = HttpResponse(content_type=content_type)
+    if mode == "x-accel-redirect":
+        relative = os.path.relpath(path, settings.MEDIA_ROOT).replace(os.sep, "/")
+        prefix = getattr(settings, "MEDIA_ACCEL_PREFIX", "/protected-media/")
+        response["X-Accel-Redirect"] = quote(posixpath.join(prefix, relative))
+    elif mode == "x-sendfile":
+        response["X-Sendfile"] = path
+    else:
+        raise ValueError(f"Noma'lum MEDIA_SENDFILE_MODE: {mode!r}")
+    return response
+
+
+def serve_file(request, path, content_type=None, cache_control=None, filename=None):
+    """
+    Diskdagi faylni Range, shartli so'rovlar va kesh sarlavhalari bilan beradi.
+    Boshqa view lar ham (masalan yuklab olinadigan arxivlar) shu funksiyadan foydalanadi.
+    """
+    try:
+        stat = os.stat(path)
+    except (FileNotFoundError, NotADirectoryError):
+        raise Http404("Fayl topilmadi")
+    if not os.path.isfile(path):
+        raise Http404("Fayl topilmadi")
+
+    etag = file_etag(stat)
+    last_modified = stat.st_mtime
+    content_type = content_type or mimetypes.guess_type(path)[0] or "application/octet-stream"
+    cache_control = cache_control or f"public, max-age={_cache_seconds()}"
+
+    response = get_conditional_response(request, etag=etag, last_modified=int(last_modified))
+    if response is None:
+        response = _sendfile_response(path, content_type)
+    if response is None:
+        response = _local_response(request, path, stat.st_size, content_type, etag, last_modified)
+
+    if response.status_code in (200, 206, 304):
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified)
+        response["Cache-Control"] = cache_control
+    if filename:
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+def _local_response(request, path, size, content_type, etag, last_modified):
+    header = request.META.get("HTTP_RANGE")
+    byte_range = None
+    if header and _if_range_matches(request, etag, last_modified):
+        try:
+            byte_range = parse_range(header, size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+
+    if byte_range is None:
+        # Butun fayl: FileResponse wsgi.file_wrapper (sendfile) dan foydalana oladi
+        response = FileResponse(open(path, "rb"), content_type=content_type)
+        response["Content-Length"] = size
+    else:
+        start, end = byte_range
+        length = end - start + 1
+        response = StreamingHttpResponse(_iter_range(path, start, length), status=206, content_type=content_type)
+        response["Content-Length"] = length
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    response["Accept-Ranges"] = "bytes"
+    return response
+
+
+@require_safe
+def serve_media(request, path):
+    """MEDIA_URL ostidagi fayllar uchun view"""
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:  # MEDIA_ROOT dan tashqariga chiqish ("../")
+        raise Http404("Fayl topilmadi")
+    # Tekshiruvlar normallashtirilgan yo'l bo'yicha: "./offline/..", "cas/../offline/.."
+    name = os.path.relpath(full_path, os.path.abspath(settings.MEDIA_ROOT)).replace(os.sep, "/")
+    offline_dir = getattr(settings, "OFFLINE_PACKAGE_DIR", "offline").strip("/")
+    if name == offline_dir or name.startswith(f"{offline_dir}/"):
+        raise Http404("Fayl topilmadi")  # oflayn arxivlar faqat ruxsat bilan (testapp/offline.py)
+    cache_control = IMMUTABLE_CACHE_CONTROL if is_content_addressed(name) else None
+    return serve_file(request, full_path, cache_control=cache_control)
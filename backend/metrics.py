@@ -0,0 +1,357 @@
+"""
+So'rovlar bo'yicha ishlash ko'rsatkichlari va Prometheus /metrics endpointi.
+
+MetricsMiddleware testapp va users view lari uchun (URL nomi bo'yicha)
+quyidagilarni histogrammalarga yozadi: umumiy javob vaqti, DB so'rovlar soni
+va vaqti, serializatsiya vaqti, javob hajmi. Issiq yo'lda faqat bir nechta
+perf_counter va bisect bor; qulf faqat natijani yozishda olinadi.
+
+Gunicorn har bir worker ni alohida process da ishga tushiradi, shuning uchun
+har bir process o'z hisoblagichlarini METRICS_DIR/metrics-<pid>.json ga
+vaqti-vaqti bilan yozadi, /metrics esa barcha fayllarni qo'shib beradi.
+Fayllarni faqat server process lari (wsgi.py / asgi.py) yozadi — test Client
+orqali so'rov yuboradigan management buyruqlari /metrics ga aralashmaydi.
+To'xtagan process larning raqamlari /metrics da METRICS_DIR/metrics-archive.json
+ga qo'shilib, keyin ularning fayli o'chiriladi — worker qayta ishga tushganda
+counter lar kamaymaydi (prometheus_client multiprocess rejimidagi kabi).
+"""
+import contextvars
+import fcntl
+import glob
+import hmac
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from bisect import bisect_left
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse, HttpResponseForbidden
+from django.views.decorators.http import require_safe
+
+
+TIME_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (1024, 10240, 51200, 102400, 512000, 1048576, 5242880)
+
+# nom -> (yordam matni, bucketlar)
+HISTOGRAMS = {
+    "http_request_duration_seconds": ("Javob vaqti (middleware ichida)", TIME_BUCKETS),
+    "db_queries_per_request": ("Bitta so'rovdagi DB so'rovlar soni", QUERY_BUCKETS),
+    "db_query_duration_seconds": ("Bitta so'rovdagi DB so'rovlarining umumiy vaqti", TIME_BUCKETS),
+    "serializer_duration_seconds": ("Bitta so'rovdagi serializatsiya vaqti", TIME_BUCKETS),
+    "http_response_size_bytes": ("Javob tanasi hajmi", SIZE_BUCKETS),
+}
+REQUESTS_TOTAL = "http_requests_total"
+FILE_RE = re.compile(r"metrics-(\d+)\.json$")
+ARCHIVE_NAME = "metrics-archive.json"
+LOCK_NAME = "metrics.lock"
+
+_current = contextvars.ContextVar("request_metrics", default=None)
+
+
+class RequestStats:
+    __slots__ = ("queries", "db_time", "serializer_time", "serializer_depth")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.serializer_depth = 0
+
+
+# ============ PROCESS REESTRI ===============
+class Registry:
+    """Shu process ning histogramma va counter lari"""
+
+    def __init__(self):
+        self.lock = threading.RLock()  # flush() ichida snapshot() ham oladi
+        self.writes_files = False  # mark_server_process()
+        self.reset()
+
+    def reset(self):
+        self.pid = os.getpid()
+        # {nom: {view: [bucketlar..., +Inf, sum, count]}}
+        self.histograms = {name: {} for name in HISTOGRAMS}
+        self.counters = {}  # {(view, method, status): soni}
+        self.last_flush = time.monotonic()
+
+    def observe(self, view, method, status, values):
+        with self.lock:
+            if self.pid != os.getpid():
+                self.reset()  # fork dan keyin ota process raqamlarini meros qilmaymiz
+            for name, value in values.items():
+                buckets = HISTOGRAMS[name][1]
+                series = self.histograms[name].get(view)
+                if series is None:
+                    series = self.histograms[name][view] = [0] * (len(buckets) + 3)
+                series[bisect_left(buckets, value)] += 1  # kumulyativ emas; eksportda yig'iladi
+                series[-2] += value
+                series[-1] += 1
+            key = (view, method, status)
+            self.counters[key] = self.counters.get(key, 0) + 1
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "histograms": {name: {view: list(series) for view, series in data.items()}
+                               for name, data in self.histograms.items()},
+                "counters": [[list(key), value] for key, value in self.counters.items()],
+            }
+
+    def flush(self, force=False):
+        """METRICS_DIR/metrics-<pid>.json ga yozadi (METRICS_FLUSH_INTERVAL da bir marta)"""
+        directory = getattr(settings, "METRICS_DIR", None)
+        if not directory or not self.writes_files:
+            return
+        # Bir nechta thread bir vaqtda flush qilsa, birining .tmp fayli
+        # boshqasining os.replace() i bilan yo'qolib qolmasin
+        with self.lock:
+            now = time.monotonic()
+            if not force and now - self.last_flush < settings.METRICS_FLUSH_INTERVAL:
+                return
+            self.last_flush = now
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, f"metrics-{os.getpid()}.json")
+            temporary = f"{path}.{uuid.uuid4().hex}.tmp"
+            with open(temporary, "w") as fileobj:
+                json.dump(self.snapshot(), fileobj)
+            os.replace(temporary, path)
+
+
+registry = Registry()
+
+
+def mark_server_process():
+    """wsgi.py / asgi.py chaqiradi: shu process raqamlari METRICS_DIR ga yoziladi"""
+    registry.writes_files = True
+
+
+# ============ DB VA SERIALIZER ===============
+def _query_wrapper(execute, sql, params, many, context):
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.db_time += time.perf_counter() - start
+
+
+def install_query_wrapper(sender, connection, **kwargs):
+    # contextvar sync_to_async thread lariga ham o'tadi — async view lar ham hisoblanadi
+    if _query_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_query_wrapper)
+
+
+connection_created.connect(install_query_wrapper, dispatch_uid="metrics-query-wrapper")
+for _connection in connections.all(initialized_only=True):  # modul import qilinishidan oldin ochilganlar
+    install_query_wrapper(None, _connection)
+
+
+class TimedSerializerMixin:
+    """Eng tashqi to_representation vaqtini joriy so'rovga qo'shadi (nested lar ichida)"""
+
+    def to_representation(self, instance):
+        stats = _current.get()
+        if stats is None or stats.serializer_depth:
+            return super().to_representation(instance)
+        stats.serializer_depth += 1
+        start = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            stats.serializer_time += time.perf_counter() - start
+            stats.serializer_depth -= 1
+
+
+# ============ MIDDLEWARE ===============
+class MetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.apps = tuple(getattr(settings, "METRICS_APPS", ("testapp", "users")))
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.record(request, response, stats, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.record(request, response, stats, time.perf_counter() - start)
+        return response
+
+    def view_name(self, request):
+        match = getattr(request, "resolver_match", None)
+        if match is None or not match.url_name:
+            return None
+        if match.func.__module__.split(".", 1)[0] not in self.apps:
+            return None
+        return match.url_name
+
+    def record(self, request, response, stats, elapsed):
+        view = self.view_name(request)
+        if view is None:
+            return
+        if response.has_header("Content-Length"):
+            size = int(response["Content-Length"])
+        elif not response.streaming:
+            size = len(response.content)
+        else:
+            size = 0
+        registry.observe(view, request.method, response.status_code, {
+            "http_request_duration_seconds": elapsed,
+            "db_queries_per_request": stats.queries,
+            "db_query_duration_seconds": stats.db_time,
+            "serializer_duration_seconds": stats.serializer_time,
+            "http_response_size_bytes": size,
+        })
+        registry.flush()
+
+
+# ============ /metrics ===============
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # boshqa foydalanuvchining process i
+    return True
+
+
+def _merge(snapshots):
+    """Snapshot lar yig'indisi: (histograms, counters)"""
+    histograms = {name: {} for name in HISTOGRAMS}
+    counters = {}
+    for snapshot in snapshots:
+        for name, data in snapshot["histograms"].items():
+            if name not in histograms:
+                continue
+            size = len(HISTOGRAMS[name][1]) + 3
+            for view, series in data.items():
+                if len(series) != size:
+                    continue  # bucketlar o'zgargan (eski deploy fayli)
+                total = histograms[name].setdefault(view, [0] * size)
+                for index, value in enumerate(series):
+                    total[index] += value
+        for key, value in snapshot["counters"]:
+            counters[tuple(key)] = counters.get(tuple(key), 0) + value
+    return histograms, counters
+
+
+def _load(path):
+    try:
+        with open(path) as fileobj:
+            return json.load(fileobj)
+    except (OSError, ValueError):
+        return None  # yo'q yoki buzilgan fayl
+
+
+def _archive_dead(directory):
+    """
+    To'xtagan process lar fayllarini arxivga qo'shib o'chiradi.
+    Eksklyuziv qulf ostida: o'quvchilar arxiv va eski faylni birga ko'rmaydi.
+    """
+    dead = [
+        path for path in glob.glob(os.path.join(directory, "metrics-*.json"))
+        if (match := FILE_RE.search(path)) and not _process_alive(int(match.group(1)))
+    ]
+    if not dead:
+        return
+    archive = os.path.join(directory, ARCHIVE_NAME)
+    snapshots = [snapshot for snapshot in map(_load, [archive] + dead) if snapshot is not None]
+    histograms, counters = _merge(snapshots)
+    temporary = f"{archive}.{uuid.uuid4().hex}.tmp"
+    with open(temporary, "w") as fileobj:
+        json.dump({"histograms": histograms, "counters": [[list(key), value] for key, value in counters.items()]},
+                  fileobj)
+    os.replace(temporary, archive)
+    for path in dead:
+        os.remove(path)
+
+
+def collect():
+    """Barcha process lar (METRICS_DIR) yoki faqat shu process ning yig'indisi"""
+    registry.flush(force=True)
+    directory = getattr(settings, "METRICS_DIR", None)
+    if not directory or not registry.writes_files:
+        return _merge([registry.snapshot()])
+
+    with open(os.path.join(directory, LOCK_NAME), "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        _archive_dead(directory)
+        fcntl.flock(lock, fcntl.LOCK_SH)  # arxivlash tugadi, boshqa o'quvchilar ham kirsin
+        snapshots = [
+            snapshot for snapshot in map(_load, glob.glob(os.path.join(directory, "metrics-*.json")))
+            if snapshot is not None
+        ]
+    return _merge(snapshots)
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_prometheus(histograms, counters):
+    lines = [
+        f"# HELP {REQUESTS_TOTAL} So'rovlar soni",
+        f"# TYPE {REQUESTS_TOTAL} counter",
+    ]
+    for (view, method, status), value in sorted(counters.items()):
+        lines.append(
+            f'{REQUESTS_TOTAL}{{view="{_label(view)}",method="{_label(method)}",status="{status}"}} {value}'
+        )
+    for name, (help_text, buckets) in HISTOGRAMS.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} histogram")
+        for view, series in sorted(histograms[name].items()):
+            label = f'view="{_label(view)}"'
+            cumulative = 0
+            for bound, count in zip(buckets, series):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{label},le="{_number(bound)}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{{label},le="+Inf"}} {series[-1]}')
+            lines.append(f"{name}_sum{{{label}}} {_number(series[-2])}")
+            lines.append(f"{name}_count{{{label}}} {series[-1]}")
+    return "\n".join(lines) + "\n"
+
+
+@require_safe
+def metrics_view(request):
+    token = getattr(settings, "METRICS_TOKEN", None)
+    # Token sozlanmagan bo'lsa endpoint yopiq (view nomlari va hajmlar ochiq bo'lmasin)
+    if not token or not hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {token}"):
+        return HttpResponseForbidden()
+    body = render_prometheus(*collect())
+    return HttpResponse(body, content_type="text/plain; version=0.0.4; charset=utf-8")
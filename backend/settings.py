@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 import os
+import tempfile
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -47,6 +48,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",  # Bu har doim ro‘yxat boshida bo‘lishi kerak
+    "backend.metrics.MetricsMiddleware",  # javob vaqti, DB so'rovlar, /metrics
     "django.middleware.common.CommonMiddleware",  # Bu ham undan keyin bo‘lishi mumkin
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -79,6 +81,9 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'backend.wsgi.application'
 
+# ASGI rejimida exam endpointlari async view lar orqali ishlaydi (README ga qarang)
+ASYNC_EXAM_VIEWS = os.environ.get('ASYNC_EXAM_VIEWS') == '1'
+
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
@@ -87,6 +92,33 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # Lock bo'shashini 20 soniyagacha kutish ("database is locked" o'rniga)
+            'timeout': 20,
+            # Yozuvchi tranzaksiya boshidayoq lock oladi — deadlock/retry bo'lmaydi
+            'transaction_mode': 'IMMEDIATE',
+            # WAL: o'quvchilar yozuvchini bloklamaydi; NORMAL — WAL bilan xavfsiz va tezroq
+            'init_command': (
+                'PRAGMA journal_mode=WAL;'
+                'PRAGMA synchronous=NORMAL;'
+                'PRAGMA busy_timeout=20000;'
+            ),
+        },
+    }
+}
+
+
+# Cache
+# Gunicorn workerlari umumiy kontent versiyasini ko'rishi uchun fayl cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('CACHE_DIR', os.path.join(BASE_DIR, '.cache')),
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
     }
 }
 
@@ -126,6 +158,30 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# Media fayllar uchun brauzer keshi (soniya)
+MEDIA_CACHE_MAX_AGE = 60 * 60 * 24 * 30
+# "x-accel-redirect" (nginx) yoki "x-sendfile" (apache): baytlarni proxy yuboradi
+MEDIA_SENDFILE_MODE = os.environ.get('MEDIA_SENDFILE_MODE') or None
+# nginx dagi internal location (README ga qarang)
+MEDIA_ACCEL_PREFIX = '/protected-media/'
+# Oflayn imtihon arxivlari (MEDIA_ROOT ichida, lekin /media/ orqali berilmaydi)
+OFFLINE_PACKAGE_DIR = 'offline'
+
+# /metrics: har bir worker process o'z raqamlarini shu papkaga yozadi (backend/metrics.py)
+METRICS_DIR = os.environ.get('METRICS_DIR') or os.path.join(tempfile.gettempdir(), 'cd-mock-metrics')
+METRICS_FLUSH_INTERVAL = 5  # soniya
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN') or None  # Authorization: Bearer <token>; berilmasa /metrics yopiq
+METRICS_APPS = ('testapp', 'users')
+
+# Yuklangan fayllar sha256 bo'yicha nomlanadi (cas/ab/<hash>.ext), dublikatlar saqlanmaydi
+STORAGES = {
+    'default': {
+        'BACKEND': 'backend.storage.ContentAddressedStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+}
 
 STATIC_URL = '/assets/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'static')
@@ -0,0 +1,19 @@
+"""
+`loadtest --seed` uchun alohida baza va media papkasi.
+
+Seed vaqtinchalik Mock ni aktiv qiladi (boshqalari inactive bo'ladi), shuning
+uchun u faqat shu sozlamalar bilan ishlaydi:
+
+    export DJANGO_SETTINGS_MODULE=backend.settings_loadtest
+    python manage.py migrate
+    python manage.py rebuild_search_index
+    python manage.py loadtest --seed
+"""
+import os
+
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR, DATABASES, MEDIA_ROOT
+
+DATABASES['default'] = dict(DATABASES['default'], NAME=BASE_DIR / 'loadtest.sqlite3')
+MEDIA_ROOT = os.path.join(MEDIA_ROOT, 'loadtest')
+LOADTEST_DATABASE = True
@@ -0,0 +1,59 @@
+"""
+Kontent bo'yicha nomlanadigan (content-addressed) media storage.
+
+Fayl nomi — uning sha256 xeshi: cas/ab/abcdef....png. Bir xil rasm yoki audio
+turli testlarga qayta yuklansa, diskda bitta nusxa qoladi va URL ham bir xil
+bo'ladi. Nom kontentdan kelib chiqqani uchun URL dagi fayl hech qachon
+o'zgarmaydi — media view uni `immutable` va bir yillik kesh bilan beradi.
+"""
+import hashlib
+import os
+import uuid
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+
+
+CAS_PREFIX = "cas/"
+
+
+def is_content_addressed(name):
+    return name.replace("\\", "/").startswith(CAS_PREFIX)
+
+
+def content_hash(content):
+    """django File obyektining sha256 xeshi (bo'laklab o'qiladi)"""
+    digest = hashlib.sha256()
+    for chunk in content.chunks():
+        digest.update(chunk)
+    content.seek(0)
+    return digest.hexdigest()
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    upload_to dagi papka va asl nom e'tiborga olinmaydi, faqat kengaytma saqlanadi.
+    Bir nechta model bitta faylga ishora qilishi mumkin, shuning uchun delete()
+    CAS fayllarni o'chirmaydi — ishlatilmayotganlarini `rehash_media --prune` tozalaydi.
+    """
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, "chunks"):
+            content = File(content, name)
+        extension = os.path.splitext(name)[1].lower()
+        digest = content_hash(content)
+        cas_name = f"{CAS_PREFIX}{digest[:2]}/{digest}{extension}"
+        if self.exists(cas_name):
+            return cas_name  # dublikat — mavjud faylni qayta ishlatamiz
+        # Vaqtinchalik nom bilan yozib, keyin atomik almashtiramiz: bir vaqtdagi
+        # bir xil yuklashlar bir-birini buzmaydi (kontent baribir bir xil)
+        temporary = super().save(f"{cas_name}.{uuid.uuid4().hex}.tmp", content)
+        os.replace(self.path(temporary), self.path(cas_name))
+        return cas_name
+
+    def delete(self, name):
+        if name and is_content_addressed(name):
+            return
+        super().delete(name)
@@ -15,12 +15,17 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
-from django.urls import path,include
+from django.urls import path,include,re_path
 from django.conf.urls.static import static
 from django.conf import settings
+from backend.media import serve_media
+from backend.metrics import metrics_view
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/user/', include("users.urls")),
     path('', include('testapp.urls')),
+    path('metrics', metrics_view, name='metrics'),
+    # Range / ETag / X-Accel-Redirect bilan (backend/media.py)
+    re_path(r'^%s(?P<path>.+)$' % settings.MEDIA_URL.lstrip('/'), serve_media, name='media'),
 
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT) + static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
+] + static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 
 application = get_wsgi_application()
+
+# /metrics: faqat server process lari METRICS_DIR ga yozadi
+from backend.metrics import mark_server_process  # noqa: E402
+
+mark_server_process()
@@ -1,4 +1,5 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.urls import reverse
 from django.utils.html import format_html, format_html_join
 from .models import (
     Mock,
@@ -11,10 +12,44 @@ from .models import (
     # Writing
     WritingTest, WritingTask1, WritingTask2
 )
+from . import search, similarity
 
 
 
 
+class FullTextSearchMixin:
+    """
+    Admin qidiruvi FTS5 indeksi orqali: so'zlar istalgan tartibda, prefiks
+    bo'yicha va diakritikasiz topiladi. Indeks bo'lmasa oddiy search_fields.
+    """
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip() or not search.enabled():
+            return super().get_search_results(request, queryset, search_term)
+        ids = search.search_ids(self.model, search_term)
+        return queryset.filter(pk__in=ids), False
+
+
+class NearDuplicateWarningMixin:
+    """Saqlangan matn bankdagi boshqa obyektga juda o'xshash bo'lsa ogohlantiradi"""
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        record = similarity.update_fingerprint(obj)  # signal allaqachon hisoblagan — qayta hisoblanmaydi
+        if record is None or record.duplicate_of is None:
+            return
+        opts = self.model._meta
+        url = reverse(f"admin:{opts.app_label}_{opts.model_name}_change", args=[record.duplicate_of])
+        self.message_user(
+            request,
+            format_html(
+                "Diqqat: bu matn <a href=\"{}\">#{}</a> bilan {}% o'xshash (ehtimol dublikat).",
+                url, record.duplicate_of, round(record.similarity * 100),
+            ),
+            messages.WARNING,
+        )
+
+
 # =============================
 # READING
 # =============================
@@ -60,7 +95,7 @@ class ReadingTableAdmin(admin.ModelAdmin):
 
 
 @admin.register(ReadingQuestion)
-class ReadingQuestionAdmin(admin.ModelAdmin):
+class ReadingQuestionAdmin(FullTextSearchMixin, admin.ModelAdmin):
     list_display = ("passage", "question_number", "question_type", "options_preview")
     list_filter = ("question_type", "passage__test")
     search_fields = ("question_text",)
@@ -99,11 +134,11 @@ class ReadingQuestionAdmin(admin.ModelAdmin):
 
 
 @admin.register(Passage)
-class PassageAdmin(admin.ModelAdmin):
+class PassageAdmin(NearDuplicateWarningMixin, FullTextSearchMixin, admin.ModelAdmin):
     list_display = ("title", "test", "order")
     ordering = ("test", "order")
     autocomplete_fields = ("test",)
-    search_fields = ("title",)
+    search_fields = ("title", "text")
 
 
 @admin.register(ReadingTest)
@@ -154,7 +189,7 @@ class ListeningTableAdmin(admin.ModelAdmin):
     table_preview.short_description = "Preview"
 
 @admin.register(ListeningQuestion)
-class ListeningQuestionAdmin(admin.ModelAdmin):
+class ListeningQuestionAdmin(FullTextSearchMixin, admin.ModelAdmin):
     list_display = ("section", "question_number", "question_type", "options_preview")
     list_filter = ("question_type", "section__test")
     search_fields = ("question_text",)
@@ -231,7 +266,7 @@ class SpeakingPart1Admin(admin.ModelAdmin):
 
 
 @admin.register(SpeakingPart1Question)
-class SpeakingPart1QuestionAdmin(admin.ModelAdmin):
+class SpeakingPart1QuestionAdmin(NearDuplicateWarningMixin, FullTextSearchMixin, admin.ModelAdmin):
     list_display = ("get_test", "short_question")
     search_fields = ("question_text",)
 
@@ -245,7 +280,7 @@ class SpeakingPart1QuestionAdmin(admin.ModelAdmin):
 
 # Part 2
 @admin.register(SpeakingPart2CueCard)
-class SpeakingPart2CueCardAdmin(admin.ModelAdmin):
+class SpeakingPart2CueCardAdmin(FullTextSearchMixin, admin.ModelAdmin):
     list_display = ("test", "topic")
     search_fields = ("topic", "description")
 
@@ -263,7 +298,7 @@ class SpeakingPart3Admin(admin.ModelAdmin):
 
 
 @admin.register(SpeakingPart3Question)
-class SpeakingPart3QuestionAdmin(admin.ModelAdmin):
+class SpeakingPart3QuestionAdmin(NearDuplicateWarningMixin, FullTextSearchMixin, admin.ModelAdmin):
     list_display = ("get_test", "short_question")
     search_fields = ("question_text",)
 
@@ -286,18 +321,20 @@ class WritingTestAdmin(admin.ModelAdmin):
 
 
 @admin.register(WritingTask1)
-class WritingTask1Admin(admin.ModelAdmin):
+class WritingTask1Admin(NearDuplicateWarningMixin, FullTextSearchMixin, admin.ModelAdmin):
     list_display = ("test", "short_question")
     autocomplete_fields = ("test",)
+    search_fields = ("question_text",)
 
     def short_question(self, obj):
         return obj.question_text[:50] + "..." if len(obj.question_text) > 50 else obj.question_text
 
 
 @admin.register(WritingTask2)
-class WritingTask2Admin(admin.ModelAdmin):
+class WritingTask2Admin(NearDuplicateWarningMixin, FullTextSearchMixin, admin.ModelAdmin):
     list_display = ("test", "short_question")
     autocomplete_fields = ("test",)
+    search_fields = ("question_text",)
 
     def short_question(self, obj):
         return obj.question_text[:50] + "..." if len(obj.question_text) > 50 else obj.question_text
@@ -0,0 +1,220 @@
+"""
+Reading/Listening testlari uchun kompilyatsiya qilingan javob kalitlari.
+
+To'g'ri javoblar ReadingQuestion.correct_answer (JSON ro'yxat) va
+ReadingTable -> ReadingTableAnswer ([[n]] raqamlari) bo'ylab tarqalgan
+(Listening da ham shunday). Bu modul ularni bitta lug'atga yig'adi:
+savol raqami -> normallashtirilgan qabul qilinadigan javoblar to'plami.
+Kalit har bir test uchun bir marta tuziladi va kontent versiyasi
+o'zgarguncha xotirada saqlanadi.
+"""
+import re
+import threading
+
+from .models import (
+    ReadingQuestion, ReadingTableAnswer,
+    ListeningQuestion, ListeningTableAnswer,
+)
+from .versioning import get_content_version
+
+
+# Bir nechta javob belgilanadigan savollar — har bir to'g'ri harf bitta ball
+MULTI_ANSWER_TYPES = {"two_multiple_choice"}
+
+ARTICLES = {"a", "an", "the"}
+
+NUMBER_WORDS = {
+    "zero": 0, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+    "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10,
+    "eleven": 11, "twelve": 12, "thirteen": 13, "fourteen": 14, "fifteen": 15,
+    "sixteen": 16, "seventeen": 17, "eighteen": 18, "nineteen": 19,
+    "twenty": 20, "thirty": 30, "forty": 40, "fifty": 50,
+    "sixty": 60, "seventy": 70, "eighty": 80, "ninety": 90,
+}
+ORDINAL_WORDS = {
+    "first": 1, "second": 2, "third": 3, "fourth": 4, "fifth": 5, "sixth": 6,
+    "seventh": 7, "eighth": 8, "ninth": 9, "tenth": 10, "eleventh": 11, "twelfth": 12,
+}
+SCALE_WORDS = {"hundred": 100, "thousand": 1000, "million": 1000000}
+
+APOSTROPHES = str.maketrans({"‘": "'", "’": "'", "ʻ": "'", "ʼ": "'", "`": "'", "“": '"', "”": '"'})
+DASHES_RE = re.compile(r"[-‐‑‒–—]+")
+THOUSANDS_RE = re.compile(r"(?<=\d),(?=\d{3}\b)")
+ORDINAL_SUFFIX_RE = re.compile(r"\b(\d+)(?:st|nd|rd|th)\b")
+TRAILING_ZEROS_RE = re.compile(r"\b(\d+)\.0+\b")
+LEADING_ZEROS_RE = re.compile(r"\b0+(?=\d)")
+PUNCTUATION_RE = re.compile(r"[^\w\s.%$£€/:']")
+
+
+def _words_to_numbers(tokens):
+    """
+    ["twenty", "five", "people"] -> ["25", "people"]. Scale so'zi faqat joriy
+    guruhga ta'sir qiladi ("two thousand three hundred" -> 2300), "and" faqat
+    hundred/thousand dan keyin qo'shadi, yonma-yon birliklar alohida son
+    ("one two" -> "1 2", "five and six" -> "5 and 6").
+    """
+    result = []
+    total = current = None  # total — tugagan thousand/million guruhlari, current — joriy guruh (<1000)
+    last = None             # oldingi so'z: "unit", "tens", "hundred", "scale", "and"
+    last_scale = None
+
+    def flush():
+        nonlocal total, current, last, last_scale
+        if total is not None or current is not None:
+            result.append(str((total or 0) + (current or 0)))
+        if last == "and":
+            result.append("and")  # "one hundred and" — "and" keyin son kelmadi
+        total = current = last = last_scale = None
+
+    for token in tokens:
+        if token in NUMBER_WORDS:
+            value = NUMBER_WORDS[token]
+            if current is not None and not (
+                (last == "tens" and 0 < value < 10) or (last in ("hundred", "and") and value < 100)
+            ):
+                flush()  # "one two", "twenty thirty"
+            current = value if current is None else current + value
+            last = "tens" if value >= 20 and value % 10 == 0 and value < 100 else "unit"
+        elif token == "hundred" and current is not None and last in ("unit", "tens") and current < 100:
+            current *= 100
+            last = "hundred"
+        elif token in SCALE_WORDS and token != "hundred" and current is not None:
+            if last_scale is not None and SCALE_WORDS[token] >= last_scale:
+                # "three thousand two thousand" — ikki alohida son
+                result.append(str(total))
+                total = None
+            total = (total or 0) + current * SCALE_WORDS[token]
+            current = None
+            last = "scale"
+            last_scale = SCALE_WORDS[token]
+        elif token == "and" and last in ("hundred", "scale"):
+            last = "and"
+        else:
+            flush()
+            if token in ORDINAL_WORDS:
+                token = str(ORDINAL_WORDS[token])
+            result.append(token)
+    flush()
+    return result
+
+
+def normalize_answer(value):
+    """
+    Javobni taqqoslash uchun normal shaklga keltiradi:
+    katta-kichik harf, bo'shliqlar, artikllar (a/an/the), defislar va
+    raqam variantlari ("twenty-five", "25", "1,000", "1000", "3rd", "third").
+    """
+    text = str(value).translate(APOSTROPHES).lower()
+    text = DASHES_RE.sub(" ", text)
+    text = THOUSANDS_RE.sub("", text)
+    text = text.replace("%", " percent")
+    text = PUNCTUATION_RE.sub(" ", text)
+    text = ORDINAL_SUFFIX_RE.sub(r"\1", text)
+    text = TRAILING_ZEROS_RE.sub(r"\1", text)
+    text = LEADING_ZEROS_RE.sub("", text)
+
+    tokens = [token for token in (t.strip(".'") for t in text.split()) if token]
+    if len(tokens) > 1:
+        # "A" yolg'iz o'zi — multiple choice javobi, artikl emas
+        tokens = [token for token in tokens if token not in ARTICLES] or tokens
+    return " ".join(_words_to_numbers(tokens))
+
+
+class AnswerKey:
+    """Savol raqami -> qabul qilinadigan javoblar (O(1) lookup)"""
+
+    def __init__(self):
+        self.accepted = {}  # {raqam: frozenset(normallashtirilgan javoblar)}
+        self.marks = {}     # {raqam: shu savol uchun maksimal ball}
+
+    def add(self, number, answers, marks=1):
+        accepted = frozenset(normalize_answer(answer) for answer in answers)
+        if accepted:
+            self.accepted[number] = accepted
+            self.marks[number] = marks
+
+    @property
+    def max_score(self):
+        return sum(self.marks.values())
+
+    def check(self, number, given):
+        """Bitta javob uchun olingan ball"""
+        accepted = self.accepted.get(number)
+        if accepted is None:
+            return 0
+        if isinstance(given, (list, tuple)):
+            given = {normalize_answer(answer) for answer in given}
+            if len(given) > self.marks[number]:
+                return 0  # "choose TWO" da hamma variantni belgilash — ball yo'q
+            return len(given & accepted)
+        return 1 if normalize_answer(given) in accepted else 0
+
+    def score(self, answers):
+        """Varaqadagi to'g'ri javoblar soni. answers: {"1": "A", "21": ["A", "C"]}"""
+        correct = 0
+        for number, given in (answers or {}).items():
+            try:
+                number = int(number)
+            except (TypeError, ValueError):
+                continue
+            correct += self.check(number, given)
+        return correct
+
+
+def _compile(questions, table_answers):
+    key = AnswerKey()
+    for number, question_type, correct in questions:
+        if not isinstance(correct, (list, tuple)):
+            correct = [] if correct in (None, "") else [correct]
+        marks = len(correct) if question_type in MULTI_ANSWER_TYPES else 1
+        key.add(number, correct, marks)  # table_completion da ro'yxat bo'sh bo'ladi
+
+    for number, correct in table_answers:
+        key.add(number, [correct])
+    return key
+
+
+def compile_reading_key(test_id):
+    questions = ReadingQuestion.objects.filter(passage__test_id=test_id).values_list(
+        "question_number", "question_type", "correct_answer"
+    )
+    table_answers = ReadingTableAnswer.objects.filter(
+        table__question__passage__test_id=test_id
+    ).values_list("number", "correct_answer")
+    return _compile(questions, table_answers)
+
+
+def compile_listening_key(test_id):
+    questions = ListeningQuestion.objects.filter(section__test_id=test_id).values_list(
+        "question_number", "question_type", "correct_answer"
+    )
+    table_answers = ListeningTableAnswer.objects.filter(
+        table__question__section__test_id=test_id
+    ).values_list("number", "correct_answer")
+    return _compile(questions, table_answers)
+
+
+COMPILERS = {
+    "reading": compile_reading_key,
+    "listening": compile_listening_key,
+}
+
+_keys = {}
+_lock = threading.Lock()
+
+
+def get_answer_key(kind, test_id, version=None):
+    """
+    Kontent versiyasi bo'yicha keshlangan javob kaliti.
+    kind: "reading" yoki "listening"
+    """
+    if version is None:
+        version = get_content_version()
+    cached = _keys.get((kind, test_id))
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    key = COMPILERS[kind](test_id)
+    with _lock:
+        _keys[(kind, test_id)] = (version, key)
+    return key
@@ -0,0 +1,181 @@
+"""
+AudioSection start_time/end_time bo'yicha audio segmentlarini oldindan kesish.
+
+Bir nechta section bitta uzun yozuvni ishlatganda nomzod butun faylni emas,
+faqat o'z section ining segmentini yuklab oladi. Kesish ffmpeg bilan
+(-c copy, qayta kodlashsiz) `build_audio_segments` buyrug'ida bajariladi —
+admin dagi saqlash ffmpeg ni kutmaydi, faqat eskirgan segmentni olib tashlaydi.
+Segment yo'q bo'lsa (hali kesilmagan, ffmpeg yo'q yoki xato) API asl
+audio_file ni beraveradi.
+"""
+import hashlib
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+from datetime import timedelta
+
+from django.core.files import File
+from django.db import transaction
+
+from .versioning import bump_content_version
+
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_DIR = "listening/segments/"
+FFMPEG_TIMEOUT = 300
+# segment_source da: shu manbadan kesish muvaffaqiyatsiz bo'lgan (qayta urinilmaydi)
+FAILED_PREFIX = "failed:"
+EMPTY_SEGMENT = {"segment_file": None, "segment_size": None, "segment_duration": None}
+
+
+class SegmentError(Exception):
+    pass
+
+
+def ffmpeg_available():
+    return shutil.which("ffmpeg") is not None
+
+
+def segment_source(section):
+    """Segment qaysi fayl va oraliqdan kesilganini bildiruvchi barmoq izi"""
+    if not section.audio_file or (section.start_time is None and section.end_time is None):
+        return ""
+    raw = f"{section.audio_file.name}|{section.start_time}|{section.end_time}"
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def failed_marker(source):
+    return f"{FAILED_PREFIX}{source[:40 - len(FAILED_PREFIX)]}"
+
+
+def _seconds(value):
+    return f"{value.total_seconds():.3f}"
+
+
+def cut(source_path, output_path, start=None, end=None):
+    """[start, end) oraliqni qayta kodlashsiz kesadi"""
+    command = ["ffmpeg", "-hide_banner", "-loglevel", "error", "-y"]
+    if start:
+        command += ["-ss", _seconds(start)]  # -i dan oldin — tez seek
+    command += ["-i", source_path]
+    if end is not None:
+        command += ["-t", _seconds(end - (start or timedelta()))]
+    command += ["-map", "0:a", "-c", "copy", output_path]
+    try:
+        subprocess.run(command, check=True, capture_output=True, timeout=FFMPEG_TIMEOUT)
+    except subprocess.CalledProcessError as exc:
+        raise SegmentError(exc.stderr.decode(errors="replace").strip() or str(exc))
+    except subprocess.TimeoutExpired:
+        raise SegmentError(f"ffmpeg {FFMPEG_TIMEOUT}s da tugamadi")
+
+
+def probe_duration(path):
+    """Fayl davomiyligi (ffprobe bo'lmasa None)"""
+    if shutil.which("ffprobe") is None:
+        return None
+    result = subprocess.run(
+        ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", path],
+        capture_output=True, timeout=60,
+    )
+    try:
+        return timedelta(seconds=float(result.stdout.decode().strip()))
+    except ValueError:
+        return None
+
+
+def _cut_segment(section, source):
+    storage = section.segment_file.storage
+    extension = os.path.splitext(section.audio_file.name)[1] or ".mp3"
+    with tempfile.TemporaryDirectory() as workdir:
+        source_path = _local_copy(section.audio_file, workdir)
+        output_path = os.path.join(workdir, f"segment{extension}")
+        cut(source_path, output_path, section.start_time, section.end_time)
+        duration = probe_duration(output_path)
+        if duration is None and section.end_time is not None:
+            duration = section.end_time - (section.start_time or timedelta())
+        with open(output_path, "rb") as output:
+            name = storage.save(f"{SEGMENT_DIR}section-{section.pk}-{source[:12]}{extension}", File(output))
+    return {"segment_file": name, "segment_size": storage.size(name), "segment_duration": duration}
+
+
+def _save_segment(section, fields, source):
+    """
+    Metadata ni Queryset.update bilan yozadi (post_save qayta chaqirilmaydi).
+    Kontent versiyasi faqat API dagi segment maydonlari o'zgarganda yangilanadi.
+    """
+    from .models import AudioSection
+
+    old_name = section.segment_file.name if section.segment_file else None
+    changed = (old_name, section.segment_size, section.segment_duration) != (
+        fields["segment_file"], fields["segment_size"], fields["segment_duration"]
+    )
+    AudioSection.objects.filter(pk=section.pk).update(segment_source=source, **fields)
+    section.segment_source = source
+    for field, value in fields.items():
+        setattr(section, field, value)
+    if old_name and old_name != fields["segment_file"]:
+        section.segment_file.storage.delete(old_name)
+    if changed:
+        bump_content_version()  # serializer chiqishi o'zgardi
+
+
+def build_segment(section):
+    """
+    Section uchun segmentni kesib saqlaydi va metadata ni yangilaydi.
+    Segment kerak bo'lmasa (start/end yo'q) eski segmentni o'chiradi. ffmpeg
+    bo'lmasa yoki kesish xato bersa failed_marker yoziladi — manba o'zgarmaguncha
+    qayta urinilmaydi; SegmentError chaqiruvchiga qaytariladi.
+    """
+    source = segment_source(section)
+    if not source:
+        _save_segment(section, EMPTY_SEGMENT, "")
+        return False
+    if not ffmpeg_available():
+        logger.warning("ffmpeg topilmadi — AudioSection #%s uchun segment yaratilmadi", section.pk)
+        _save_segment(section, EMPTY_SEGMENT, failed_marker(source))
+        return False
+    try:
+        fields = _cut_segment(section, source)
+    except SegmentError:
+        _save_segment(section, EMPTY_SEGMENT, failed_marker(source))
+        raise
+    _save_segment(section, fields, source)
+    return True
+
+
+def _local_copy(field_file, workdir):
+    """ffmpeg uchun diskdagi yo'l (storage lokal bo'lmasa vaqtinchalik nusxa)"""
+    try:
+        return field_file.path
+    except NotImplementedError:
+        path = os.path.join(workdir, "source" + os.path.splitext(field_file.name)[1])
+        with field_file.open("rb") as source, open(path, "wb") as target:
+            shutil.copyfileobj(source, target)
+        return path
+
+
+def segment_is_stale(section, retry_failed=False):
+    """Fayl yoki oraliq oxirgi kesishdan (yoki muvaffaqiyatsiz urinishdan) keyin o'zgargan"""
+    source = segment_source(section)
+    recorded = section.segment_source or ""
+    if recorded == source:
+        return False
+    return retry_failed or recorded != failed_marker(source)
+
+
+def clear_segment(section):
+    """Eskirgan segmentni olib tashlaydi; segment_source o'zgarmaydi — buyruq uni kesadi"""
+    _save_segment(section, EMPTY_SEGMENT, section.segment_source or "")
+
+
+def schedule_segment(section):
+    """
+    Fayl yoki oraliq o'zgargan bo'lsa eski segment commit dan keyin olib
+    tashlanadi (API asl audio_file ni beradi). Yangisini `build_audio_segments`
+    kesadi — ffmpeg admin so'rovi ichida ishlamaydi.
+    """
+    if segment_is_stale(section) and section.segment_file:
+        transaction.on_commit(lambda: clear_segment(section))
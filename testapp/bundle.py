@@ -0,0 +1,229 @@
+"""
+Active Mock uchun "exam bundle".
+
+Imtihon boshlanganda barcha nomzodlar bir xil payloadni so'raydi, shuning
+uchun Mock ning har bir bo'limi (reading, listening, speaking, writing) bir
+marta serializatsiya qilinib, tayyor JSON baytlari ko'rinishida xotirada
+saqlanadi. Keyingi so'rovlar uchun bu oddiy dict lookup. Kontent o'zgarganda (signals.py) versiya yangilanadi va bundle
+qayta quriladi.
+
+Har bir payload ning gzip (va brotli o'rnatilgan bo'lsa br) varianti ham
+birinchi so'rovda bir marta siqiladi va bundle bilan birga saqlanadi:
+Accept-Encoding bo'yicha tayyor baytlar beriladi, har so'rovda siqish yo'q.
+"""
+import gzip
+import threading
+
+from asgiref.sync import sync_to_async
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from .serializers import (
+    ReadingTestSerializer,
+    ListeningTestSerializer,
+    SpeakingTestSerializer,
+    WritingTestSerializer,
+)
+from .versioning import aget_content_version, get_content_version
+
+
+# bo'lim nomi -> (Mock dagi M2M maydon, serializer)
+SECTIONS = {
+    "reading": ("reading_tests", ReadingTestSerializer),
+    "listening": ("listening_tests", ListeningTestSerializer),
+    "speaking": ("speaking_tests", SpeakingTestSerializer),
+    "writing": ("writing_tests", WritingTestSerializer),
+}
+
+# Bitta bundle da saqlanadigan (bo'lim, fieldset) variantlari soni
+MAX_SECTION_VARIANTS = 64
+# Bundan kichik payloadlarni siqish foydasiz (GZipMiddleware dagi kabi)
+MIN_COMPRESS_SIZE = 200
+# Bitta versiya uchun saqlanadigan host lar soni: Host sarlavhasini klient
+# istalgancha o'zgartira oladi, har biri uchun bundle xotirada qolmasin
+MAX_BUNDLE_HOSTS = 4
+
+
+def _brotli_encoder(quality):
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return lambda raw: brotli.compress(raw, quality=quality)
+
+
+def _gzip_encoder(level):
+    return lambda raw: gzip.compress(raw, compresslevel=level, mtime=0)
+
+
+# Afzallik tartibida: br > gzip. Keshlangan payload bir marta, eng kuchli
+# darajada siqiladi
+ENCODERS = {
+    name: encoder for name, encoder in (
+        ("br", _brotli_encoder(11)),
+        ("gzip", _gzip_encoder(9)),
+    ) if encoder is not None
+}
+# Keshlanmagan payload har so'rovda siqiladi — tez daraja
+FAST_ENCODERS = {
+    name: encoder for name, encoder in (
+        ("br", _brotli_encoder(4)),
+        ("gzip", _gzip_encoder(1)),
+    ) if encoder is not None
+}
+
+
+def parse_accept_encoding(header):
+    """{"gzip": 1.0, "br": 0.5, "*": 0.1, ...} — q=0 ham saqlanadi (rad etilgan)"""
+    weights = {}
+    for part in (header or "").split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name] = weight
+    return weights
+
+
+def choose_encoding(header):
+    """Klient qabul qiladigan eng yaxshi encoding yoki None (siqilmagan)"""
+    weights = parse_accept_encoding(header)
+    best, best_weight = None, 0.0
+    for name in ENCODERS:
+        weight = weights.get(name, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = name, weight
+    return best
+
+
+class Payload:
+    """
+    Tayyor JSON baytlari va ularning siqilgan variantlari (har biri bir marta).
+    fast=True — payload keshlanmaydi, shuning uchun tez darajada siqiladi.
+    """
+
+    def __init__(self, raw, fast=False):
+        self.raw = raw
+        self.encoders = FAST_ENCODERS if fast else ENCODERS
+        self._encoded = {}
+        self._lock = threading.Lock()
+
+    def has(self, encoding):
+        return encoding is None or encoding in self._encoded
+
+    def encoded(self, encoding):
+        """(baytlar, encoding) — siqish foyda bermasa siqilmagan baytlar va None"""
+        if encoding is None or len(self.raw) < MIN_COMPRESS_SIZE:
+            return self.raw, None
+        data = self._encoded.get(encoding)
+        if data is None:
+            with self._lock:
+                data = self._encoded.get(encoding)
+                if data is None:
+                    data = self.encoders[encoding](self.raw)
+                    self._encoded[encoding] = data
+        if len(data) >= len(self.raw):
+            return self.raw, None
+        return data, encoding
+
+
+class ExamBundle:
+    """Bitta Mock va kontent versiyasi uchun tayyor bo'limlar"""
+
+    def __init__(self, mock, version):
+        self.mock = mock
+        self.version = version
+        self.cached = True  # False — bundle faqat shu so'rov uchun (_store_bundle)
+        self.sections = {}  # {("reading", field_spec.key): Payload(b"[...]"), ...}
+        self._lock = threading.Lock()
+
+    def render_section(self, name, request, field_spec=None):
+        """Bo'limni birinchi so'rovda serializatsiya qiladi, keyin tayyor Payload ni qaytaradi"""
+        key = (name, field_spec.key if field_spec else None)
+        payload = self.sections.get(key)
+        if payload is not None:
+            return payload
+
+        with self._lock:
+            payload = self.sections.get(key)
+            if payload is None:
+                field_name, serializer_class = SECTIONS[name]
+                tests = getattr(self.mock, field_name).all()
+                context = {"request": request, "field_spec": field_spec}
+                data = serializer_class(tests, many=True, context=context).data
+                # Ixtiyoriy ?fields= kombinatsiyalari xotirani to'ldirib yubormasin
+                store = self.cached and len(self.sections) < MAX_SECTION_VARIANTS
+                payload = Payload(JSONRenderer().render(data), fast=not store)
+                if store:
+                    self.sections[key] = payload
+        return payload
+
+
+_bundles = {}
+_lock = threading.RLock()
+
+
+def _bundle_key(request, version):
+    # Rasm/audio URL lari absolute bo'lgani uchun host ham kalitga kiradi
+    return (version, timezone.now().date(), request.build_absolute_uri("/"))
+
+
+def _store_bundle(key, bundle):
+    with _lock:
+        # Eski versiyalarni xotiradan chiqaramiz
+        for old_key in [k for k in _bundles if k[:2] != key[:2]]:
+            del _bundles[old_key]
+        if key not in _bundles and len(_bundles) >= MAX_BUNDLE_HOSTS:
+            bundle.cached = False  # faqat shu so'rov uchun
+            return bundle
+        return _bundles.setdefault(key, bundle)
+
+
+def get_bundle(request, load_mock):
+    """
+    Joriy versiya va sana uchun bundle ni qaytaradi.
+    load_mock — bundle topilmaganda active Mock ni bazadan oladigan funksiya.
+    """
+    version = get_content_version()
+    key = _bundle_key(request, version)
+
+    bundle = _bundles.get(key)
+    if bundle is not None:
+        return bundle
+
+    with _lock:
+        bundle = _bundles.get(key)
+        if bundle is None:
+            bundle = _store_bundle(key, ExamBundle(load_mock(), version))
+    return bundle
+
+
+def render_section(request, section, load_mock, field_spec=None):
+    """Active Mock bo'limining Payload i (JSON baytlari + siqilgan variantlari)"""
+    return get_bundle(request, load_mock).render_section(section, request, field_spec)
+
+
+async def arender_section(request, section, aload_mock, field_spec=None):
+    """
+    render_section ning ASGI varianti. Tayyor payload event loop ichida
+    qaytariladi; Mock async ORM bilan olinadi, serializatsiya esa (DRF
+    sinxron) thread da bajariladi.
+    """
+    version = await aget_content_version()
+    key = _bundle_key(request, version)
+
+    bundle = _bundles.get(key)
+    if bundle is None:
+        bundle = _store_bundle(key, ExamBundle(await aload_mock(), version))
+
+    payload = bundle.sections.get((section, field_spec.key if field_spec else None))
+    if payload is None:
+        payload = await sync_to_async(bundle.render_section)(section, request, field_spec)
+    return payload
@@ -0,0 +1,103 @@
+"""
+Sparse fieldsets: ?fields= / ?exclude= va nomlangan profillar (?profile=).
+
+Nuqtasiz nom har qanday chuqurlikdagi maydonga tegishli ("correct_answer"),
+nuqtali yo'l esa ildiz serializerdan aniq yo'l ("passages.text").
+"""
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+from backend.metrics import TimedSerializerMixin
+
+
+PROFILES = {
+    "full": {},
+    # Nomzod uchun: to'g'ri javoblarsiz
+    "candidate": {
+        "exclude": ["correct_answer", "paragraph_mapping", "answers"],
+    },
+    # Navigatsiya paneli uchun: faqat raqamlar va turlar
+    "navigator": {
+        "fields": [
+            "id", "title", "order", "section_number", "question_number", "question_type", "topic",
+            "passages", "sections", "questions", "part1", "part2", "part3", "task1", "task2",
+        ],
+    },
+}
+
+
+def _split(items):
+    names = {item for item in items if "." not in item}
+    paths = {item for item in items if "." in item}
+    return names, paths
+
+
+def _param_list(value):
+    return [item.strip() for item in (value or "").split(",") if item.strip()]
+
+
+class FieldSpec:
+    """Qaysi maydonlar chiqarilishini aniqlaydi"""
+
+    def __init__(self, fields=(), exclude=(), profile=None):
+        self.key = (profile, tuple(sorted(fields)), tuple(sorted(exclude)))
+        self.restricts = bool(fields)
+        self.include_names, self.include_paths = _split(fields)
+        self.exclude_names, self.exclude_paths = _split(exclude)
+
+    @classmethod
+    def from_request(cls, request):
+        params = request.query_params if hasattr(request, "query_params") else request.GET
+        profile = params.get("profile")
+        if profile is None:
+            base = {}
+        elif profile in PROFILES:
+            base = PROFILES[profile]
+        else:
+            raise ValidationError({"profile": f"Noma'lum profil. Mavjud: {', '.join(PROFILES)}"})
+
+        fields = list(base.get("fields", [])) + _param_list(params.get("fields"))
+        exclude = list(base.get("exclude", [])) + _param_list(params.get("exclude"))
+        if not fields and not exclude:
+            return None
+        return cls(fields, exclude, profile)
+
+    def allows(self, path):
+        name = path.rsplit(".", 1)[-1]
+        if name in self.exclude_names or path in self.exclude_paths:
+            return False
+        if not self.restricts:
+            return True
+        if name in self.include_names or path in self.include_paths:
+            return True
+        # Tanlangan maydonning ota-onasi yoki tanlangan daraxt ichida
+        return any(
+            included.startswith(path + ".") or path.startswith(included + ".")
+            for included in self.include_paths
+        )
+
+
+class DynamicFieldsModelSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """context["field_spec"] bo'yicha maydonlarni nested darajada ham kesadi"""
+
+    def get_fields(self):
+        fields = super().get_fields()
+        spec = self.context.get("field_spec")
+        if spec is None:
+            return fields
+        prefix = self.field_path
+        return {
+            name: field for name, field in fields.items()
+            if spec.allows(prefix + name)
+        }
+
+    @property
+    def field_path(self):
+        """Ildiz serializerdan shu serializergacha yo'l: "passages.questions." """
+        names = []
+        node = self
+        while node is not None:
+            if node.field_name:
+                names.append(node.field_name)
+            node = node.parent
+        return "".join(f"{name}." for name in reversed(names))
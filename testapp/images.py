@@ -0,0 +1,170 @@
+"""
+Savol rasmlari uchun responsive variantlar (WebP/JPEG, bir nechta kenglikda).
+
+Admin yuklagan ko'p megabaytli PNG skanlar o'rniga planshetlar o'z ekraniga
+mos kichik variantni yuklab oladi. Variantlar rasm saqlanganda (commit dan
+keyin) yoki `build_image_variants` buyrug'i bilan yaratiladi va ImageVariant
+jadvalida o'lchamlari bilan saqlanadi.
+"""
+import logging
+import os
+import threading
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from rest_framework import serializers
+
+from .versioning import bump_content_version, get_content_version
+
+
+logger = logging.getLogger(__name__)
+
+VARIANT_WIDTHS = (480, 960, 1600)
+VARIANT_FORMATS = ("webp", "jpeg")
+QUALITY = {"webp": 80, "jpeg": 82}
+
+# Rasm maydonlari bo'lgan modellar: {model nomi: [maydonlar]}
+IMAGE_FIELDS = {
+    "ReadingQuestion": ["diagram_labels"],
+    "ListeningQuestion": ["map_image"],
+    "WritingTask1": ["image"],
+}
+
+
+def _formats():
+    from PIL import features
+
+    return [fmt for fmt in VARIANT_FORMATS if fmt != "webp" or features.check("webp")]
+
+
+def _prepare(image):
+    from PIL import ImageOps
+
+    image = ImageOps.exif_transpose(image)
+    if image.mode in ("RGBA", "LA", "P"):
+        # JPEG da shaffoflik yo'q — oq fon ustiga (savol rasmlari odatda oq fonda)
+        from PIL import Image
+
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, "white")
+        background.paste(image, mask=image.getchannel("A"))
+        return background
+    return image.convert("RGB")
+
+
+def _target_widths(width):
+    """Asl kenglikdan kichik variantlar + asl kenglikdagi (qayta siqilgan) nusxa"""
+    widths = [target for target in VARIANT_WIDTHS if target < width]
+    if width <= VARIANT_WIDTHS[-1]:
+        widths.append(width)
+    return widths
+
+
+def build_variants(name):
+    """
+    Storage dagi `name` rasm uchun variantlarni yaratadi (eskilarini almashtiradi).
+    Yaratilgan ImageVariant lar ro'yxatini qaytaradi.
+    """
+    from PIL import Image, UnidentifiedImageError
+
+    from .models import ImageVariant
+
+    try:
+        with default_storage.open(name, "rb") as source:
+            image = _prepare(Image.open(source))
+    except (FileNotFoundError, UnidentifiedImageError, OSError) as exc:
+        logger.warning("Rasm variantlarini yaratib bo'lmadi (%s): %s", name, exc)
+        return []
+
+    stem = os.path.splitext(os.path.basename(name))[0]
+    variants = []
+    for width in _target_widths(image.width):
+        height = max(1, round(image.height * width / image.width))
+        resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+        for fmt in _formats():
+            buffer = BytesIO()
+            resized.save(buffer, format=fmt.upper(), quality=QUALITY[fmt], optimize=True)
+            variant = ImageVariant(source=name, format=fmt, width=width, height=height, size=buffer.tell())
+            variant.file.save(f"{stem}-{width}.{fmt}", ContentFile(buffer.getvalue()), save=False)
+            variants.append(variant)
+
+    with transaction.atomic():
+        delete_variants(name)
+        ImageVariant.objects.bulk_create(variants)
+    bump_content_version()  # serializer chiqishi o'zgardi
+    return variants
+
+
+def delete_variants(name):
+    from .models import ImageVariant
+
+    old = ImageVariant.objects.filter(source=name)
+    for variant in old:
+        variant.file.delete(save=False)
+    old.delete()
+
+
+def has_variants(name):
+    from .models import ImageVariant
+
+    return ImageVariant.objects.filter(source=name).exists()
+
+
+def schedule_variants(instance, field_names):
+    """Yangi yuklangan rasmlar uchun commit dan keyin variantlar yaratadi"""
+    for field_name in field_names:
+        name = getattr(instance, field_name).name
+        if name and not has_variants(name):
+            transaction.on_commit(lambda name=name: build_variants(name))
+
+
+# ============ SERIALIZER ===============
+_variant_map = (None, {})
+_variant_lock = threading.Lock()
+
+
+def variant_map():
+    """
+    {source: [ImageVariant]} — kontent versiyasi bo'yicha xotirada saqlanadi,
+    shuning uchun serializatsiya har bir rasm uchun so'rov yubormaydi.
+    """
+    global _variant_map
+    version = get_content_version()
+    cached_version, mapping = _variant_map
+    if cached_version == version:
+        return mapping
+
+    from .models import ImageVariant
+
+    with _variant_lock:
+        if _variant_map[0] != version:
+            mapping = {}
+            for variant in ImageVariant.objects.all():
+                mapping.setdefault(variant.source, []).append(variant)
+            _variant_map = (version, mapping)
+        return _variant_map[1]
+
+
+class ImageVariantsField(serializers.ReadOnlyField):
+    """
+    Rasm maydonining variantlari: [{url, format, width, height, size}].
+    Variantlar hali yaratilmagan bo'lsa bo'sh ro'yxat (asl rasm URL i alohida maydonda).
+    """
+
+    def to_representation(self, value):
+        if not value:
+            return []
+        request = self.context.get("request")
+        variants = []
+        for variant in variant_map().get(value.name, ()):
+            url = variant.file.url
+            variants.append({
+                "url": request.build_absolute_uri(url) if request is not None else url,
+                "format": variant.format,
+                "width": variant.width,
+                "height": variant.height,
+                "size": variant.size,
+            })
+        return variants
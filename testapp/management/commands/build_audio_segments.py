@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from testapp.audio import SegmentError, build_segment, ffmpeg_available, segment_is_stale
+from testapp.models import AudioSection
+
+
+class Command(BaseCommand):
+    help = (
+        "start_time/end_time bo'yicha listening section audio segmentlarini kesadi. "
+        "Standart holatda faqat eskirgan (fayl yoki oraliq o'zgargan) segmentlar qayta yaratiladi. "
+        "Admin dagi saqlash segmentni kesmaydi — buyruqni cron da ishga tushiring."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true", help="Barcha segmentlarni qayta kesish")
+        parser.add_argument(
+            "--retry-failed", action="store_true", help="Avval kesib bo'lmagan segmentlarni ham qayta urinish",
+        )
+
+    def handle(self, *args, **options):
+        if not ffmpeg_available():
+            raise CommandError("ffmpeg topilmadi (PATH da bo'lishi kerak)")
+
+        built = failed = 0
+        for section in AudioSection.objects.exclude(audio_file="").exclude(audio_file=None).iterator():
+            if not options["force"] and not segment_is_stale(section, options["retry_failed"]):
+                continue
+            try:
+                if build_segment(section):
+                    built += 1
+            except SegmentError as exc:
+                failed += 1
+                self.stderr.write(f"AudioSection #{section.pk}: {exc}")
+        self.stdout.write(self.style.SUCCESS(f"{built} ta segment yaratildi, {failed} ta xato."))
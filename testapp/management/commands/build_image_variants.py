@@ -0,0 +1,44 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from testapp.images import IMAGE_FIELDS, build_variants, delete_variants
+from testapp.models import ImageVariant
+
+
+class Command(BaseCommand):
+    help = (
+        "Savol rasmlari (diagram_labels, map_image, Task 1 image) uchun WebP/JPEG "
+        "variantlarini yaratadi. Standart holatda faqat varianti yo'q rasmlar."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true", help="Barcha variantlarni qayta yaratish")
+        parser.add_argument("--prune", action="store_true", help="Hech qayerda ishlatilmaydigan variantlarni o'chirish")
+
+    def referenced_images(self):
+        names = set()
+        for model_name, field_names in IMAGE_FIELDS.items():
+            model = apps.get_model("testapp", model_name)
+            for field_name in field_names:
+                names.update(
+                    model.objects.exclude(**{field_name: ""}).exclude(**{f"{field_name}__isnull": True})
+                    .values_list(field_name, flat=True)
+                )
+        return names
+
+    def handle(self, *args, **options):
+        names = self.referenced_images()
+        existing = set(ImageVariant.objects.values_list("source", flat=True).distinct())
+
+        built = 0
+        for name in sorted(names):
+            if options["force"] or name not in existing:
+                if build_variants(name):
+                    built += 1
+        self.stdout.write(self.style.SUCCESS(f"{built} ta rasm uchun variantlar yaratildi."))
+
+        if options["prune"]:
+            orphans = existing - names
+            for name in orphans:
+                delete_variants(name)
+            self.stdout.write(f"{len(orphans)} ta eskirgan rasm variantlari o'chirildi.")
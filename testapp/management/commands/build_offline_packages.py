@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from testapp import offline
+from testapp.models import Mock
+
+
+class Command(BaseCommand):
+    help = (
+        "Mock lar uchun oflayn imtihon arxivlarini oldindan quradi "
+        "(standart — bugun va keyingi kunlardagi barcha Mock lar)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--mock", type=int, action="append", dest="mocks", help="Mock id (bir necha marta)")
+
+    def handle(self, *args, **options):
+        ids = options["mocks"] or list(
+            Mock.objects.filter(exam_date__gte=timezone.now().date()).values_list("pk", flat=True)
+        )
+        for mock_id in ids:
+            try:
+                package = offline.get_package(mock_id)
+            except Mock.DoesNotExist:
+                self.stderr.write(f"Mock #{mock_id} topilmadi.")
+                continue
+            self.stdout.write(f"{package.filename}: {package.size / 1024 / 1024:.1f} MB, sha256 {package.sha256}")
+        self.stdout.write(self.style.SUCCESS(f"{len(ids)} ta Mock."))
@@ -0,0 +1,126 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+from django.utils import timezone
+
+from testapp import bundle
+from testapp.models import (
+    Mock,
+    ReadingTest, Passage, ReadingQuestion,
+    ListeningTest, AudioSection, ListeningQuestion, ListeningTable, ListeningTableRow, ListeningTableAnswer,
+    SpeakingTest, SpeakingPart1, SpeakingPart1Question, SpeakingPart2CueCard, SpeakingPart3, SpeakingPart3Question,
+    WritingTest, WritingTask1, WritingTask2,
+)
+
+
+def build_exam(scale):
+    """Har bir bo'limda `scale` ga proporsional savollari bor active Mock"""
+    reading = ReadingTest.objects.create(title=f"Budget reading x{scale}")
+    for order in range(1, 4):
+        passage = Passage.objects.create(test=reading, title=f"Passage {order}", text="Text", order=order)
+        for number in range(scale * 4):
+            ReadingQuestion.objects.create(
+                passage=passage, question_type="multiple_choice",
+                question_number=number + 1, options=["A. One", "B. Two"], correct_answer=["A"],
+            )
+
+    listening = ListeningTest.objects.create(title=f"Budget listening x{scale}")
+    for section_number in range(1, 5):
+        section = AudioSection.objects.create(test=listening, section_number=section_number)
+        for number in range(scale * 3):
+            question = ListeningQuestion.objects.create(
+                section=section, question_type="table_completion",
+                question_number=number + 1, correct_answer=[],
+            )
+            table = ListeningTable.objects.create(question=question, columns=["Name", "Day"])
+            ListeningTableRow.objects.create(table=table, row_data=["Ann", f"[[{number + 1}]]"])
+            ListeningTableAnswer.objects.create(table=table, number=number + 1, correct_answer="Monday")
+
+    speaking = SpeakingTest.objects.create(title=f"Budget speaking x{scale}")
+    part1 = SpeakingPart1.objects.create(test=speaking, topic="Home")
+    part3 = SpeakingPart3.objects.create(test=speaking, topic="Travel")
+    SpeakingPart2CueCard.objects.create(test=speaking, topic="Trip", description="Describe a trip")
+    for _ in range(scale * 3):
+        SpeakingPart1Question.objects.create(part1=part1, question_text="Where do you live?")
+        SpeakingPart3Question.objects.create(part3=part3, question_text="Why do people travel?")
+
+    writing = WritingTest.objects.create(title=f"Budget writing x{scale}")
+    for _ in range(scale):
+        WritingTask1.objects.create(test=writing, question_text="Describe the chart")
+        WritingTask2.objects.create(test=writing, question_text="Discuss both views")
+
+    Mock.objects.filter(status="active").update(status="inactive")
+    mock = Mock.objects.create(
+        title=f"Budget mock x{scale}",
+        number=(Mock.objects.order_by("-number").values_list("number", flat=True).first() or 0) + 1,
+        status="active",
+        exam_date=timezone.now().date(),
+    )
+    mock.reading_tests.add(reading)
+    mock.listening_tests.add(listening)
+    mock.speaking_tests.add(speaking)
+    mock.writing_tests.add(writing)
+    return mock
+
+
+def endpoints(mock):
+    reading = mock.reading_tests.first()
+    listening = mock.listening_tests.first()
+    return [
+        reverse("mocks-list"),
+        reverse("mocks-reading-list"),
+        reverse("mocks-listening-list"),
+        reverse("mocks-speaking-list"),
+        reverse("mocks-writing-list"),
+        reverse("mocks-reading-passages", kwargs={"test_id": reading.id}),
+        reverse("mocks-reading-single-passage", kwargs={"test_id": reading.id, "order": 1}),
+        reverse("mocks-listening-section-detail", kwargs={"test_id": listening.id, "section_number": 1}),
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Har bir exam endpoint uchun SQL so'rovlar sonini o'lchaydi va view dagi "
+        "query_budget dan oshmasligini, savollar soniga bog'liq emasligini tekshiradi. "
+        "Ma'lumotlar tranzaksiya ichida yaratilib, oxirida bekor qilinadi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scales", type=int, nargs="+", default=[1, 3])
+
+    def measure(self, client, url):
+        bundle._bundles.clear()  # har safar sovuq keshdan o'lchaymiz
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url, secure=True)
+        if response.status_code != 200:
+            raise CommandError(f"{url} -> HTTP {response.status_code}")
+        return len(queries)
+
+    def handle(self, *args, **options):
+        client = Client()
+        counts = {}   # url_name -> {scale: so'rovlar soni}
+        budgets = {}  # url_name -> view.query_budget
+        with transaction.atomic():
+            for scale in options["scales"]:
+                mock = build_exam(scale)
+                for url in endpoints(mock):
+                    match = resolve(url)
+                    budgets[match.url_name] = getattr(match.func.view_class, "query_budget", None)
+                    counts.setdefault(match.url_name, {})[scale] = self.measure(client, url)
+            transaction.set_rollback(True)
+
+        failures = []
+        for name, by_scale in counts.items():
+            budget = budgets[name]
+            values = list(by_scale.values())
+            self.stdout.write(f"{name:40} {' '.join(str(v).rjust(4) for v in values)}   budget={budget}")
+            if len(set(values)) > 1:
+                failures.append(f"{name}: so'rovlar soni savollar soniga bog'liq {by_scale}")
+            elif budget is not None and max(values) > budget:
+                failures.append(f"{name}: {max(values)} > {budget}")
+
+        if failures:
+            raise CommandError("\n".join(failures))
+        self.stdout.write(self.style.SUCCESS("Barcha endpointlar query budget ichida."))
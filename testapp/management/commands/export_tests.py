@@ -0,0 +1,40 @@
+import json
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from testapp.packages import TREES, export_tests
+
+
+class Command(BaseCommand):
+    help = "Testlarni to'liq daraxti bilan JSON paketga eksport qiladi (import_tests bilan yuklanadi)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", help="Fayl yo'li yoki '-' (stdout)")
+        parser.add_argument(
+            "--type", action="append", choices=sorted(TREES), dest="types",
+            help="Test turi (bir necha marta berish mumkin; standart — barchasi)",
+        )
+        parser.add_argument("--id", type=int, action="append", dest="ids", help="Faqat shu test id lari")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        package = None
+        for test_type in options["types"] or TREES:
+            part = export_tests(test_type, options["ids"])
+            if package is None:
+                package = part
+            else:
+                package["tests"].extend(part["tests"])
+                package["media"] = sorted(set(package["media"]) | set(part["media"]))
+
+        if options["output"] == "-":
+            json.dump(package, sys.stdout, ensure_ascii=False)
+        else:
+            with open(options["output"], "w", encoding="utf-8") as fileobj:
+                json.dump(package, fileobj, ensure_ascii=False)
+        self.stderr.write(self.style.SUCCESS(
+            f"{len(package['tests'])} ta test, {len(package['media'])} ta media havola "
+            f"({time.perf_counter() - started:.2f}s)"
+        ))
@@ -0,0 +1,45 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from testapp import similarity
+
+
+class Command(BaseCommand):
+    help = (
+        "Kontent bankidagi deyarli bir xil passage / savollar klasterlarini chiqaradi "
+        "(MinHash + LSH). Eskirgan imzolar qayta hisoblanadi, dublikat belgilari yangilanadi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--kind", action="append", choices=sorted(similarity.SOURCES),
+            help="Faqat shu turlar (bir necha marta berish mumkin)",
+        )
+        parser.add_argument(
+            "--threshold", type=float, default=similarity.THRESHOLD,
+            help=f"O'xshashlik bo'sag'asi, 0..1 (standart {similarity.THRESHOLD})",
+        )
+        parser.add_argument("--no-mark", action="store_true", help="duplicate_of belgilarini o'zgartirmaslik")
+
+    def handle(self, *args, **options):
+        total = 0
+        for kind in options["kind"] or similarity.SOURCES:
+            started = time.monotonic()
+            signatures = similarity.refresh_kind(kind)
+            groups = similarity.clusters(signatures, options["threshold"])
+            if not options["no_mark"]:
+                similarity.mark_duplicates(kind, groups)
+            elapsed = time.monotonic() - started
+
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"{kind}: {len(signatures)} ta obyekt, {len(groups)} ta klaster ({elapsed:.2f}s)"
+            ))
+            model, get_text, _ = similarity.SOURCES[kind]
+            ids = {pk for members in groups for pk, _ in members}
+            previews = {obj.pk: (get_text(obj) or "")[:60] for obj in model.objects.filter(pk__in=ids)}
+            for members in groups:
+                self.stdout.write("  " + ", ".join(f"#{pk} ({score:.0%})" for pk, score in members))
+                self.stdout.write(f"    {previews.get(members[0][0], '')!r}")
+            total += len(groups)
+        self.stdout.write(self.style.SUCCESS(f"Jami {total} ta dublikat klasteri."))
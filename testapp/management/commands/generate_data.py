@@ -0,0 +1,307 @@
+import random
+import time
+from datetime import date, datetime, time as dt_time, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from testapp import packages
+from testapp.models import Mock
+from testapp.versioning import bump_content_version
+from users import bands
+from users.models import User, TestResult, OverallScore
+from users.write_queue import result_writes
+
+
+# Matnlar shu so'zlardan yig'iladi — hajm va indekslash uchun real, ma'no uchun emas
+WORDS = (
+    "the of and to in is that for it as was with be by on not he this are or his from at which but have "
+    "an they you were her she there been one all we their has would when if so no will more can said "
+    "river city water island climate forest energy museum research students language history ancient "
+    "scientists population species ocean desert mountain village library transport railway festival "
+    "agriculture technology industry medicine bacteria evolution migration architecture economy tourism "
+    "pollution recycling rainfall temperature harvest settlement tradition survey evidence experiment "
+    "theory report century decade region coast valley harbour bridge tower castle garden market factory"
+).split()
+NAMES = (
+    "Aziz Bekzod Dilnoza Farrux Gulnora Jasur Kamola Laziz Madina Nodir Oydin Rustam Sardor Shahnoza "
+    "Temur Umida Zafar Zarina Akmal Barno Diyor Feruza Hasan Iroda Javohir Lola Mirzo Nilufar Otabek Sevara"
+).split()
+LAST_NAMES = (
+    "Karimov Rahimov Yusupov Tursunov Aliyev Saidov Nazarov Ergashev Qodirov Xolmatov Mirzayev Abdullayev "
+    "Usmonov Sobirov Ismoilov Hamidov Jo'rayev Normatov Rasulov Toshpulatov"
+).split()
+FIRST_EXAM_DAY = date(2024, 1, 6)  # shanba; imtihonlar har hafta
+
+
+class Generator:
+    """
+    Bitta seed dan bir xil ma'lumot. Daraxtlar test paketi formatida
+    (testapp/packages.py). stream — har bir qism (mock/user/result) o'z ketma-ketligi:
+    --results ni o'zgartirish Mock lar va foydalanuvchilarni o'zgartirmaydi.
+    """
+
+    def __init__(self, seed, stream):
+        self.rnd = random.Random(f"{seed}:{stream}")
+
+    def words(self, count):
+        return " ".join(self.rnd.choices(WORDS, k=count))
+
+    def sentence(self, low=6, high=14):
+        return self.words(self.rnd.randint(low, high)).capitalize() + "."
+
+    def text(self, sentences):
+        return " ".join(self.sentence() for _ in range(sentences))
+
+    def table(self, first, count):
+        """[[n]] joylari bilan jadval va ularning javoblari"""
+        return {
+            "columns": ["Item", "Details"],
+            "rows": [
+                {"row_data": [self.words(2).title(), f"{self.words(3)} [[{first + index}]]"], "order": index}
+                for index in range(count)
+            ],
+            "answers": [
+                {"number": first + index, "correct_answer": self.rnd.choice(WORDS)} for index in range(count)
+            ],
+        }
+
+    def questions(self, first, count):
+        """first..first+count-1 raqamli savollar; jadval bitta savol bo'lib bir nechta raqamni oladi"""
+        questions = []
+        number = first
+        last = first + count - 1
+        while number <= last:
+            kind = self.rnd.choice(("multiple_choice", "true_false_not_given", "sentence_completion",
+                                    "table_completion", "two_multiple_choice"))
+            question = {"question_type": kind, "question_number": number, "question_text": self.sentence()}
+            if kind == "table_completion":
+                size = min(self.rnd.randint(2, 4), last - number + 1)
+                question.update(question_text=None, correct_answer=[], table=self.table(number, size))
+                number += size
+            elif kind == "two_multiple_choice" and number < last:
+                question.update(options=[f"{letter}. {self.words(4)}" for letter in "ABCDE"],
+                                correct_answer=sorted(self.rnd.sample("ABCDE", 2)))
+                number += 2
+            elif kind == "true_false_not_given":
+                question["correct_answer"] = [self.rnd.choice(("TRUE", "FALSE", "NOT GIVEN"))]
+                number += 1
+            elif kind == "sentence_completion":
+                question["correct_answer"] = [self.rnd.choice(WORDS)]
+                number += 1
+            else:
+                question.update(question_type="multiple_choice",
+                                options=[f"{letter}. {self.words(4)}" for letter in "ABCD"],
+                                correct_answer=[self.rnd.choice("ABCD")])
+                number += 1
+            questions.append(question)
+        return questions
+
+    def reading(self, index):
+        return {
+            "type": "reading",
+            "title": f"Generated reading {index}",
+            "passages": [
+                {
+                    "title": self.words(4).title(),
+                    "text": self.text(self.rnd.randint(35, 50)),
+                    "order": order + 1,
+                    "questions": self.questions(first, count),
+                }
+                for order, (first, count) in enumerate(((1, 13), (14, 13), (27, 14)))
+            ],
+        }
+
+    def listening(self, index):
+        return {
+            "type": "listening",
+            "title": f"Generated listening {index}",
+            "sections": [
+                {
+                    "section_number": number,
+                    "instruction": self.sentence(),
+                    "questions": self.questions((number - 1) * 10 + 1, 10),
+                }
+                for number in range(1, 5)
+            ],
+        }
+
+    def speaking(self, index):
+        return {
+            "type": "speaking",
+            "title": f"Generated speaking {index}",
+            "part1": {
+                "topic": self.words(2).title(),
+                "questions": [{"question_text": self.sentence()[:-1] + "?"} for _ in range(4)],
+            },
+            "part2": {"topic": self.words(3).title(), "description": self.text(3)},
+            "part3": {
+                "topic": self.words(2).title(),
+                "questions": [{"question_text": self.sentence()[:-1] + "?"} for _ in range(4)],
+            },
+        }
+
+    def writing(self, index):
+        return {
+            "type": "writing",
+            "title": f"Generated writing {index}",
+            "task1": [{"question_text": self.text(3)}],
+            "task2": [{"question_text": self.text(4)}],
+        }
+
+    def user(self):
+        return User(
+            name=self.rnd.choice(NAMES),
+            last_name=self.rnd.choice(LAST_NAMES),
+            middle_name=self.rnd.choice(NAMES) + self.rnd.choice(("ovich", "ovna")),
+            phone=f"+99890{self.rnd.randrange(10 ** 7):07d}",
+        )
+
+    def result(self, user_id):
+        # Nomzod darajasi atrofida tarqalgan ballar
+        level = self.rnd.gauss(0.6, 0.18)
+
+        def correct():
+            return min(40, max(0, round(40 * (level + self.rnd.gauss(0, 0.08)))))
+
+        def score():
+            return Decimal(min(9, max(3, round((4 + 5 * level + self.rnd.gauss(0, 0.4)) * 2) / 2))).quantize(
+                Decimal("0.1")
+            )
+
+        return TestResult(
+            user_id=user_id,
+            reading_module=bands.GENERAL_READING if self.rnd.random() < 0.2 else bands.ACADEMIC_READING,
+            reading_correct_answers=correct(),
+            listening_correct_answers=correct(),
+            speaking_score=score(),
+            writing_score=score(),
+        )
+
+
+def _write_results(results, dated):
+    """TestResult + OverallScore (signalsiz) va test_date — bitta tranzaksiyada"""
+    with transaction.atomic():
+        TestResult.objects.bulk_create(results)
+        OverallScore.objects.bulk_create(
+            OverallScore(test_result=result, reading_band=reading, listening_band=listening, overall_band=overall)
+            for result, (reading, listening, overall) in zip(results, bands.compute_bands(results))
+        )
+        # test_date auto_now_add — natijalar sana bo'yicha tartiblangan, paketda 1-2 ta sana
+        for test_date, chunk in dated.items():
+            TestResult.objects.filter(pk__in=[result.pk for result in chunk]).update(test_date=test_date)
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark uchun sintetik ma'lumotlar: to'liq reading/listening/speaking/writing "
+        "daraxtli Mock lar ([[n]] jadvallari bilan), foydalanuvchilar va TestResult/OverallScore. "
+        "Hammasi bulk_create bilan paketlab yoziladi; bir xil --seed bir xil ma'lumot beradi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--mocks", type=int, default=10)
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--results", type=int, default=10000, help="TestResult soni (yangi foydalanuvchilar orasida)")
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--chunk-size", type=int, default=5000, help="Foydalanuvchi/natija paketi")
+        parser.add_argument("--mocks-per-chunk", type=int, default=20)
+        parser.add_argument("--exam-days", type=int, default=104, help=f"Natijalar {FIRST_EXAM_DAY} dan boshlab shuncha haftaga")
+        parser.add_argument("--activate", action="store_true", help="Oxirgi Mock ni bugun uchun aktiv qilish")
+
+    def handle(self, *args, **options):
+        self.seed = options["seed"]
+        started = time.monotonic()
+        mocks = self.generate_mocks(options["mocks"], options["mocks_per_chunk"], options["activate"])
+        users = self.generate_users(options["users"], options["chunk_size"])
+        results = self.generate_results(options["results"], users, options["chunk_size"], options["exam_days"])
+        self.stdout.write(self.style.SUCCESS(
+            f"{mocks} ta Mock, {len(users)} ta foydalanuvchi, {results} ta natija "
+            f"({time.monotonic() - started:.1f}s)."
+        ))
+
+    def progress(self, label, done, total, started):
+        elapsed = time.monotonic() - started
+        self.stdout.write(f"{label}: {done}/{total} ({done / elapsed if elapsed else 0:.0f}/s)")
+
+    # ============ MOCK LAR ===============
+    def generate_mocks(self, count, per_chunk, activate):
+        generator = Generator(self.seed, "mocks")
+        number = (Mock.objects.order_by("-number").values_list("number", flat=True).first() or 0) + 1
+        started = time.monotonic()
+        mock = None
+        for start in range(0, count, per_chunk):
+            indexes = range(start, min(start + per_chunk, count))
+            package = {
+                "format": packages.FORMAT,
+                "version": packages.VERSION,
+                "tests": [
+                    test for index in indexes for test in (
+                        generator.reading(index), generator.listening(index),
+                        generator.speaking(index), generator.writing(index),
+                    )
+                ],
+            }
+            with transaction.atomic():
+                report = packages.import_package(package, check_media=False)
+                created = Mock.objects.bulk_create(
+                    Mock(
+                        title=f"Generated mock {index}",
+                        number=number + index,
+                        status="inactive",
+                        exam_date=FIRST_EXAM_DAY + timedelta(weeks=index),
+                    )
+                    for index in indexes
+                )
+                # import_package tartibi: har bir Mock uchun reading, listening, speaking, writing
+                for offset, field_name in enumerate(("reading_tests", "listening_tests", "speaking_tests", "writing_tests")):
+                    field = Mock._meta.get_field(field_name)
+                    through = field.remote_field.through
+                    through.objects.bulk_create(
+                        through(**{field.m2m_field_name(): mock, field.m2m_reverse_field_name(): test})
+                        for mock, (_, test) in zip(created, report.tests[offset::4])
+                    )
+                bump_content_version()  # through bulk_create m2m_changed yubormaydi
+            mock = created[-1]
+            self.progress("Mock", indexes.stop, count, started)
+
+        if activate and mock is not None:
+            Mock.objects.filter(status="active").update(status="inactive")
+            Mock.objects.filter(pk=mock.pk).update(status="active", exam_date=timezone.localdate())
+            bump_content_version()
+        return count
+
+    # ============ FOYDALANUVCHILAR VA NATIJALAR ===============
+    def generate_users(self, count, chunk_size):
+        generator = Generator(self.seed, "users")
+        ids = []
+        started = time.monotonic()
+        for start in range(0, count, chunk_size):
+            users = [generator.user() for _ in range(min(chunk_size, count - start))]
+            for user in users:
+                user.set_search_keys()  # bulk_create save() ni chaqirmaydi
+            ids.extend(user.pk for user in result_writes.run(User.objects.bulk_create, users))
+            self.progress("User", len(ids), count, started)
+        return ids
+
+    def generate_results(self, count, user_ids, chunk_size, exam_days):
+        if count and not user_ids:
+            raise CommandError("Natijalar uchun --users > 0 bo'lishi kerak.")
+        tz = timezone.get_current_timezone()
+        days = [
+            datetime.combine(FIRST_EXAM_DAY + timedelta(weeks=week), dt_time(9), tzinfo=tz)
+            for week in range(exam_days)
+        ]
+        generator = Generator(self.seed, "results")
+        started = time.monotonic()
+        for start in range(0, count, chunk_size):
+            results, dated = [], {}
+            for index in range(start, min(start + chunk_size, count)):
+                result = generator.result(generator.rnd.choice(user_ids))
+                results.append(result)
+                dated.setdefault(days[index * exam_days // count], []).append(result)
+            result_writes.run(_write_results, results, dated)
+            self.progress("TestResult", start + len(results), count, started)
+        return count
@@ -0,0 +1,48 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from testapp.packages import PackageError, import_package
+
+
+class Command(BaseCommand):
+    help = (
+        "export_tests paketini yuklaydi: avval to'liq tekshiradi, keyin bitta "
+        "tranzaksiyada bulk_create qiladi. Xato bo'lsa hech narsa yozilmaydi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--dry-run", action="store_true", help="Tekshirish va yozish, keyin rollback")
+        parser.add_argument("--skip-media-check", action="store_true", help="Media fayllar borligini tekshirmaslik")
+        parser.add_argument("--show-errors", type=int, default=50, help="Nechta xatoni chiqarish")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            with open(options["path"], encoding="utf-8") as fileobj:
+                package = json.load(fileobj)
+        except (OSError, ValueError) as exc:
+            raise CommandError(str(exc))
+
+        try:
+            report = import_package(
+                package, check_media=not options["skip_media_check"], dry_run=options["dry_run"]
+            )
+        except PackageError as exc:
+            for message in exc.errors[:options["show_errors"]]:
+                self.stderr.write(message)
+            if len(exc.errors) > options["show_errors"]:
+                self.stderr.write(f"... yana {len(exc.errors) - options['show_errors']} ta xato")
+            raise CommandError(str(exc))
+
+        for model_name, count in report.counts.items():
+            self.stdout.write(f"{model_name}: {count}")
+        prefix = "[dry-run] " if options["dry_run"] else ""
+        self.stdout.write(self.style.SUCCESS(f"{prefix}{report} ({time.perf_counter() - started:.2f}s)"))
+        if not options["dry_run"]:
+            self.stdout.write(
+                "Eslatma: dublikat belgilari, rasm variantlari va audio segmentlar uchun "
+                "find_near_duplicates, build_image_variants va build_audio_segments ni ishga tushiring."
+            )
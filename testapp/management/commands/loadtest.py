@@ -0,0 +1,372 @@
+import json
+import math
+import os
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from testapp.management.commands.check_query_budgets import build_exam
+from testapp.models import Mock
+from users.models import User
+
+
+# Imtihon kunidagi so'rovlar aralashmasi: {nom: og'irlik}
+MIX = {
+    "reading-list": 10,
+    "listening-list": 10,
+    "speaking-list": 5,
+    "writing-list": 5,
+    "reading-passages": 15,
+    "reading-passage": 20,
+    "listening-section": 20,
+    "media-range": 10,
+    "submit": 5,
+}
+GET_ENDPOINTS = [name for name in MIX if name not in ("media-range", "submit")]
+RANGE_CHUNK = 64 * 1024
+BROWSER_HEADERS = {"HTTP_ACCEPT_ENCODING": "gzip, deflate, br"}
+BASELINE_FORMAT = "loadtest-baseline"
+MIN_DELTA = 0.005  # p95 dagi bundan kichik farq — shovqin (s)
+
+
+def percentile(values, p):
+    """Nearest-rank percentil (values saralangan)"""
+    if not values:
+        return None
+    return values[max(0, math.ceil(p / 100 * len(values)) - 1)]
+
+
+def media_paths(data, found):
+    """JSON javobdagi MEDIA_URL ostidagi barcha yo'llar (absolyut URL lar ham)"""
+    if isinstance(data, dict):
+        for value in data.values():
+            media_paths(value, found)
+    elif isinstance(data, list):
+        for value in data:
+            media_paths(value, found)
+    elif isinstance(data, str):
+        path = urlparse(data).path
+        if path.startswith(settings.MEDIA_URL):
+            found.add(path)
+    return found
+
+
+class Scenario:
+    """Mock bo'yicha nomzod so'rovlari: request(nom, client, rnd) -> response"""
+
+    def __init__(self, mock, user):
+        self.reading = [pk for pk, in mock.reading_tests.values_list("pk")]
+        self.listening = [pk for pk, in mock.listening_tests.values_list("pk")]
+        self.passages = list(
+            mock.reading_tests.filter(passages__isnull=False).values_list("pk", "passages__order")
+        )
+        self.sections = list(
+            mock.listening_tests.filter(sections__isnull=False).values_list("pk", "sections__section_number")
+        )
+        self.user = user
+        self.media = []  # [(yo'l, hajm)]
+        self.weights = dict(MIX)
+
+    def url(self, name, rnd):
+        if name.endswith("-list"):
+            return reverse(f"mocks-{name}")
+        if name == "reading-passages":
+            return reverse("mocks-reading-passages", kwargs={"test_id": rnd.choice(self.reading)})
+        if name == "reading-passage":
+            test_id, order = rnd.choice(self.passages)
+            return reverse("mocks-reading-single-passage", kwargs={"test_id": test_id, "order": order})
+        test_id, number = rnd.choice(self.sections)
+        return reverse("mocks-listening-section-detail", kwargs={"test_id": test_id, "section_number": number})
+
+    def request(self, name, client, rnd):
+        if name == "media-range":
+            path, size = rnd.choice(self.media)
+            start = rnd.randrange(0, max(1, size - RANGE_CHUNK))
+            return client.get(path, secure=True, HTTP_RANGE=f"bytes={start}-{start + RANGE_CHUNK - 1}")
+        if name == "submit":
+            answers = {str(number): rnd.choice("ABCD") for number in range(1, 41)}
+            return client.post(reverse("answer-sheet-list"), {
+                "user": self.user.pk,
+                "reading_test": rnd.choice(self.reading) if self.reading else None,
+                "listening_test": rnd.choice(self.listening) if self.listening else None,
+                "reading_answers": answers,
+                "listening_answers": answers,
+            }, content_type="application/json", secure=True)
+        return client.get(self.url(name, rnd), secure=True, **BROWSER_HEADERS)
+
+    def prepare(self, client, submit=True):
+        """
+        Har bir GET endpoint bir marta chaqiriladi (kesh isiydi), javoblardagi
+        media Range bilan tekshiriladi. Ma'lumoti yo'q so'rovlar aralashmadan chiqadi.
+        """
+        available = {
+            "reading-passages": bool(self.reading),
+            "reading-passage": bool(self.passages),
+            "listening-section": bool(self.sections),
+            "submit": submit and bool(self.reading or self.listening),
+        }
+        found = set()
+        rnd = random.Random(0)
+        for name in GET_ENDPOINTS:
+            if not available.get(name, True):
+                continue
+            response = client.get(self.url(name, rnd), secure=True)
+            if response.status_code != 200:
+                raise CommandError(f"{name} -> HTTP {response.status_code}")
+            media_paths(json.loads(response.content), found)
+        for path in sorted(found):
+            response = client.get(path, secure=True, HTTP_RANGE="bytes=0-0")
+            if response.status_code == 206:
+                self.media.append((path, int(response["Content-Range"].rsplit("/", 1)[1])))
+        available["media-range"] = bool(self.media)
+        self.weights = {name: weight for name, weight in MIX.items() if available.get(name, True)}
+
+
+class Command(BaseCommand):
+    help = (
+        "Imtihon kunini simulyatsiya qiladi: har bir thread — nomzod, Django test Client "
+        "orqali bo'lim ro'yxatlari, passage/section, media Range va javob varaqasi yuborish "
+        "aralashmasini bosqichma-bosqich oshadigan parallellikda yuboradi. Har bosqich uchun "
+        "p50/p95/p99, throughput, xatolar ulushi va so'rovdagi SQL soni chiqariladi. "
+        "Bitta process (GIL) — raqamlar yuqori chegara emas, ishga tushirishlarni solishtirish uchun."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50],
+                            help="Bosqichlar: parallel nomzodlar (thread) soni")
+        parser.add_argument("--duration", type=float, default=10.0, help="Har bir bosqich davomiyligi (s)")
+        parser.add_argument(
+            "--seed", action="store_true",
+            help="Vaqtinchalik aktiv Mock yaratib, oxirida o'chiradi (faqat backend.settings_loadtest bilan)",
+        )
+        parser.add_argument("--scale", type=int, default=3, help="--seed dagi savollar soni koeffitsienti")
+        parser.add_argument(
+            "--no-submit", action="store_true",
+            help="Javob varaqasi yubormaslik (faqat o'qish — alohida bazasiz ishlatish mumkin)",
+        )
+        parser.add_argument("--random-seed", type=int, default=1)
+        parser.add_argument("--output", help="Natijani JSON baseline sifatida saqlash")
+        parser.add_argument("--baseline", help="Oldingi JSON bilan solishtirish")
+        parser.add_argument("--tolerance", type=float, default=20.0,
+                            help="p95 va throughput uchun ruxsat etilgan yomonlashuv (%%)")
+
+    # ============ MA'LUMOT ===============
+    def seed(self, scale):
+        with transaction.atomic():
+            previous = list(Mock.objects.filter(status="active").values_list("pk", flat=True))
+            mock = build_exam(scale)
+            # Media Range uchun siqilmaydigan "audio"
+            section = mock.listening_tests.get().sections.get(section_number=1)
+            section.audio_file.save("loadtest.mp3", ContentFile(os.urandom(2 * 1024 * 1024)))
+        return mock, previous
+
+    def unseed(self, mock, previous):
+        names = [
+            name for name in mock.listening_tests.values_list("sections__audio_file", flat=True) if name
+        ]
+        with transaction.atomic():
+            for field_name in ("reading_tests", "listening_tests", "speaking_tests", "writing_tests"):
+                getattr(mock, field_name).all().delete()
+            mock.delete()
+            Mock.objects.filter(pk__in=previous).update(status="active")
+        # storage.delete() cas/ fayllarni o'chirmaydi; tasodifiy "audio" faqat seed niki
+        for name in names:
+            path = default_storage.path(name)
+            if os.path.exists(path):
+                os.remove(path)
+
+    # ============ YUKLAMA ===============
+    def worker(self, scenario, seed, duration, barrier, samples):
+        rnd = random.Random(seed)
+        client = Client(raise_request_exception=False)
+        names, weights = list(scenario.weights), list(scenario.weights.values())
+        queries = 0
+
+        def count(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        try:
+            with connection.execute_wrapper(count):
+                barrier.wait()
+                deadline = time.monotonic() + duration
+                while time.monotonic() < deadline:
+                    name = rnd.choices(names, weights)[0]
+                    queries = 0
+                    start = time.perf_counter()
+                    try:
+                        status = scenario.request(name, client, rnd).status_code
+                    except Exception:
+                        status = 0  # masalan "database is locked"
+                    samples.append((name, time.perf_counter() - start, status, queries))
+        finally:
+            connections.close_all()  # thread ning o'z ulanishlari
+
+    def run_stage(self, scenario, concurrency, duration):
+        barrier = threading.Barrier(concurrency + 1)
+        outputs = [[] for _ in range(concurrency)]
+        threads = [
+            threading.Thread(
+                target=self.worker,
+                args=(scenario, self.random_seed * 1000003 + concurrency * 1009 + index, duration, barrier, samples),
+                daemon=True,
+            )
+            for index, samples in enumerate(outputs)
+        ]
+        for thread in threads:
+            thread.start()
+        barrier.wait()
+        started = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        return summarize(concurrency, elapsed, [sample for samples in outputs for sample in samples])
+
+    def handle(self, *args, **options):
+        self.random_seed = options["random_seed"]
+        baseline = None
+        if options["baseline"]:
+            with open(options["baseline"]) as fileobj:
+                baseline = json.load(fileobj)
+            if baseline.get("format") != BASELINE_FORMAT:
+                raise CommandError(f"{options['baseline']}: '{BASELINE_FORMAT}' fayli emas.")
+
+        # --seed aktiv Mock ni almashtiradi, javob yuborish esa nomzod va varaqalar
+        # yaratadi (to'xtatilgan run ning varaqalarini grade_pending haqiqiy deb baholaydi)
+        submit = not options["no_submit"]
+        if (options["seed"] or submit) and not getattr(settings, "LOADTEST_DATABASE", False):
+            raise CommandError(
+                "--seed va javob yuborish bazaga yozadi — faqat alohida baza bilan "
+                "(DJANGO_SETTINGS_MODULE=backend.settings_loadtest) yoki --no-submit bilan."
+            )
+        seeded = None
+        if options["seed"]:
+            seeded = self.seed(options["scale"])
+            mock = seeded[0]
+        else:
+            # exam endpointlari faqat aktiv Mock ni beradi
+            mock = Mock.objects.filter(status="active").first()
+            if mock is None:
+                raise CommandError("Aktiv Mock yo'q — yarating yoki --seed bilan ishga tushiring.")
+        user = User.objects.create(name="Loadtest", last_name="Candidate", phone="000") if submit else None
+
+        stages = []
+        try:
+            scenario = Scenario(mock, user)
+            scenario.prepare(Client(), submit=submit)
+            self.stdout.write(
+                f"Mock #{mock.pk} \"{mock.title}\", aralashma: "
+                + ", ".join(f"{name}={weight}" for name, weight in scenario.weights.items())
+            )
+            for concurrency in options["concurrency"]:
+                stage = self.run_stage(scenario, concurrency, options["duration"])
+                stages.append(stage)
+                self.report(stage)
+        finally:
+            if user is not None:
+                user.delete()  # yuborilgan javob varaqalari ham (CASCADE)
+            if seeded:
+                self.unseed(*seeded)
+
+        result = {
+            "format": BASELINE_FORMAT,
+            "created_at": timezone.now().isoformat(),
+            "database": connection.vendor,
+            "async_views": settings.ASYNC_EXAM_VIEWS,
+            "duration": options["duration"],
+            "mix": scenario.weights,
+            "stages": stages,
+        }
+        if options["output"]:
+            with open(options["output"], "w") as fileobj:
+                json.dump(result, fileobj, indent=2)
+            self.stdout.write(f"Natija {options['output']} ga yozildi.")
+        if baseline is not None:
+            regressions = compare(baseline, result, options["tolerance"])
+            if regressions:
+                raise CommandError("Baseline ga nisbatan yomonlashuv:\n" + "\n".join(regressions))
+            self.stdout.write(self.style.SUCCESS(f"Baseline doirasida (±{options['tolerance']:g}%)."))
+
+    def report(self, stage):
+        self.stdout.write(
+            f"\n== {stage['concurrency']} parallel: {stage['requests']} so'rov, "
+            f"{stage['throughput']:.1f} so'rov/s, xatolar {stage['error_rate'] * 100:.2f}%"
+        )
+        self.stdout.write(f"{'endpoint':20} {'soni':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'xato':>5} {'SQL':>5}")
+        for name, data in stage["endpoints"].items():
+            self.stdout.write(
+                f"{name:20} {data['count']:>6} {data['p50'] * 1000:>8.1f} {data['p95'] * 1000:>8.1f} "
+                f"{data['p99'] * 1000:>8.1f} {data['errors']:>5} {data['queries']:>5.1f}"
+            )
+
+
+def summarize(concurrency, elapsed, samples):
+    """Bosqich natijasi (JSON ga yoziladigan dict); vaqtlar sekundda"""
+    by_name = {}
+    for name, latency, status, queries in samples:
+        by_name.setdefault(name, []).append((latency, status, queries))
+    endpoints = {}
+    for name in MIX:
+        rows = by_name.get(name)
+        if not rows:
+            continue
+        latencies = sorted(row[0] for row in rows)
+        endpoints[name] = {
+            "count": len(rows),
+            "errors": sum(1 for row in rows if not 200 <= row[1] < 400),
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "queries": sum(row[2] for row in rows) / len(rows),
+        }
+    latencies = sorted(sample[1] for sample in samples)
+    errors = sum(data["errors"] for data in endpoints.values())
+    return {
+        "concurrency": concurrency,
+        "elapsed": elapsed,
+        "requests": len(samples),
+        "throughput": len(samples) / elapsed if elapsed else 0.0,
+        "error_rate": errors / len(samples) if samples else 0.0,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "endpoints": endpoints,
+    }
+
+
+def compare(baseline, current, tolerance):
+    """Bir xil parallellikdagi bosqichlar bo'yicha yomonlashuvlar ro'yxati"""
+    factor = 1 + tolerance / 100
+    previous = {stage["concurrency"]: stage for stage in baseline["stages"]}
+    regressions = []
+    for stage in current["stages"]:
+        old = previous.get(stage["concurrency"])
+        if old is None:
+            continue
+        prefix = f"{stage['concurrency']} parallel"
+        if stage["throughput"] * factor < old["throughput"]:
+            regressions.append(f"{prefix}: throughput {old['throughput']:.1f} -> {stage['throughput']:.1f} so'rov/s")
+        if stage["error_rate"] > old["error_rate"] + 0.01:
+            regressions.append(f"{prefix}: xatolar {old['error_rate']:.2%} -> {stage['error_rate']:.2%}")
+        for name, data in stage["endpoints"].items():
+            before = old["endpoints"].get(name)
+            if before is None:
+                continue
+            if data["p95"] > before["p95"] * factor and data["p95"] - before["p95"] > MIN_DELTA:
+                regressions.append(
+                    f"{prefix} {name}: p95 {before['p95'] * 1000:.1f} -> {data['p95'] * 1000:.1f} ms"
+                )
+            if data["queries"] > before["queries"] + 0.5:
+                regressions.append(f"{prefix} {name}: SQL {before['queries']:.1f} -> {data['queries']:.1f}")
+    return regressions
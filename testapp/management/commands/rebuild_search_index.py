@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from testapp import search
+
+
+class Command(BaseCommand):
+    help = (
+        "Kontent qidiruvi indeksini (FTS5) noldan quradi. Odatda indeks signallar "
+        "orqali yangilanadi; bu buyruq birinchi o'rnatishda yoki import dan keyin kerak."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--kind", action="append", choices=sorted(search.SOURCES),
+            help="Faqat shu turlarni qayta indekslash (bir necha marta berish mumkin)",
+        )
+
+    def handle(self, *args, **options):
+        if not search.enabled():
+            raise CommandError("To'liq matnli qidiruv faqat SQLite (FTS5) bilan ishlaydi.")
+        with transaction.atomic():
+            counts = search.rebuild(options["kind"])
+        for kind, count in counts:
+            self.stdout.write(f"{kind}: {count}")
+        self.stdout.write(self.style.SUCCESS(f"Indekslandi: {sum(count for _, count in counts)} ta obyekt."))
@@ -0,0 +1,84 @@
+import os
+import time
+
+from django.apps import apps
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import models, transaction
+
+from backend.storage import CAS_PREFIX, is_content_addressed
+from testapp.models import ImageVariant
+from testapp.versioning import bump_content_version
+
+
+def file_fields():
+    """[(model, field_name)] — barcha app lardagi FileField/ImageField lar"""
+    return [
+        (model, field.name)
+        for model in apps.get_models()
+        for field in model._meta.get_fields()
+        if isinstance(field, models.FileField)
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Eski (papka/nom bo'yicha saqlangan) media fayllarni kontent xeshi bo'yicha "
+        "nomlanadigan cas/ storage ga ko'chiradi. --prune ishlatilmayotgan cas fayllarni o'chiradi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--prune", action="store_true")
+        parser.add_argument(
+            "--grace", type=int, default=3600,
+            help="--prune: shu soniyadan yangi fayllarga tegmaslik (hali saqlanayotgan yuklashlar)",
+        )
+
+    def handle(self, *args, **options):
+        renamed = {}
+        for model, field_name in file_fields():
+            rows = (
+                model._default_manager.exclude(**{field_name: ""}).exclude(**{f"{field_name}__isnull": True})
+                .exclude(**{f"{field_name}__startswith": CAS_PREFIX})
+                .values_list("pk", field_name)
+            )
+            for pk, name in rows.iterator():
+                if name not in renamed:
+                    if not default_storage.exists(name):
+                        self.stderr.write(f"{model.__name__}#{pk}.{field_name}: {name} topilmadi")
+                        continue
+                    with default_storage.open(name, "rb") as content:
+                        renamed[name] = default_storage.save(name, content)
+                model._default_manager.filter(pk=pk).update(**{field_name: renamed[name]})
+
+        with transaction.atomic():
+            for old, new in renamed.items():
+                ImageVariant.objects.filter(source=old).update(source=new)
+            if renamed:
+                bump_content_version()
+        for old in renamed:
+            default_storage.delete(old)  # barcha havolalar endi cas/ ga ishora qiladi
+        self.stdout.write(self.style.SUCCESS(f"{len(renamed)} ta fayl cas/ ga ko'chirildi."))
+
+        if options["prune"]:
+            self.prune(options["grace"])
+
+    def prune(self, grace):
+        referenced = set()
+        for model, field_name in file_fields():
+            referenced.update(
+                model._default_manager.filter(**{f"{field_name}__startswith": CAS_PREFIX})
+                .values_list(field_name, flat=True)
+            )
+
+        root = default_storage.path(CAS_PREFIX)
+        cutoff = time.time() - grace
+        removed = 0
+        for directory, _, filenames in os.walk(root):
+            for filename in filenames:
+                path = os.path.join(directory, filename)
+                name = os.path.relpath(path, default_storage.location).replace(os.sep, "/")
+                if name not in referenced and os.path.getmtime(path) < cutoff and is_content_addressed(name):
+                    os.remove(path)
+                    removed += 1
+        self.stdout.write(f"{removed} ta ishlatilmayotgan cas fayl o'chirildi.")
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.4 on 2026-10-18 12:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('testapp', '0016_remove_writingtask1_sample_answer_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='audiosection',
+            name='segment_file',
+            field=models.FileField(blank=True, editable=False, null=True, upload_to='listening/segments/'),
+        ),
+        migrations.AddField(
+            model_name='audiosection',
+            name='segment_size',
+            field=models.PositiveBigIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='audiosection',
+            name='segment_duration',
+            field=models.DurationField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='audiosection',
+            name='segment_source',
+            field=models.CharField(blank=True, default='', editable=False, max_length=40),
+        ),
+    ]
@@ -0,0 +1,30 @@
+from django.db import migrations
+
+
+CREATE_SQL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS testapp_search USING fts5("
+    "kind UNINDEXED, object_id UNINDEXED, title, body, "
+    "tokenize = 'unicode61 remove_diacritics 2')"
+)
+
+
+def create_index(apps, schema_editor):
+    # FTS5 faqat SQLite da; boshqa bazalarda qidiruv o'chirilgan
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(CREATE_SQL)
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS testapp_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('testapp', '0018_imagevariant'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
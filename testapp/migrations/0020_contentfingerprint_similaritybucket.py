@@ -0,0 +1,41 @@
+# Generated by Django 5.2.4 on 2026-10-18 15:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('testapp', '0019_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContentFingerprint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('passage', 'Passage'), ('speaking_part1', 'Speaking Part 1 savoli'), ('speaking_part3', 'Speaking Part 3 savoli'), ('writing_task1', 'Writing Task 1'), ('writing_task2', 'Writing Task 2')], max_length=20)),
+                ('object_id', models.PositiveIntegerField()),
+                ('text_hash', models.CharField(max_length=40)),
+                ('signature', models.BinaryField()),
+                ('duplicate_of', models.PositiveIntegerField(blank=True, null=True)),
+                ('similarity', models.FloatField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'unique_together': {('kind', 'object_id')},
+            },
+        ),
+        migrations.CreateModel(
+            name='SimilarityBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=20)),
+                ('bucket', models.CharField(max_length=40)),
+                ('object_id', models.PositiveIntegerField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', 'bucket'], name='similarity_bucket_idx'), models.Index(fields=['kind', 'object_id'], name='similarity_object_idx')],
+            },
+        ),
+    ]
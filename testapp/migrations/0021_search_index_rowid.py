@@ -0,0 +1,46 @@
+from django.db import migrations
+
+
+# search.KIND_IDS ning shu migratsiya vaqtidagi nusxasi
+KIND_IDS = {
+    "passage": 1,
+    "reading_question": 2,
+    "listening_question": 3,
+    "speaking_part1": 4,
+    "speaking_part2": 5,
+    "speaking_part3": 6,
+    "writing_task1": 7,
+    "writing_task2": 8,
+}
+COLUMNS = (
+    "kind UNINDEXED, object_id UNINDEXED, title, body, "
+    "tokenize = 'unicode61 remove_diacritics 2'"
+)
+
+
+def rekey_index(apps, schema_editor):
+    """Qatorlarni rowid = object_id * 16 + KIND_IDS[kind] bilan qayta yozadi"""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    kind_id = " ".join(f"WHEN '{kind}' THEN {number}" for kind, number in KIND_IDS.items())
+    schema_editor.execute(f"CREATE VIRTUAL TABLE testapp_search_new USING fts5({COLUMNS})")
+    # Har bir (kind, object_id) uchun oxirgi yozilgan qator qoladi
+    schema_editor.execute(
+        "INSERT INTO testapp_search_new (rowid, kind, object_id, title, body) "
+        f"SELECT object_id * 16 + CASE kind {kind_id} END, kind, object_id, title, body "
+        "FROM testapp_search WHERE rowid IN (SELECT MAX(rowid) FROM testapp_search GROUP BY kind, object_id) "
+        f"AND kind IN ({', '.join(repr(kind) for kind in KIND_IDS)})"
+    )
+    schema_editor.execute("DROP TABLE testapp_search")
+    schema_editor.execute("ALTER TABLE testapp_search_new RENAME TO testapp_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('testapp', '0020_contentfingerprint_similaritybucket'),
+    ]
+
+    operations = [
+        migrations.RunPython(rekey_index, migrations.RunPython.noop),
+    ]
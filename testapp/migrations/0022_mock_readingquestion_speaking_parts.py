@@ -0,0 +1,131 @@
+# Generated by Django 5.2.4 on 2026-10-18 13:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('testapp', '0021_search_index_rowid'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='listeningquestion',
+            name='correct_answer',
+            field=models.JSONField(help_text="Correct answer(s). Example: ['B'] or ['A','C'] for two_multiple_choice"),
+        ),
+        migrations.AlterField(
+            model_name='listeningquestion',
+            name='options',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='listeningquestion',
+            name='question_text',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='listeningquestion',
+            name='question_type',
+            field=models.CharField(choices=[('multiple_choice', 'Multiple Choice'), ('table_completion', 'Table Completion'), ('map_labelling', 'Map Labelling'), ('sentence_completion', 'Sentence Completion'), ('two_multiple_choice', 'Two Multiple Choice'), ('true_false_not_given', 'True/False/Not Given'), ('matching_headings', 'Matching Headings')], max_length=50),
+        ),
+        migrations.CreateModel(
+            name='Mock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=255)),
+                ('number', models.PositiveIntegerField(unique=True)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('active', 'Active'), ('inactive', 'Inactive')], default='pending', max_length=20)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('duration_minutes', models.PositiveIntegerField(default=120)),
+                ('exam_date', models.DateField(help_text='Imtihon sanasi. Faqat shu kunda aktiv bo‘ladi.')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('listening_tests', models.ManyToManyField(blank=True, related_name='mocks', to='testapp.listeningtest')),
+                ('reading_tests', models.ManyToManyField(blank=True, related_name='mocks', to='testapp.readingtest')),
+                ('speaking_tests', models.ManyToManyField(blank=True, related_name='mocks', to='testapp.speakingtest')),
+                ('writing_tests', models.ManyToManyField(blank=True, related_name='mocks', to='testapp.writingtest')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ReadingQuestion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('instruction', models.TextField(blank=True, null=True)),
+                ('question_type', models.CharField(choices=[('multiple_choice', 'Multiple Choice'), ('true_false_not_given', 'True/False/Not Given'), ('matching_headings', 'Matching Headings'), ('sentence_completion', 'Sentence Completion'), ('diagram_labeling', 'Diagram Labeling'), ('table_completion', 'Table Completion'), ('two_multiple_choice', 'Two Multiple Choice')], max_length=50)),
+                ('question_text', models.TextField(blank=True, null=True)),
+                ('question_number', models.PositiveIntegerField(help_text='Question number in the test')),
+                ('options', models.JSONField(blank=True, null=True)),
+                ('diagram_labels', models.ImageField(blank=True, null=True, upload_to='reading/diagram_labels/')),
+                ('paragraph_mapping', models.JSONField(blank=True, null=True)),
+                ('correct_answer', models.JSONField(help_text="Correct answer(s). Example: ['A'] or ['A','C'] for two_multiple_choice")),
+                ('passage', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reading_questions', to='testapp.passage')),
+            ],
+            options={
+                'ordering': ['question_number'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ReadingTable',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('columns', models.JSONField(help_text='List of column headers')),
+                ('question', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='table', to='testapp.readingquestion')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ReadingTableAnswer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.PositiveIntegerField(help_text='The number inside [[n]]')),
+                ('correct_answer', models.CharField(max_length=255)),
+                ('table', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='answers', to='testapp.readingtable')),
+            ],
+            options={
+                'unique_together': {('table', 'number')},
+            },
+        ),
+        migrations.CreateModel(
+            name='ReadingTableRow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('row_data', models.JSONField(help_text='List of row items, include [[n]] where needed')),
+                ('order', models.PositiveIntegerField(default=0)),
+                ('table', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rows', to='testapp.readingtable')),
+            ],
+            options={
+                'ordering': ['order'],
+            },
+        ),
+        migrations.CreateModel(
+            name='SpeakingPart1',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('topic', models.CharField(max_length=255)),
+                ('test', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='part1', to='testapp.speakingtest')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SpeakingPart3',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('topic', models.CharField(max_length=255)),
+                ('test', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='part3', to='testapp.speakingtest')),
+            ],
+        ),
+        # Eski savollar 0023 da ko'chiriladi, keyin 0024 da NOT NULL bo'ladi
+        migrations.AddField(
+            model_name='speakingpart1question',
+            name='part1',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='questions', to='testapp.speakingpart1'),
+        ),
+        migrations.AddField(
+            model_name='speakingpart3question',
+            name='part3',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='questions', to='testapp.speakingpart3'),
+        ),
+    ]
@@ -0,0 +1,54 @@
+from django.db import migrations
+
+
+def move_questions(apps, schema_editor):
+    """Eski Question va test ga bog'langan speaking savollarini yangi modellarga ko'chiradi"""
+    Question = apps.get_model('testapp', 'Question')
+    ReadingQuestion = apps.get_model('testapp', 'ReadingQuestion')
+    SpeakingTest = apps.get_model('testapp', 'SpeakingTest')
+    SpeakingPart1 = apps.get_model('testapp', 'SpeakingPart1')
+    SpeakingPart3 = apps.get_model('testapp', 'SpeakingPart3')
+    SpeakingPart1Question = apps.get_model('testapp', 'SpeakingPart1Question')
+    SpeakingPart3Question = apps.get_model('testapp', 'SpeakingPart3Question')
+    SpeakingPart2CueCard = apps.get_model('testapp', 'SpeakingPart2CueCard')
+
+    # diagram_labels endi rasm fayli, summary_text esa yo'q — ular ko'chirilmaydi
+    ReadingQuestion.objects.bulk_create(
+        ReadingQuestion(
+            passage_id=question.passage_id,
+            instruction=question.instruction,
+            question_type=question.question_type,
+            question_text=question.question_text,
+            question_number=question.question_number,
+            options=question.options,
+            paragraph_mapping=question.paragraph_mapping,
+            correct_answer=question.correct_answer,
+        )
+        for question in Question.objects.order_by('pk').iterator()
+    )
+
+    for part_model, question_model, field in (
+        (SpeakingPart1, SpeakingPart1Question, 'part1'),
+        (SpeakingPart3, SpeakingPart3Question, 'part3'),
+    ):
+        for test in SpeakingTest.objects.filter(pk__in=question_model.objects.values('test_id')):
+            questions = question_model.objects.filter(test=test).order_by('pk')
+            title = next((q.title for q in questions if q.title), '') or test.title
+            part = part_model.objects.create(test=test, topic=title[:255])
+            questions.update(**{field: part})
+
+    # Cue card endi OneToOne: har bir test uchun birinchisi qoladi
+    for test_id in SpeakingTest.objects.values_list('pk', flat=True):
+        extra = SpeakingPart2CueCard.objects.filter(test_id=test_id).order_by('pk').values_list('pk', flat=True)[1:]
+        SpeakingPart2CueCard.objects.filter(pk__in=list(extra)).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('testapp', '0022_mock_readingquestion_speaking_parts'),
+    ]
+
+    operations = [
+        migrations.RunPython(move_questions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.4 on 2026-10-18 13:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('testapp', '0023_move_speaking_and_reading_questions'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='speakingpart1question',
+            name='part1',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='questions', to='testapp.speakingpart1'),
+        ),
+        migrations.AlterField(
+            model_name='speakingpart3question',
+            name='part3',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='questions', to='testapp.speakingpart3'),
+        ),
+        migrations.RemoveField(
+            model_name='speakingpart1question',
+            name='test',
+        ),
+        migrations.RemoveField(
+            model_name='speakingpart1question',
+            name='title',
+        ),
+        migrations.RemoveField(
+            model_name='speakingpart3question',
+            name='test',
+        ),
+        migrations.RemoveField(
+            model_name='speakingpart3question',
+            name='title',
+        ),
+        migrations.AlterField(
+            model_name='speakingpart2cuecard',
+            name='test',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='part2', to='testapp.speakingtest'),
+        ),
+        migrations.DeleteModel(
+            name='Question',
+        ),
+        migrations.AlterField(
+            model_name='readingquestion',
+            name='passage',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='questions', to='testapp.passage'),
+        ),
+    ]
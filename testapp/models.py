@@ -334,6 +334,16 @@ class AudioSection(models.Model):
         blank=True,
         null=True
     )
+    # start_time/end_time bo'yicha kesilgan segment (testapp/audio.py)
+    segment_file = models.FileField(
+        upload_to='listening/segments/',
+        blank=True,
+        null=True,
+        editable=False
+    )
+    segment_size = models.PositiveBigIntegerField(blank=True, null=True, editable=False)
+    segment_duration = models.DurationField(blank=True, null=True, editable=False)
+    segment_source = models.CharField(max_length=40, blank=True, default='', editable=False)
 
     class Meta:
         ordering = ['section_number']
@@ -430,3 +440,75 @@ class ListeningTableAnswer(models.Model):
 
     def __str__(self):
         return f"Answer [[{self.number}]] = {self.correct_answer}"
+
+
+# =========================================
+# IMAGE VARIANTS
+# =========================================
+class ImageVariant(models.Model):
+    """
+    Savol rasmlarining kichraytirilgan / qayta kodlangan nusxalari (testapp/images.py).
+    source — asl rasmning storage dagi nomi (FileField.name).
+    """
+    FORMAT_CHOICES = [
+        ('webp', 'WebP'),
+        ('jpeg', 'JPEG'),
+    ]
+
+    source = models.CharField(max_length=255, db_index=True)
+    format = models.CharField(max_length=10, choices=FORMAT_CHOICES)
+    file = models.FileField(upload_to='variants/')
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+    size = models.PositiveIntegerField(help_text="Bytes")
+
+    class Meta:
+        ordering = ['source', 'format', 'width']
+        unique_together = ('source', 'format', 'width')
+
+    def __str__(self):
+        return f"{self.source} ({self.format} {self.width}x{self.height})"
+
+
+# =========================================
+# NEAR-DUPLICATE DETECTION
+# =========================================
+class ContentFingerprint(models.Model):
+    """
+    Kontent matnining MinHash imzosi (testapp/similarity.py).
+    duplicate_of — shu turdagi eng o'xshash (taxminan bir xil) obyekt id si.
+    """
+    KIND_CHOICES = [
+        ('passage', 'Passage'),
+        ('speaking_part1', 'Speaking Part 1 savoli'),
+        ('speaking_part3', 'Speaking Part 3 savoli'),
+        ('writing_task1', 'Writing Task 1'),
+        ('writing_task2', 'Writing Task 2'),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.PositiveIntegerField()
+    text_hash = models.CharField(max_length=40)
+    signature = models.BinaryField()
+    duplicate_of = models.PositiveIntegerField(blank=True, null=True)
+    similarity = models.FloatField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('kind', 'object_id')
+
+    def __str__(self):
+        return f"{self.get_kind_display()} #{self.object_id}"
+
+
+class SimilarityBucket(models.Model):
+    """LSH bucketlari: bir xil bucketga tushgan obyektlar — dublikatga nomzod"""
+    kind = models.CharField(max_length=20)
+    bucket = models.CharField(max_length=40)
+    object_id = models.PositiveIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['kind', 'bucket'], name='similarity_bucket_idx'),
+            models.Index(fields=['kind', 'object_id'], name='similarity_object_idx'),
+        ]
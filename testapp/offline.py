@@ -0,0 +1,197 @@
+"""
+Internet sekin markazlar uchun oflayn imtihon paketi.
+
+Mock va unga bog'langan reading/listening/speaking/writing testlari bitta
+ZIP arxivga yig'iladi:
+
+    manifest.json        — Mock, bo'limlar, har bir fayl sha256 va hajmi,
+                           media URL -> arxivdagi yo'l xaritasi
+    exam/<bo'lim>.json   — exam endpointlari beradigan JSON ning o'zi
+    media/<sha256>.<ext> — audio va rasmlar (kontent bo'yicha bir marta)
+
+JSON siqiladi, allaqachon siqilgan media (mp3, png, webp...) esa o'zgarishsiz
+saqlanadi. Arxiv shu Mock ning o'z JSON lari xeshi bo'yicha keshlanadi —
+boshqa testlarni tahrirlash uni qayta qurmaydi — va Range bilan (uzilgan
+yuklashni davom ettirish mumkin) beriladi.
+"""
+import hashlib
+import json
+import os
+import threading
+import zipfile
+from collections import namedtuple
+from urllib.parse import unquote
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from .bundle import SECTIONS
+from .models import Mock
+from .prefetch import prefetch_for
+from .serializers import MockSerializer
+from .versioning import get_content_version
+
+
+FORMAT = "ielts-offline-exam"
+VERSION = 1
+# Qayta siqishdan foyda yo'q — ZIP_STORED
+STORED_EXTENSIONS = {".mp3", ".m4a", ".aac", ".ogg", ".opus", ".png", ".jpg", ".jpeg", ".webp", ".gif", ".zip"}
+
+Package = namedtuple("Package", "path filename sha256 size")
+
+_build_lock = threading.Lock()
+_content_keys = {}  # {mock_id: (kontent versiyasi, arxiv kaliti)}
+
+
+def package_dir():
+    return os.path.join(settings.MEDIA_ROOT, settings.OFFLINE_PACKAGE_DIR)
+
+
+def mock_queryset():
+    return Mock.objects.prefetch_related(
+        *(prefetch_for(field_name, serializer) for field_name, serializer in SECTIONS.values())
+    )
+
+
+def _sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as fileobj:
+        for chunk in iter(lambda: fileobj.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _media_names(data, found):
+    """Payload dagi MEDIA_URL bilan boshlanadigan barcha URL lar -> storage nomlari"""
+    if isinstance(data, dict):
+        for value in data.values():
+            _media_names(value, found)
+    elif isinstance(data, list):
+        for value in data:
+            _media_names(value, found)
+    elif isinstance(data, str) and data.startswith(settings.MEDIA_URL):
+        found[data] = unquote(data[len(settings.MEDIA_URL):])
+    return found
+
+
+def render_sections(mock):
+    """{bo'lim: JSON baytlari} — exam endpointlari bilan bir xil (nisbiy URL lar bilan)"""
+    context = {"request": None, "field_spec": None}
+    payloads = {}
+    for name, (field_name, serializer_class) in SECTIONS.items():
+        data = serializer_class(getattr(mock, field_name).all(), many=True, context=context).data
+        payloads[name] = JSONRenderer().render(data)
+    return payloads
+
+
+def mock_data(mock):
+    return MockSerializer(mock, context={"request": None, "field_spec": None}).data
+
+
+def content_key(mock, payloads):
+    """Arxiv kaliti: Mock ma'lumoti va bo'lim JSON lari xeshi (media nomlari CAS — ular ham ichida)"""
+    digest = hashlib.sha256(JSONRenderer().render(mock_data(mock)))
+    for name, payload in sorted(payloads.items()):
+        digest.update(f"\0{name}\0{len(payload)}\0".encode())
+        digest.update(payload)
+    return digest.hexdigest()
+
+
+def _write_archive(mock, payloads, path, key):
+    urls = {}
+    for payload in payloads.values():
+        _media_names(json.loads(payload), urls)
+
+    files = {}
+    media = {}
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=9) as archive:
+        for name, payload in payloads.items():
+            member = f"exam/{name}.json"
+            archive.writestr(member, payload)
+            files[member] = {"sha256": hashlib.sha256(payload).hexdigest(), "size": len(payload)}
+
+        by_hash = {}
+        for url, name in sorted(urls.items()):
+            try:
+                source = default_storage.path(name)
+                digest = _sha256_file(source)
+            except (FileNotFoundError, NotImplementedError):
+                continue  # fayl yo'q — klient URL ni onlayn olishga harakat qiladi
+            member = by_hash.get(digest)
+            if member is None:
+                extension = os.path.splitext(name)[1].lower()
+                member = f"media/{digest}{extension}"
+                compress = zipfile.ZIP_STORED if extension in STORED_EXTENSIONS else zipfile.ZIP_DEFLATED
+                archive.write(source, member, compress_type=compress)
+                files[member] = {"sha256": digest, "size": os.path.getsize(source)}
+                by_hash[digest] = member
+            media[url] = member
+
+        manifest = {
+            "format": FORMAT,
+            "version": VERSION,
+            "created_at": timezone.now().isoformat(),
+            "content_version": key,
+            "mock": mock_data(mock),
+            "sections": {name: f"exam/{name}.json" for name in payloads},
+            "media": media,
+            "files": files,
+        }
+        archive.writestr("manifest.json", JSONRenderer().render(manifest))
+
+
+def get_package(mock_id):
+    """
+    Mock ning joriy mazmuni uchun tayyor arxiv (kerak bo'lsa quriladi).
+    Mock topilmasa Mock.DoesNotExist.
+    """
+    # Kalit global kontent versiyasi o'zgarganda qayta hisoblanadi (JSON render),
+    # lekin arxiv faqat shu Mock ning o'z mazmuni o'zgarganda qayta quriladi
+    version = get_content_version()
+    mock = payloads = None
+    cached = _content_keys.get(mock_id)
+    if cached is not None and cached[0] == version:
+        key = cached[1]
+    else:
+        mock = mock_queryset().get(pk=mock_id)
+        payloads = render_sections(mock)
+        key = content_key(mock, payloads)
+        _content_keys[mock_id] = (version, key)
+
+    directory = package_dir()
+    filename = f"mock-{mock_id}-{key[:16]}.zip"
+    path = os.path.join(directory, filename)
+    digest_path = f"{path}.sha256"
+
+    if not os.path.exists(digest_path):
+        with _build_lock:
+            if not os.path.exists(digest_path):
+                if mock is None:
+                    mock = mock_queryset().get(pk=mock_id)
+                    payloads = render_sections(mock)
+                os.makedirs(directory, exist_ok=True)
+                temporary = f"{path}.{os.getpid()}.tmp"
+                _write_archive(mock, payloads, temporary, key)
+                digest = _sha256_file(temporary)
+                os.replace(temporary, path)
+                with open(f"{digest_path}.tmp", "w") as fileobj:
+                    fileobj.write(digest)
+                os.replace(f"{digest_path}.tmp", digest_path)
+                _prune(directory, mock_id, keep=filename)
+
+    with open(digest_path) as fileobj:
+        digest = fileobj.read().strip()
+    return Package(path, filename, digest, os.path.getsize(path))
+
+
+def _prune(directory, mock_id, keep):
+    """Shu Mock ning eski versiyadagi arxivlarini o'chiradi"""
+    prefix = f"mock-{mock_id}-"
+    for name in os.listdir(directory):
+        if name.startswith(prefix) and not name.startswith(keep):
+            try:
+                os.remove(os.path.join(directory, name))
+            except FileNotFoundError:
+                pass
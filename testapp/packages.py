@@ -0,0 +1,322 @@
+"""
+Testlarni to'liq daraxti bilan JSON paket sifatida eksport / import qilish.
+
+Paket bitta yoki bir nechta Reading, Listening, Speaking yoki Writing testini
+barcha bog'liq obyektlari (passage, savollar, jadvallar, ...) bilan saqlaydi.
+Media fayllar storage dagi nomi bilan (havola sifatida) yoziladi — fayllarning
+o'zi alohida ko'chiriladi (CAS nomlari muhitlar orasida bir xil).
+
+Import avval butun paketni tekshiradi, keyin bitta tranzaksiyada daraxtni
+daraja-bosqich bulk_create qiladi: har bir model uchun bitta INSERT.
+"""
+from django.core.exceptions import ObjectDoesNotExist, ValidationError
+from django.core.files.storage import default_storage
+from django.db import models, transaction
+from django.utils import timezone
+from django.utils.duration import duration_iso_string
+
+from .models import (
+    # Reading
+    ReadingTest, Passage, ReadingQuestion, ReadingTable, ReadingTableRow, ReadingTableAnswer,
+    # Listening
+    ListeningTest, AudioSection, ListeningQuestion, ListeningTable, ListeningTableRow, ListeningTableAnswer,
+    # Speaking
+    SpeakingTest, SpeakingPart1, SpeakingPart1Question, SpeakingPart2CueCard, SpeakingPart3, SpeakingPart3Question,
+    # Writing
+    WritingTest, WritingTask1, WritingTask2,
+)
+from . import search
+from .versioning import bump_content_version
+
+
+FORMAT = "ielts-test-package"
+VERSION = 1
+
+
+class PackageError(Exception):
+    """Paket noto'g'ri — hech narsa yozilmadi. errors: ["yo'l: xabar", ...]"""
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__(f"Paketda {len(errors)} ta xato")
+
+
+class Node:
+    """
+    Daraxt tuguni: model, ota obyektga FK maydoni va bolalar {related_name: Node}.
+    single — OneToOne bog'lanish (ro'yxat emas, bitta obyekt yoki null).
+    """
+
+    def __init__(self, model, parent_field=None, children=None, single=False):
+        self.model = model
+        self.parent_field = parent_field
+        self.children = children or {}
+        self.single = single
+        # Faqat tahrirlanadigan maydonlar: created_at, segment_* kabilar hosilaviy
+        self.fields = [
+            field for field in model._meta.concrete_fields
+            if field.editable and not field.primary_key and field.name != parent_field
+        ]
+
+    def prefetch_paths(self, prefix=""):
+        for name, child in self.children.items():
+            yield prefix + name
+            yield from child.prefetch_paths(f"{prefix}{name}__")
+
+
+def _table(table, row, answer):
+    return Node(table, "question", single=True, children={
+        "rows": Node(row, "table"),
+        "answers": Node(answer, "table"),
+    })
+
+
+TREES = {
+    "reading": Node(ReadingTest, children={
+        "passages": Node(Passage, "test", children={
+            "questions": Node(ReadingQuestion, "passage", children={
+                "table": _table(ReadingTable, ReadingTableRow, ReadingTableAnswer),
+            }),
+        }),
+    }),
+    "listening": Node(ListeningTest, children={
+        "sections": Node(AudioSection, "test", children={
+            "questions": Node(ListeningQuestion, "section", children={
+                "table": _table(ListeningTable, ListeningTableRow, ListeningTableAnswer),
+            }),
+        }),
+    }),
+    "speaking": Node(SpeakingTest, children={
+        "part1": Node(SpeakingPart1, "test", single=True, children={
+            "questions": Node(SpeakingPart1Question, "part1"),
+        }),
+        "part2": Node(SpeakingPart2CueCard, "test", single=True),
+        "part3": Node(SpeakingPart3, "test", single=True, children={
+            "questions": Node(SpeakingPart3Question, "part3"),
+        }),
+    }),
+    "writing": Node(WritingTest, children={
+        "task1": Node(WritingTask1, "test"),
+        "task2": Node(WritingTask2, "test"),
+    }),
+}
+
+
+# ============ EKSPORT ===============
+def _dump_value(field, obj):
+    value = field.value_from_object(obj)
+    if isinstance(field, models.FileField):
+        return value.name or None
+    if value is None:
+        return None
+    if isinstance(field, models.DurationField):
+        return duration_iso_string(value)
+    if isinstance(field, (models.DateField, models.TimeField)):
+        return value.isoformat()
+    if isinstance(field, models.DecimalField):
+        return str(value)
+    return value
+
+
+def _dump(node, obj, media):
+    data = {}
+    for field in node.fields:
+        data[field.name] = _dump_value(field, obj)
+        if isinstance(field, models.FileField) and data[field.name]:
+            media.add(data[field.name])
+    for name, child in node.children.items():
+        if child.single:
+            try:
+                related = getattr(obj, name)
+            except ObjectDoesNotExist:
+                related = None
+            data[name] = _dump(child, related, media) if related is not None else None
+        else:
+            data[name] = [_dump(child, related, media) for related in getattr(obj, name).all()]
+    return data
+
+
+def export_tests(test_type, ids=None):
+    """Paket (dict): shu turdagi testlar (ids berilmasa — barchasi)"""
+    tree = TREES[test_type]
+    queryset = tree.model.objects.order_by("pk").prefetch_related(*tree.prefetch_paths())
+    if ids:
+        queryset = queryset.filter(pk__in=ids)
+    media = set()
+    tests = [{"type": test_type, **_dump(tree, test, media)} for test in queryset]
+    return {
+        "format": FORMAT,
+        "version": VERSION,
+        "exported_at": timezone.now().isoformat(),
+        "media": sorted(media),
+        "tests": tests,
+    }
+
+
+# ============ IMPORT ===============
+class PackageReport:
+    def __init__(self):
+        self.tests = []   # [(type, test obyekti)]
+        self.counts = {}  # {model nomi: soni}
+        self.media = set()
+
+    def __str__(self):
+        objects = sum(self.counts.values())
+        return f"{len(self.tests)} ta test, {objects} ta obyekt, {len(self.media)} ta media havola"
+
+
+def _load_value(field, raw, path, errors):
+    """Paketdagi qiymatni model qiymatiga aylantiradi va DB cheklovlari bo'yicha tekshiradi"""
+    try:
+        if isinstance(field, models.FileField):
+            if raw not in (None, "") and not isinstance(raw, str):
+                raise ValidationError("Fayl nomi (satr) bo'lishi kerak.")
+            value = raw or None
+        else:
+            value = field.to_python(raw)
+        if value is None:
+            if not field.null:
+                raise ValidationError("Bo'sh bo'lishi mumkin emas.")
+            return None
+        if field.choices and value not in dict(field.flatchoices):
+            raise ValidationError(f"Noto'g'ri qiymat {value!r}.")
+        field.run_validators(value)
+        return value
+    except ValidationError as exc:
+        errors.append(f"{path}.{field.name}: {' '.join(exc.messages)}")
+        return None
+
+
+def _build(node, data, path, errors, report, out):
+    """
+    Paket qismidan saqlanmagan obyektlar yasaydi. out: {Node: [(obyekt, ota)]}
+    — keyin daraja-bosqich bulk_create qilinadi.
+    """
+    if not isinstance(data, dict):
+        errors.append(f"{path}: obyekt (dict) bo'lishi kerak.")
+        return None
+    known = {field.name for field in node.fields} | set(node.children) | {"type"}
+    for key in sorted(set(data) - known):
+        errors.append(f"{path}.{key}: noma'lum maydon.")
+
+    obj = node.model()
+    for field in node.fields:
+        if field.name not in data:
+            if not field.has_default() and not field.null:
+                errors.append(f"{path}.{field.name}: majburiy maydon.")
+            continue
+        value = _load_value(field, data[field.name], path, errors)
+        setattr(obj, field.attname, value)
+        if isinstance(field, models.FileField) and value:
+            report.media.add(value)
+
+    for name, child in node.children.items():
+        raw = data.get(name)
+        if child.single:
+            if raw is not None:
+                built = _build(child, raw, f"{path}.{name}", errors, report, out)
+                if built is not None:
+                    out.setdefault(child, []).append((built, obj))
+            continue
+        if raw is None:
+            raw = []
+        if not isinstance(raw, list):
+            errors.append(f"{path}.{name}: ro'yxat bo'lishi kerak.")
+            continue
+        siblings = []
+        for index, item in enumerate(raw):
+            built = _build(child, item, f"{path}.{name}[{index}]", errors, report, out)
+            if built is not None:
+                out.setdefault(child, []).append((built, obj))
+                siblings.append(built)
+        _check_unique(child, siblings, f"{path}.{name}", errors)
+    return obj
+
+
+def _check_unique(node, siblings, path, errors):
+    """unique_together (ota FK + maydonlar) ni paket ichida tekshiradi"""
+    for fields in node.model._meta.unique_together:
+        if node.parent_field not in fields:
+            continue
+        names = [name for name in fields if name != node.parent_field]
+        seen = set()
+        for obj in siblings:
+            key = tuple(getattr(obj, name) for name in names)
+            if key in seen:
+                errors.append(f"{path}: {', '.join(names)}={key if len(key) > 1 else key[0]!r} takrorlangan.")
+            seen.add(key)
+
+
+def validate_package(package, check_media=True):
+    """
+    Paketni tekshiradi va saqlanmagan obyektlar daraxtini qaytaradi:
+    (report, [(tree, test)], {Node: [(obyekt, ota)]}). Xato bo'lsa PackageError.
+    """
+    if not isinstance(package, dict) or package.get("format") != FORMAT:
+        raise PackageError([f"format: '{FORMAT}' paketi emas."])
+    if package.get("version") != VERSION:
+        raise PackageError([f"version: {package.get('version')!r} qo'llab-quvvatlanmaydi (kutilgan {VERSION})."])
+    tests = package.get("tests")
+    if not isinstance(tests, list):
+        raise PackageError(["tests: ro'yxat bo'lishi kerak."])
+
+    errors, roots, out = [], [], {}
+    report = PackageReport()
+    for index, data in enumerate(tests):
+        path = f"tests[{index}]"
+        test_type = data.get("type") if isinstance(data, dict) else None
+        if test_type not in TREES:
+            errors.append(f"{path}.type: {', '.join(TREES)} dan biri bo'lishi kerak.")
+            continue
+        obj = _build(TREES[test_type], data, path, errors, report, out)
+        if obj is not None:
+            roots.append((TREES[test_type], obj))
+            report.tests.append((test_type, obj))
+
+    if check_media:
+        for name in sorted(report.media):
+            if not default_storage.exists(name):
+                errors.append(f"media: '{name}' storage da topilmadi.")
+    if errors:
+        raise PackageError(errors)
+    return report, roots, out
+
+
+def _levels(roots, out):
+    """Tugunlarni chuqurlik bo'yicha guruhlaydi: ota obyektlar doim oldin saqlanadi"""
+    level = {}
+    for tree, obj in roots:
+        level.setdefault(tree, []).append(obj)
+    while level:
+        yield level
+        following = {}
+        for node in level:
+            for child in node.children.values():
+                following.setdefault(child, []).extend(obj for obj, _ in out.get(child, ()))
+        level = {node: objects for node, objects in following.items() if objects}
+
+
+def import_package(package, check_media=True, dry_run=False):
+    """
+    Paketni tekshirib, bitta tranzaksiyada bulk_create qiladi.
+    Signallar ishlamaydi: kontent versiyasi va qidiruv indeksi shu yerda yangilanadi.
+    """
+    report, roots, out = validate_package(package, check_media=check_media)
+    parents = {id(obj): parent for pairs in out.values() for obj, parent in pairs}
+
+    with transaction.atomic():
+        created = []
+        for level in _levels(roots, out):
+            for node, objects in level.items():
+                for obj in objects:
+                    if node.parent_field:
+                        # Ota endi saqlangan — FK ni pk bilan bog'laymiz
+                        setattr(obj, node.parent_field, parents[id(obj)])
+                node.model.objects.bulk_create(objects, batch_size=500)
+                report.counts[node.model.__name__] = report.counts.get(node.model.__name__, 0) + len(objects)
+                created.extend(objects)
+        search.index_many(created, created=True)
+        bump_content_version()
+        if dry_run:
+            transaction.set_rollback(True)
+    return report
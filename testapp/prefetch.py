@@ -0,0 +1,98 @@
+"""
+Nested serializer daraxtidan select_related / prefetch_related rejasini tuzish.
+
+Har bir view o'z serializer_class idan reja oladi, shuning uchun serializerga
+yangi nested maydon qo'shilsa, so'rovlar soni savollar soniga bog'liq
+bo'lib qolmaydi (N+1 bo'lmaydi).
+"""
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework.relations import ManyRelatedField
+from rest_framework.serializers import BaseSerializer, ListSerializer
+
+
+def _as_serializer(serializer):
+    return serializer() if isinstance(serializer, type) else serializer
+
+
+def _collect(serializer, prefix, select, prefetch, columns):
+    """
+    columns — only() uchun ustunlar ro'yxati; biror maydonning manbasini
+    aniqlab bo'lmasa, None qaytadi (barcha ustunlar yuklanadi).
+    """
+    model = serializer.Meta.model
+    for field in serializer.fields.values():
+        if field.source == "*" or "." in field.source:
+            columns = None
+            continue
+
+        if isinstance(field, ListSerializer):
+            child = field.child
+        elif isinstance(field, BaseSerializer):
+            child = field
+        elif isinstance(field, ManyRelatedField):
+            child = None  # masalan Mock dagi PrimaryKeyRelatedField(many=True)
+        else:
+            child = False
+
+        try:
+            model_field = model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            columns = None  # property yoki method — qaysi ustun kerakligi noma'lum
+            continue
+
+        path = prefix + field.source
+        if child is False or not model_field.is_relation:
+            if columns is not None and model_field.concrete:
+                columns.append(path)
+            continue
+
+        if model_field.one_to_many or model_field.many_to_many:
+            # Har bir "ko'p" bog'lanish — bitta qo'shimcha so'rov
+            queryset = model_field.related_model._default_manager.all()
+            required = []
+            if model_field.one_to_many:
+                required.append(model_field.field.name)  # prefetch ota obyektga bog'lashi uchun
+            if child is not None:
+                queryset = apply_plan(queryset, child, required)
+            prefetch.append(Prefetch(path, queryset=queryset))
+        else:
+            # FK / OneToOne — JOIN bilan bir so'rovda. Teskari OneToOne (question.table)
+            # ham only() ga kiradi, aks holda "deferred and traversed" FieldError
+            select.append(path)
+            if columns is not None:
+                columns.append(path)
+            if child is not None:
+                columns = _collect(child, path + "__", select, prefetch, columns)
+    return columns
+
+
+def build_plan(serializer):
+    """
+    (select_related yo'llari, Prefetch lar, only() ustunlari) ni qaytaradi.
+    Ustunlar faqat context["field_spec"] maydonlarni cheklaganda hisoblanadi.
+    """
+    serializer = _as_serializer(serializer)
+    select, prefetch = [], []
+    columns = [] if serializer.context.get("field_spec") is not None else None
+    columns = _collect(serializer, "", select, prefetch, columns)
+    return select, prefetch, columns
+
+
+def apply_plan(queryset, serializer, required=()):
+    """Queryset ga serializer daraxtiga mos select/prefetch/only qo'shadi"""
+    select, prefetch, columns = build_plan(serializer)
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    if columns is not None:
+        queryset = queryset.only(*columns, *required)
+    return queryset
+
+
+def prefetch_for(lookup, serializer):
+    """Mock.reading_tests kabi bog'lanish uchun tayyor Prefetch"""
+    serializer = _as_serializer(serializer)
+    queryset = serializer.Meta.model._default_manager.all()
+    return Prefetch(lookup, queryset=apply_plan(queryset, serializer))
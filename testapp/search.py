@@ -0,0 +1,178 @@
+"""
+Kontent bazasi bo'yicha to'liq matnli qidiruv (SQLite FTS5).
+
+Passage matnlari, reading/listening savollari, speaking savollari va writing
+topshiriqlari bitta FTS5 jadvalida (testapp_search) indekslanadi. Indeks
+post_save/post_delete signallari orqali har bir obyekt uchun alohida
+yangilanadi, natijalar esa bm25 bo'yicha tartiblanadi.
+
+Qatorning rowid i obyektdan hisoblanadi (pk * 16 + KIND_IDS[kind]), shuning
+uchun yangilash va o'chirish rowid bo'yicha: UNINDEXED kind/object_id
+bo'yicha WHERE butun jadvalni ko'rib chiqardi.
+"""
+import re
+
+from django.db import connection
+
+from .models import (
+    Passage, ReadingQuestion, ListeningQuestion,
+    SpeakingPart1Question, SpeakingPart2CueCard, SpeakingPart3Question,
+    WritingTask1, WritingTask2,
+)
+
+
+TABLE = "testapp_search"
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _options(obj):
+    return " ".join(str(option) for option in (obj.options or []))
+
+
+# {kind: (model, sarlavha, matn)} — sarlavha va matn obyektdan olinadi
+SOURCES = {
+    "passage": (Passage, lambda o: o.title, lambda o: o.text),
+    "reading_question": (
+        ReadingQuestion, lambda o: f"Q{o.question_number}", lambda o: f"{o.question_text or ''} {_options(o)}",
+    ),
+    "listening_question": (
+        ListeningQuestion, lambda o: f"Q{o.question_number}", lambda o: f"{o.question_text or ''} {_options(o)}",
+    ),
+    "speaking_part1": (SpeakingPart1Question, lambda o: "", lambda o: o.question_text),
+    "speaking_part2": (SpeakingPart2CueCard, lambda o: o.topic, lambda o: o.description),
+    "speaking_part3": (SpeakingPart3Question, lambda o: "", lambda o: o.question_text),
+    "writing_task1": (WritingTask1, lambda o: "", lambda o: o.question_text),
+    "writing_task2": (WritingTask2, lambda o: "", lambda o: o.question_text),
+}
+KIND_BY_MODEL = {model: kind for kind, (model, _, _) in SOURCES.items()}
+# rowid ning kichik 4 biti; qiymatlar o'zgarmasin (mavjud indeks shularga tayangan)
+KIND_IDS = {
+    "passage": 1,
+    "reading_question": 2,
+    "listening_question": 3,
+    "speaking_part1": 4,
+    "speaking_part2": 5,
+    "speaking_part3": 6,
+    "writing_task1": 7,
+    "writing_task2": 8,
+}
+INSERT_SQL = f"INSERT INTO {TABLE} (rowid, kind, object_id, title, body) VALUES (%s, %s, %s, %s, %s)"
+DELETE_SQL = f"DELETE FROM {TABLE} WHERE rowid = %s"
+
+CREATE_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE} USING fts5("
+    "kind UNINDEXED, object_id UNINDEXED, title, body, "
+    "tokenize = 'unicode61 remove_diacritics 2')"
+)
+
+
+def enabled():
+    return connection.vendor == "sqlite"
+
+
+def rowid(kind, pk):
+    return pk * 16 + KIND_IDS[kind]
+
+
+def _row(kind, obj):
+    _, title, body = SOURCES[kind]
+    return (rowid(kind, obj.pk), kind, obj.pk, title(obj) or "", body(obj) or "")
+
+
+def index_object(obj):
+    if not enabled():
+        return
+    row = _row(KIND_BY_MODEL[type(obj)], obj)
+    with connection.cursor() as cursor:
+        cursor.execute(DELETE_SQL, [row[0]])
+        cursor.execute(INSERT_SQL, row)
+
+
+def index_many(objects, created=False):
+    """
+    Ko'p obyektni bir yo'la indekslaydi (bulk_create / import dan keyin).
+    created=True — obyektlar yangi, eski qatorlarini o'chirish shart emas.
+    """
+    if not enabled():
+        return
+    rows = []
+    for obj in objects:
+        kind = KIND_BY_MODEL.get(type(obj))
+        if kind is not None:
+            rows.append(_row(kind, obj))
+    with connection.cursor() as cursor:
+        if not created:
+            cursor.executemany(DELETE_SQL, [row[:1] for row in rows])
+        cursor.executemany(INSERT_SQL, rows)
+
+
+def remove_object(obj):
+    if not enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(DELETE_SQL, [rowid(KIND_BY_MODEL[type(obj)], obj.pk)])
+
+
+def rebuild(kinds=None, chunk_size=2000):
+    """Indeksni noldan quradi; (kind, soni) juftliklarini qaytaradi"""
+    counts = []
+    with connection.cursor() as cursor:
+        cursor.execute(CREATE_SQL)
+        for kind in kinds or SOURCES:
+            model = SOURCES[kind][0]
+            cursor.execute(f"DELETE FROM {TABLE} WHERE kind = %s", [kind])
+            rows = []
+            count = 0
+            for obj in model.objects.order_by("pk").iterator(chunk_size=chunk_size):
+                rows.append(_row(kind, obj))
+                if len(rows) >= chunk_size:
+                    cursor.executemany(INSERT_SQL, rows)
+                    count += len(rows)
+                    rows = []
+            if rows:
+                cursor.executemany(INSERT_SQL, rows)
+                count += len(rows)
+            counts.append((kind, count))
+    return counts
+
+
+def match_expression(query):
+    """
+    Foydalanuvchi matnini xavfsiz FTS5 so'roviga aylantiradi:
+    har bir so'z prefiks sifatida qidiriladi va barchasi bo'lishi shart.
+    """
+    words = _WORD_RE.findall(query or "")
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def search(query, kinds=None, limit=50):
+    """
+    [{kind, id, title, snippet, score}] — eng mosi birinchi.
+    score — bm25 (kichikroq = mosroq), sarlavhaga 5 barobar og'irlik beriladi.
+    """
+    expression = match_expression(query)
+    if not expression or not enabled():
+        return []
+    sql = (
+        f"SELECT kind, object_id, title, snippet({TABLE}, 3, '[', ']', '…', 16), "
+        f"bm25({TABLE}, 0, 0, 5.0, 1.0) AS score "
+        f"FROM {TABLE} WHERE {TABLE} MATCH %s"
+    )
+    params = [expression]
+    if kinds:
+        sql += f" AND kind IN ({', '.join(['%s'] * len(kinds))})"
+        params += list(kinds)
+    sql += " ORDER BY score LIMIT %s"
+    params.append(limit)
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [
+            {"kind": kind, "id": int(object_id), "title": title, "snippet": snippet, "score": round(score, 4)}
+            for kind, object_id, title, snippet, score in cursor.fetchall()
+        ]
+
+
+def search_ids(model, query, limit=1000):
+    """Admin uchun: shu modeldagi mos obyektlar id lari (mosligi bo'yicha)"""
+    return [hit["id"] for hit in search(query, kinds=[KIND_BY_MODEL[model]], limit=limit)]
@@ -1,11 +1,13 @@
 from rest_framework import serializers
 from .models import *
+from .fieldsets import DynamicFieldsModelSerializer
+from .images import ImageVariantsField
 
 
 # =========================================
 # MOCK
 # =========================================
-class MockSerializer(serializers.ModelSerializer):
+class MockSerializer(DynamicFieldsModelSerializer):
     reading_tests = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
     listening_tests = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
     speaking_tests = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
@@ -19,13 +21,15 @@ class MockSerializer(serializers.ModelSerializer):
 # =========================================
 # READING
 # =========================================
-class ReadingQuestionSerializer(serializers.ModelSerializer):
+class ReadingQuestionSerializer(DynamicFieldsModelSerializer):
+    diagram_labels_variants = ImageVariantsField(source='diagram_labels')
+
     class Meta:
         model = ReadingQuestion
         fields = '__all__'
 
 
-class PassageSerializer(serializers.ModelSerializer):
+class PassageSerializer(DynamicFieldsModelSerializer):
     questions = ReadingQuestionSerializer(many=True, read_only=True)
 
     class Meta:
@@ -33,7 +37,7 @@ class PassageSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
-class ReadingTestSerializer(serializers.ModelSerializer):
+class ReadingTestSerializer(DynamicFieldsModelSerializer):
     passages = PassageSerializer(many=True, read_only=True)
 
     class Meta:
@@ -44,13 +48,13 @@ class ReadingTestSerializer(serializers.ModelSerializer):
 # =========================================
 # SPEAKING
 # =========================================
-class SpeakingPart1QuestionSerializer(serializers.ModelSerializer):
+class SpeakingPart1QuestionSerializer(DynamicFieldsModelSerializer):
     class Meta:
         model = SpeakingPart1Question
         fields = ["id", "question_text"]
 
 
-class SpeakingPart1Serializer(serializers.ModelSerializer):
+class SpeakingPart1Serializer(DynamicFieldsModelSerializer):
     questions = SpeakingPart1QuestionSerializer(many=True, read_only=True)
 
     class Meta:
@@ -59,20 +63,20 @@ class SpeakingPart1Serializer(serializers.ModelSerializer):
 
 
 # Part 2
-class SpeakingPart2CueCardSerializer(serializers.ModelSerializer):
+class SpeakingPart2CueCardSerializer(DynamicFieldsModelSerializer):
     class Meta:
         model = SpeakingPart2CueCard
         fields = ["id", "topic", "description"]
 
 
 # Part 3
-class SpeakingPart3QuestionSerializer(serializers.ModelSerializer):
+class SpeakingPart3QuestionSerializer(DynamicFieldsModelSerializer):
     class Meta:
         model = SpeakingPart3Question
         fields = ["id", "question_text"]
 
 
-class SpeakingPart3Serializer(serializers.ModelSerializer):
+class SpeakingPart3Serializer(DynamicFieldsModelSerializer):
     questions = SpeakingPart3QuestionSerializer(many=True, read_only=True)
 
     class Meta:
@@ -81,7 +85,7 @@ class SpeakingPart3Serializer(serializers.ModelSerializer):
 
 
 # Test
-class SpeakingTestSerializer(serializers.ModelSerializer):
+class SpeakingTestSerializer(DynamicFieldsModelSerializer):
     part1 = SpeakingPart1Serializer(read_only=True)
     part2 = SpeakingPart2CueCardSerializer(read_only=True)
     part3 = SpeakingPart3Serializer(read_only=True)
@@ -94,22 +98,24 @@ class SpeakingTestSerializer(serializers.ModelSerializer):
 # =========================================
 # WRITING
 # =========================================
-class WritingTask1Serializer(serializers.ModelSerializer):
+class WritingTask1Serializer(DynamicFieldsModelSerializer):
+    image_variants = ImageVariantsField(source='image')
+
     class Meta:
         model = WritingTask1
         fields = '__all__'
 
 
-class WritingTask2Serializer(serializers.ModelSerializer):
+class WritingTask2Serializer(DynamicFieldsModelSerializer):
     class Meta:
         model = WritingTask2
         fields = '__all__'
 
 
-class WritingTestSerializer(serializers.ModelSerializer):
-    # ❌ many=True emas, chunki OneToOneField
-    task1 = WritingTask1Serializer(read_only=True)
-    task2 = WritingTask2Serializer(read_only=True)
+class WritingTestSerializer(DynamicFieldsModelSerializer):
+    # task1/task2 — ForeignKey (related_name), shuning uchun many=True
+    task1 = WritingTask1Serializer(many=True, read_only=True)
+    task2 = WritingTask2Serializer(many=True, read_only=True)
 
     class Meta:
         model = WritingTest
@@ -119,19 +125,19 @@ class WritingTestSerializer(serializers.ModelSerializer):
 # =========================================
 # LISTENING (Tables)
 # =========================================
-class ListeningTableAnswerSerializer(serializers.ModelSerializer):
+class ListeningTableAnswerSerializer(DynamicFieldsModelSerializer):
     class Meta:
         model = ListeningTableAnswer
         fields = ['id', 'number', 'correct_answer']
 
 
-class ListeningTableRowSerializer(serializers.ModelSerializer):
+class ListeningTableRowSerializer(DynamicFieldsModelSerializer):
     class Meta:
         model = ListeningTableRow
         fields = ['id', 'order', 'row_data']
 
 
-class ListeningTableSerializer(serializers.ModelSerializer):
+class ListeningTableSerializer(DynamicFieldsModelSerializer):
     rows = ListeningTableRowSerializer(many=True, read_only=True)
     answers = ListeningTableAnswerSerializer(many=True, read_only=True)
 
@@ -143,8 +149,9 @@ class ListeningTableSerializer(serializers.ModelSerializer):
 # =========================================
 # LISTENING (Questions & Sections)
 # =========================================
-class ListeningQuestionSerializer(serializers.ModelSerializer):
+class ListeningQuestionSerializer(DynamicFieldsModelSerializer):
     table = ListeningTableSerializer(read_only=True)
+    map_image_variants = ImageVariantsField(source='map_image')
 
     class Meta:
         model = ListeningQuestion
@@ -158,11 +165,12 @@ class ListeningQuestionSerializer(serializers.ModelSerializer):
             'options',
             'correct_answer',
             'map_image',
+            'map_image_variants',
             'table',
         ]
 
 
-class AudioSectionSerializer(serializers.ModelSerializer):
+class AudioSectionSerializer(DynamicFieldsModelSerializer):
     questions = ListeningQuestionSerializer(many=True, read_only=True)
 
     class Meta:
@@ -170,7 +178,7 @@ class AudioSectionSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
-class ListeningTestSerializer(serializers.ModelSerializer):
+class ListeningTestSerializer(DynamicFieldsModelSerializer):
     sections = AudioSectionSerializer(many=True, read_only=True)
 
     class Meta:
@@ -179,9 +187,12 @@ class ListeningTestSerializer(serializers.ModelSerializer):
 
 
 # Soddalashtirilgan variant (faqat section-level)
-class ListeningSectionSerializer(serializers.ModelSerializer):
+class ListeningSectionSerializer(DynamicFieldsModelSerializer):
     questions = ListeningQuestionSerializer(many=True, read_only=True)
 
     class Meta:
         model = AudioSection
-        fields = ['id', 'section_number', 'audio_file', 'instruction', 'questions']
+        fields = [
+            'id', 'section_number', 'audio_file', 'segment_file', 'segment_size', 'segment_duration',
+            'instruction', 'questions',
+        ]
@@ -0,0 +1,98 @@
+from django.db.models.signals import post_save, post_delete, m2m_changed
+
+from .models import (
+    Mock,
+    # Reading
+    ReadingTest, Passage, ReadingQuestion, ReadingTable, ReadingTableRow, ReadingTableAnswer,
+    # Listening
+    ListeningTest, AudioSection, ListeningQuestion, ListeningTable, ListeningTableRow, ListeningTableAnswer,
+    # Speaking
+    SpeakingTest, SpeakingPart1, SpeakingPart1Question, SpeakingPart2CueCard, SpeakingPart3, SpeakingPart3Question,
+    # Writing
+    WritingTest, WritingTask1, WritingTask2,
+)
+from .audio import schedule_segment
+from .images import IMAGE_FIELDS, schedule_variants
+from .search import KIND_BY_MODEL, index_object, remove_object
+from . import similarity
+from .versioning import bump_content_version
+
+
+# Shu modellardan birortasi o'zgarsa, exam bundle eskiradi
+CONTENT_MODELS = (
+    Mock,
+    ReadingTest, Passage, ReadingQuestion, ReadingTable, ReadingTableRow, ReadingTableAnswer,
+    ListeningTest, AudioSection, ListeningQuestion, ListeningTable, ListeningTableRow, ListeningTableAnswer,
+    SpeakingTest, SpeakingPart1, SpeakingPart1Question, SpeakingPart2CueCard, SpeakingPart3, SpeakingPart3Question,
+    WritingTest, WritingTask1, WritingTask2,
+)
+
+
+def content_changed(sender, **kwargs):
+    bump_content_version()
+
+
+for model in CONTENT_MODELS:
+    post_save.connect(content_changed, sender=model, dispatch_uid=f"content-save-{model.__name__}")
+    post_delete.connect(content_changed, sender=model, dispatch_uid=f"content-delete-{model.__name__}")
+
+for field_name in ("reading_tests", "listening_tests", "speaking_tests", "writing_tests"):
+    m2m_changed.connect(
+        content_changed,
+        sender=getattr(Mock, field_name).through,
+        dispatch_uid=f"content-m2m-{field_name}",
+    )
+
+
+# Audio segmentlari: fayl yoki start/end o'zgarsa qayta kesiladi
+def audio_section_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        schedule_segment(instance)
+
+
+def audio_section_deleted(sender, instance, **kwargs):
+    if instance.segment_file:
+        instance.segment_file.storage.delete(instance.segment_file.name)
+
+
+post_save.connect(audio_section_saved, sender=AudioSection, dispatch_uid="audio-segment-save")
+post_delete.connect(audio_section_deleted, sender=AudioSection, dispatch_uid="audio-segment-delete")
+
+
+# Savol rasmlari: yangi yuklangan rasm uchun responsive variantlar
+def image_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        schedule_variants(instance, IMAGE_FIELDS[sender.__name__])
+
+
+for model in (ReadingQuestion, ListeningQuestion, WritingTask1):
+    post_save.connect(image_saved, sender=model, dispatch_uid=f"image-variants-{model.__name__}")
+
+
+# To'liq matnli qidiruv indeksi: har bir obyekt alohida yangilanadi
+def search_saved(sender, instance, **kwargs):
+    index_object(instance)
+
+
+def search_deleted(sender, instance, **kwargs):
+    remove_object(instance)
+
+
+for model in KIND_BY_MODEL:
+    post_save.connect(search_saved, sender=model, dispatch_uid=f"search-save-{model.__name__}")
+    post_delete.connect(search_deleted, sender=model, dispatch_uid=f"search-delete-{model.__name__}")
+
+
+# Deyarli bir xil kontent: saqlanganda MinHash imzosi va dublikat belgisi
+def fingerprint_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        similarity.update_fingerprint(instance)
+
+
+def fingerprint_deleted(sender, instance, **kwargs):
+    similarity.remove_fingerprint(instance)
+
+
+for model in similarity.KIND_BY_MODEL:
+    post_save.connect(fingerprint_saved, sender=model, dispatch_uid=f"fingerprint-save-{model.__name__}")
+    post_delete.connect(fingerprint_deleted, sender=model, dispatch_uid=f"fingerprint-delete-{model.__name__}")
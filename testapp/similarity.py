@@ -0,0 +1,262 @@
+"""
+Kontent bankidagi deyarli bir xil (qayta kiritilgan) passage va savollarni topish.
+
+Har bir matn shingle larga bo'linadi va MinHash imzosi (NUM_PERM ta son)
+hisoblanadi: ikki imzodagi mos qiymatlar ulushi — Jaccard o'xshashligining
+bahosi. LSH (BANDS ta band, har birida ROWS ta qiymat) imzolarni bucketlarga
+ajratadi, shuning uchun faqat bucketi mos kelgan juftliklar solishtiriladi —
+butun bank bo'yicha qidiruv deyarli chiziqli vaqtda ishlaydi.
+"""
+import hashlib
+import re
+import struct
+
+from django.db import connection, transaction
+
+from .models import (
+    Passage, SpeakingPart1Question, SpeakingPart3Question, WritingTask1, WritingTask2,
+    ContentFingerprint, SimilarityBucket,
+)
+
+
+NUM_PERM = 64
+BANDS, ROWS = 16, 4  # BANDS * ROWS == NUM_PERM; nomzod bo'sag'asi ~ (1/16)^(1/4) ≈ 0.5
+THRESHOLD = 0.8      # shundan yuqori o'xshashlik — dublikat
+
+_SIGNATURE = struct.Struct(f"<{NUM_PERM}I")
+_BAND = struct.Struct(f"<{ROWS}I")
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def normalize(text):
+    return " ".join(_WORD_RE.findall((text or "").casefold()))
+
+
+def word_shingles(text, size=3):
+    """Uzun matnlar (passage) uchun: ketma-ket 3 so'z"""
+    words = text.split()
+    if len(words) <= size:
+        return {text} if text else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def char_shingles(text, size=5):
+    """Qisqa savollar uchun: 5 belgili bo'laklar (bitta so'z o'zgarishiga sezgir emas)"""
+    if len(text) <= size:
+        return {text} if text else set()
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+# {kind: (model, matn, shingle funksiyasi)}
+SOURCES = {
+    "passage": (Passage, lambda o: o.text, word_shingles),
+    "speaking_part1": (SpeakingPart1Question, lambda o: o.question_text, char_shingles),
+    "speaking_part3": (SpeakingPart3Question, lambda o: o.question_text, char_shingles),
+    "writing_task1": (WritingTask1, lambda o: o.question_text, char_shingles),
+    "writing_task2": (WritingTask2, lambda o: o.question_text, char_shingles),
+}
+KIND_BY_MODEL = {model: kind for kind, (model, _, _) in SOURCES.items()}
+
+
+def minhash(shingles):
+    """
+    Har bir shingle uchun NUM_PERM ta mustaqil 32-bitli hash bitta shake_128
+    chaqiruvida olinadi; imzo — har bir ustun bo'yicha minimum (C darajasida).
+    """
+    rows = [_SIGNATURE.unpack(hashlib.shake_128(shingle.encode()).digest(_SIGNATURE.size)) for shingle in shingles]
+    return list(map(min, zip(*rows)))
+
+
+def pack(signature):
+    return _SIGNATURE.pack(*signature)
+
+
+def unpack(data):
+    return _SIGNATURE.unpack(bytes(data))
+
+
+def similarity(first, second):
+    """Ikki imzo bo'yicha Jaccard bahosi (0..1)"""
+    return sum(a == b for a, b in zip(first, second)) / NUM_PERM
+
+
+def buckets(signature):
+    keys = []
+    for band in range(BANDS):
+        rows = _BAND.pack(*signature[band * ROWS:(band + 1) * ROWS])
+        keys.append(f"{band:02d}:{hashlib.blake2b(rows, digest_size=16).hexdigest()}")
+    return keys
+
+
+def fingerprint(kind, obj):
+    """(text_hash, signature) yoki matn bo'sh bo'lsa None"""
+    _, get_text, shingle = SOURCES[kind]
+    text = normalize(get_text(obj))
+    if not text:
+        return None
+    return hashlib.sha1(text.encode()).hexdigest(), minhash(shingle(text))
+
+
+def _insert_buckets(kind, items):
+    """(object_id, signature) lar uchun bucket qatorlari — ORM siz, executemany bilan"""
+    table = SimilarityBucket._meta.db_table
+    rows = [(kind, key, pk) for pk, signature in items for key in buckets(signature)]
+    with connection.cursor() as cursor:
+        cursor.executemany(f"INSERT INTO {table} (kind, bucket, object_id) VALUES (%s, %s, %s)", rows)
+
+
+# ============ SAQLASHDA TEKSHIRISH ===============
+def best_match(kind, object_id, signature):
+    """LSH bucketlari orqali eng o'xshash obyekt: (object_id, similarity) yoki None"""
+    candidates = set(
+        SimilarityBucket.objects
+        .filter(kind=kind, bucket__in=buckets(signature))
+        .exclude(object_id=object_id)
+        .values_list("object_id", flat=True)
+    )
+    best = None
+    for other_id, data in ContentFingerprint.objects.filter(kind=kind, object_id__in=candidates).values_list(
+        "object_id", "signature"
+    ):
+        score = similarity(signature, unpack(data))
+        if score >= THRESHOLD and (best is None or (score, -other_id) > (best[1], -best[0])):
+            best = (other_id, score)
+    return best
+
+
+def update_fingerprint(obj):
+    """
+    Obyekt imzosini yangilaydi va dublikatini belgilaydi.
+    Saqlangan ContentFingerprint ni (yoki matn bo'sh bo'lsa None) qaytaradi.
+    """
+    kind = KIND_BY_MODEL[type(obj)]
+    result = fingerprint(kind, obj)
+    if result is None:
+        remove_fingerprint(obj)
+        return None
+    text_hash, signature = result
+
+    current = ContentFingerprint.objects.filter(kind=kind, object_id=obj.pk).first()
+    if current is not None and current.text_hash == text_hash:
+        return current  # matn o'zgarmagan
+
+    match = best_match(kind, obj.pk, signature)
+    with transaction.atomic():
+        record, _ = ContentFingerprint.objects.update_or_create(
+            kind=kind, object_id=obj.pk,
+            defaults={
+                "text_hash": text_hash,
+                "signature": pack(signature),
+                "duplicate_of": match[0] if match else None,
+                "similarity": round(match[1], 3) if match else None,
+            },
+        )
+        SimilarityBucket.objects.filter(kind=kind, object_id=obj.pk).delete()
+        _insert_buckets(kind, [(obj.pk, signature)])
+    return record
+
+
+def remove_fingerprint(obj):
+    kind = KIND_BY_MODEL[type(obj)]
+    ContentFingerprint.objects.filter(kind=kind, object_id=obj.pk).delete()
+    SimilarityBucket.objects.filter(kind=kind, object_id=obj.pk).delete()
+    ContentFingerprint.objects.filter(kind=kind, duplicate_of=obj.pk).update(duplicate_of=None, similarity=None)
+
+
+# ============ BUTUN BANK BO'YICHA ===============
+def refresh_kind(kind, chunk_size=2000):
+    """
+    Eskirgan / yo'q imzolarni qayta hisoblaydi (bucketlar bilan).
+    {object_id: signature} qaytaradi — klasterlash uchun.
+    """
+    model, get_text, shingle = SOURCES[kind]
+    stored = {
+        object_id: (text_hash, data)
+        for object_id, text_hash, data in ContentFingerprint.objects.filter(kind=kind).values_list(
+            "object_id", "text_hash", "signature"
+        )
+    }
+    signatures, changed = {}, {}
+    for obj in model.objects.order_by("pk").iterator(chunk_size=chunk_size):
+        text = normalize(get_text(obj))
+        if not text:
+            continue
+        text_hash = hashlib.sha1(text.encode()).hexdigest()
+        if obj.pk in stored and stored[obj.pk][0] == text_hash:
+            signatures[obj.pk] = unpack(stored[obj.pk][1])
+        else:
+            signatures[obj.pk] = minhash(shingle(text))
+            changed[obj.pk] = text_hash
+
+    gone = set(stored) - set(signatures)
+    with transaction.atomic():
+        stale = list(gone | set(changed))
+        for start in range(0, len(stale), 500):
+            ids = stale[start:start + 500]
+            ContentFingerprint.objects.filter(kind=kind, object_id__in=ids).delete()
+            SimilarityBucket.objects.filter(kind=kind, object_id__in=ids).delete()
+        ContentFingerprint.objects.bulk_create(
+            (ContentFingerprint(kind=kind, object_id=pk, text_hash=text_hash, signature=pack(signatures[pk]))
+             for pk, text_hash in changed.items()),
+            batch_size=chunk_size,
+        )
+        _insert_buckets(kind, ((pk, signatures[pk]) for pk in changed))
+    return signatures
+
+
+def clusters(signatures, threshold=THRESHOLD):
+    """
+    LSH orqali dublikat klasterlari: [[(object_id, similarity_to_first), ...], ...].
+    Har bir klaster eng kichik id (asl nusxa) bilan boshlanadi.
+    """
+    table = {}
+    for pk, signature in signatures.items():
+        for key in buckets(signature):
+            table.setdefault(key, []).append(pk)
+
+    parent = {}
+
+    def find(pk):
+        while parent.get(pk, pk) != pk:
+            pk = parent[pk]
+        return pk
+
+    checked = set()
+    for members in table.values():
+        if len(members) < 2:
+            continue
+        for i, first in enumerate(members):
+            for second in members[i + 1:]:
+                pair = (first, second) if first < second else (second, first)
+                if pair in checked:
+                    continue
+                checked.add(pair)
+                if similarity(signatures[first], signatures[second]) >= threshold:
+                    root_a, root_b = find(first), find(second)
+                    if root_a != root_b:
+                        parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    groups = {}
+    for pk in parent:
+        groups.setdefault(find(pk), set()).add(pk)
+    result = []
+    for root, members in sorted(groups.items()):
+        members.add(root)
+        result.append([
+            (pk, 1.0 if pk == root else similarity(signatures[root], signatures[pk])) for pk in sorted(members)
+        ])
+    return result
+
+
+def mark_duplicates(kind, groups):
+    """Klasterlar bo'yicha duplicate_of / similarity ni qayta yozadi"""
+    with transaction.atomic():
+        ContentFingerprint.objects.filter(kind=kind, duplicate_of__isnull=False).update(
+            duplicate_of=None, similarity=None
+        )
+        for members in groups:
+            original = members[0][0]
+            for pk, score in members[1:]:
+                ContentFingerprint.objects.filter(kind=kind, object_id=pk).update(
+                    duplicate_of=original, similarity=round(score, 3)
+                )
@@ -1,3 +1,728 @@
-from django.test import TestCase
+import base64
+import hashlib
+import io
+import json
+import os
+import tempfile
+import threading
+import zipfile
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.core.management import call_command
+from django.db import connection
+from django.test import AsyncRequestFactory, RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+
+from backend import metrics
+from backend.storage import ContentAddressedStorage
+
+from . import audio, bundle, offline, packages, search, similarity
+from .answer_keys import AnswerKey, normalize_answer
+from .fieldsets import FieldSpec
+from .management.commands.check_query_budgets import build_exam, endpoints
+from .models import AudioSection, ContentFingerprint, ListeningTest, Passage, ReadingTest, WritingTask2, WritingTest
+from .versioning import get_content_version
+from .views import (
+    AsyncExamSectionView,
+    AsyncListeningSectionDetailView,
+    AsyncReadingTestPassageListView,
+    AsyncReadingTestSinglePassageView,
+    content_etag,
+)
+
+
+class NormalizeAnswerTests(SimpleTestCase):
+    def test_number_words(self):
+        cases = {
+            "twenty-five": "25",
+            "Twenty five percent": "25 percent",
+            "one hundred and five": "105",
+            "two thousand three hundred": "2300",
+            "two million three thousand four hundred and six": "2003406",
+            "seven hundred thousand": "700000",
+            "one thousand and five": "1005",
+            "five and six": "5 and 6",
+            "one two": "1 2",
+            "twenty thirty": "20 30",
+            "three thousand two thousand": "3000 2000",
+            "bread and butter": "bread and butter",
+        }
+        for text, expected in cases.items():
+            with self.subTest(text=text):
+                self.assertEqual(normalize_answer(text), expected)
+
+    def test_formats(self):
+        self.assertEqual(normalize_answer("The River"), "river")
+        self.assertEqual(normalize_answer("1,000"), "1000")
+        self.assertEqual(normalize_answer("3rd"), normalize_answer("third"))
+        self.assertEqual(normalize_answer("A"), "a")
+
+
+class AnswerKeyTests(SimpleTestCase):
+    def setUp(self):
+        self.key = AnswerKey()
+        self.key.add(1, ["the river"])
+        self.key.add(21, ["A", "C"], marks=2)
+
+    def test_single_answer(self):
+        self.assertEqual(self.key.check(1, "River"), 1)
+        self.assertEqual(self.key.check(1, "lake"), 0)
+
+    def test_choose_two(self):
+        self.assertEqual(self.key.check(21, ["A", "C"]), 2)
+        self.assertEqual(self.key.check(21, ["c", "B"]), 1)
+        self.assertEqual(self.key.check(21, ["A"]), 1)
+
+    def test_over_selection_scores_zero(self):
+        self.assertEqual(self.key.check(21, ["A", "B", "C"]), 0)
+        self.assertEqual(self.key.check(21, ["A", "B", "C", "D", "E"]), 0)
+
+    def test_score(self):
+        self.assertEqual(self.key.score({"1": "the river", "21": ["A", "C"], "x": "?"}), 3)
+        self.assertEqual(self.key.max_score, 3)
+
+
+class MediaServingTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.audio = bytes(range(100))
+        for name, data in (("offline/mock-1-abc.zip", b"data"), ("cas/ab/cdef.mp3", b"data"),
+                           ("listening/audio/a.mp3", self.audio)):
+            path = os.path.join(directory.name, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as fileobj:
+                fileobj.write(data)
+        settings = override_settings(MEDIA_ROOT=directory.name, SECURE_SSL_REDIRECT=False)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def test_offline_archives_are_not_public(self):
+        for path in ("offline/mock-1-abc.zip", "./offline/mock-1-abc.zip", "cas/../offline/mock-1-abc.zip",
+                     "cas//../offline/mock-1-abc.zip"):
+            with self.subTest(path=path):
+                self.assertEqual(self.client.get(f"/media/{path}").status_code, 404)
+
+    def test_content_addressed_files_are_immutable(self):
+        response = self.client.get("/media/cas/ab/cdef.mp3")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("immutable", response["Cache-Control"])
+
+    def get_audio(self, **headers):
+        return self.client.get("/media/listening/audio/a.mp3", headers=headers)
+
+    def test_range(self):
+        cases = {
+            "bytes=10-19": (10, 19),
+            "bytes=90-": (90, 99),
+            "bytes=-5": (95, 99),
+            "bytes=95-500": (95, 99),
+        }
+        for header, (start, end) in cases.items():
+            with self.subTest(header=header):
+                response = self.get_audio(range=header)
+                self.assertEqual(response.status_code, 206)
+                self.assertEqual(b"".join(response.streaming_content), self.audio[start:end + 1])
+                self.assertEqual(response["Content-Range"], f"bytes {start}-{end}/100")
+                self.assertEqual(response["Content-Length"], str(end - start + 1))
+                self.assertEqual(response["Accept-Ranges"], "bytes")
+
+    def test_unsatisfiable_range(self):
+        for header in ("bytes=100-", "bytes=50-10", "bytes=-0"):
+            with self.subTest(header=header):
+                response = self.get_audio(range=header)
+                self.assertEqual(response.status_code, 416)
+                self.assertEqual(response["Content-Range"], "bytes */100")
+
+    def test_multiple_ranges_return_whole_file(self):
+        response = self.get_audio(range="bytes=0-9,20-29")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), self.audio)
+
+    def test_if_range(self):
+        etag = self.get_audio()["ETag"]
+        response = self.get_audio(range="bytes=0-9", if_range=etag)
+        self.assertEqual(response.status_code, 206)
+        # Fayl o'zgargan (boshqa ETag yoki kuchsiz ETag) — butun fayl qaytadi
+        for if_range in ('"stale"', f"W/{etag}", "Thu, 01 Jan 1970 00:00:00 GMT"):
+            with self.subTest(if_range=if_range):
+                response = self.get_audio(range="bytes=0-9", if_range=if_range)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(b"".join(response.streaming_content), self.audio)
+
+
+class ContentAddressedStorageTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.storage = ContentAddressedStorage(location=directory.name)
+
+    def test_same_content_is_stored_once(self):
+        first = self.storage.save("listening/audio/a.MP3", ContentFile(b"audio"))
+        second = self.storage.save("reading/other.mp3", ContentFile(b"audio"))
+        self.assertEqual(first, second)
+        self.assertRegex(first, r"^cas/([0-9a-f]{2})/\1[0-9a-f]{62}\.mp3$")
+        self.assertEqual(os.listdir(os.path.dirname(self.storage.path(first))), [os.path.basename(first)])
+        self.assertNotEqual(self.storage.save("a.mp3", ContentFile(b"other")), first)
+
+    def test_delete_keeps_content_addressed_files(self):
+        name = self.storage.save("a.png", ContentFile(b"image"))
+        self.storage.delete(name)
+        self.assertTrue(self.storage.exists(name))
+
+        plain = FileSystemStorage(location=self.storage.location).save("old/a.png", ContentFile(b"image"))
+        self.storage.delete(plain)
+        self.assertFalse(self.storage.exists(plain))
+
+
+class QueryBudgetTests(TestCase):
+    """SQL so'rovlar soni view.query_budget ga teng va savollar soniga bog'liq emas"""
+
+    @classmethod
+    def setUpTestData(cls):
+        search.rebuild()
+
+    def test_exam_endpoints(self):
+        for scale in (1, 3):
+            mock = build_exam(scale)
+            for url in endpoints(mock):
+                budget = resolve(url).func.view_class.query_budget
+                with self.subTest(scale=scale, url=url):
+                    bundle._bundles.clear()  # sovuq keshdan o'lchaymiz
+                    with self.assertNumQueries(budget):
+                        response = self.client.get(url, secure=True)
+                    self.assertEqual(response.status_code, 200)
+
+
+class ContentETagTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        search.rebuild()
+        cls.mock = build_exam(1)
+
+    def setUp(self):
+        bundle._bundles.clear()
+        self.addCleanup(bundle._bundles.clear)
+        self.url = reverse("mocks-reading-list")
+
+    def test_not_modified(self):
+        response = self.client.get(self.url, secure=True)
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+        self.assertFalse(etag.startswith("W/"))
+        self.assertIn("no-cache", response["Cache-Control"])
+
+        response = self.client.get(self.url, secure=True, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+        self.assertEqual(response.content, b"")
+
+    def test_gzip_etag_is_weak(self):
+        identity = self.client.get(self.url, secure=True)
+        compressed = self.client.get(self.url, secure=True, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(compressed["Content-Encoding"], "gzip")
+        self.assertEqual(compressed["ETag"], f"W/{identity['ETag']}")
+        for response in (identity, compressed):
+            self.assertIn("Accept-Encoding", response["Vary"])
+        # If-None-Match kuchsiz taqqoslanadi: gzip ETag i identity so'rovga ham mos
+        response = self.client.get(self.url, secure=True, HTTP_IF_NONE_MATCH=compressed["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+    def test_errors_have_no_etag(self):
+        url = reverse("mocks-listening-section-detail", kwargs={"test_id": 999999, "section_number": 1})
+        response = self.client.get(url, secure=True)
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(response.has_header("ETag"))
+        etag = f'"{content_etag(RequestFactory().get(url))}"'
+        self.assertEqual(self.client.get(url, secure=True, HTTP_IF_NONE_MATCH=etag).status_code, 404)
+
+    def test_content_change_invalidates_etag(self):
+        etag = self.client.get(self.url, secure=True)["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.mock.reading_tests.update(title="Changed")
+            self.mock.save()
+        self.assertEqual(self.client.get(self.url, secure=True, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class AsyncExamViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        search.rebuild()
+        mock_exam = build_exam(1)
+        reading = mock_exam.reading_tests.get()
+        listening = mock_exam.listening_tests.get()
+        cls.views = [
+            (reverse("mocks-reading-list"), AsyncExamSectionView.as_view(bundle_section="reading")),
+            (reverse("mocks-listening-list"), AsyncExamSectionView.as_view(bundle_section="listening")),
+            (
+                reverse("mocks-reading-passages", kwargs={"test_id": reading.pk}),
+                AsyncReadingTestPassageListView.as_view(),
+            ),
+            (
+                reverse("mocks-reading-single-passage", kwargs={"test_id": reading.pk, "order": 1}),
+                AsyncReadingTestSinglePassageView.as_view(),
+            ),
+            (
+                reverse("mocks-listening-section-detail", kwargs={"test_id": listening.pk, "section_number": 1}),
+                AsyncListeningSectionDetailView.as_view(),
+            ),
+        ]
+
+    def setUp(self):
+        bundle._bundles.clear()
+        self.addCleanup(bundle._bundles.clear)
+
+    def get_async(self, url, view, **headers):
+        request = AsyncRequestFactory().get(url, secure=True, headers=headers)
+        # Sinxron versiya o'qilsa — event loop bloklanadi
+        with mock.patch("testapp.views.get_content_version", side_effect=AssertionError):
+            return async_to_sync(view)(request, **resolve(url).kwargs)
+
+    def test_same_body_and_etag_as_sync(self):
+        for url, view in self.views:
+            with self.subTest(url=url):
+                expected = self.client.get(url, secure=True)
+                bundle._bundles.clear()
+                response = self.get_async(url, view)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.content, expected.content)
+                self.assertEqual(response["ETag"], expected["ETag"])
+
+    def test_not_modified(self):
+        for url, view in self.views:
+            with self.subTest(url=url):
+                etag = self.get_async(url, view)["ETag"]
+                response = self.get_async(url, view, if_none_match=etag)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response.content, b"")
+
+    def test_gzip_bundle_etag_is_weak(self):
+        url, view = self.views[0]
+        identity = self.get_async(url, view)
+        compressed = self.get_async(url, view, accept_encoding="gzip")
+        self.assertEqual(compressed["Content-Encoding"], "gzip")
+        self.assertEqual(compressed["ETag"], f"W/{identity['ETag']}")
+        response = self.get_async(url, view, if_none_match=compressed["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+
+class FieldsetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        search.rebuild()
+        cls.listening = build_exam(2).listening_tests.get()
+
+    def get_section(self, fields):
+        url = reverse("mocks-listening-section-detail", kwargs={"test_id": self.listening.pk, "section_number": 1})
+        return self.client.get(url, {"fields": fields}, secure=True)
+
+    def test_reverse_one_to_one_in_fieldset(self):
+        response = self.get_section("questions.table.rows")
+        self.assertEqual(response.status_code, 200)
+        questions = response.json()["questions"]
+        self.assertEqual(len(questions), 6)
+        self.assertEqual(questions[0], {"table": {"rows": [{"id": questions[0]["table"]["rows"][0]["id"],
+                                                            "order": 0, "row_data": ["Ann", "[[1]]"]}]}})
+
+    def test_nested_fieldset_columns(self):
+        response = self.get_section("questions.question_number,questions.table.answers.number")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["questions"][1], {"question_number": 2, "table": {"answers": [{"number": 2}]}})
+
+
+class BundleCacheTests(SimpleTestCase):
+    def setUp(self):
+        bundle._bundles.clear()
+        self.addCleanup(bundle._bundles.clear)
+
+    def get_bundle(self, host):
+        mock = SimpleNamespace(reading_tests=ReadingTest.objects.none())
+        return bundle.get_bundle(RequestFactory().get("/", HTTP_HOST=host), lambda: mock)
+
+    def test_spoofed_hosts_are_not_cached(self):
+        first = self.get_bundle("example.com")
+        for number in range(100):
+            self.get_bundle(f"spoofed-{number}.example")
+        self.assertEqual(len(bundle._bundles), bundle.MAX_BUNDLE_HOSTS)
+        self.assertIs(self.get_bundle("example.com"), first)
+        self.assertIsNot(self.get_bundle("spoofed-99.example"), self.get_bundle("spoofed-99.example"))
+
+    def test_uncached_payloads_use_fast_encoders(self):
+        request = RequestFactory().get("/")
+        cached = self.get_bundle("example.com")
+        self.assertIs(cached.render_section("reading", request).encoders, bundle.ENCODERS)
+        cached.sections.update((number, None) for number in range(bundle.MAX_SECTION_VARIANTS))
+        self.assertIs(cached.render_section("reading", request, FieldSpec(["id"])).encoders,
+                      bundle.FAST_ENCODERS)
+        for number in range(bundle.MAX_BUNDLE_HOSTS):
+            self.get_bundle(f"host-{number}.example")
+        overflow = self.get_bundle("spoofed.example")
+        self.assertIs(overflow.render_section("reading", request).encoders, bundle.FAST_ENCODERS)
+
+
+class MetricsTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        settings = override_settings(METRICS_DIR=self.directory)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        server = mock.patch.object(metrics.registry, "writes_files", True)
+        server.start()
+        self.addCleanup(server.stop)
+
+    def test_concurrent_flushes(self):
+        errors = []
+
+        def flush():
+            try:
+                for _ in range(200):
+                    metrics.registry.flush(force=True)
+            except OSError as exc:
+                errors.append(exc)
+
+        threads = [threading.Thread(target=flush) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(os.listdir(self.directory), [f"metrics-{os.getpid()}.json"])
+
+    def test_only_server_processes_write_files(self):
+        with mock.patch.object(metrics.registry, "writes_files", False):
+            metrics.registry.flush(force=True)
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_dead_process_files_are_pruned(self):
+        series = [0] * (len(metrics.TIME_BUCKETS) + 3)
+        series[0], series[-2], series[-1] = 5, 0.01, 5
+        for pid in (999999998, 999999999):
+            with open(os.path.join(self.directory, f"metrics-{pid}.json"), "w") as fileobj:
+                json.dump({
+                    "histograms": {"http_request_duration_seconds": {"old": series}},
+                    "counters": [[["old", "GET", 200], 5]],
+                }, fileobj)
+        for _ in range(2):  # ikkinchi scrape da ham ikki marta qo'shilmaydi
+            histograms, counters = metrics.collect()
+            self.assertEqual(counters[("old", "GET", 200)], 10)
+            self.assertEqual(histograms["http_request_duration_seconds"]["old"][-1], 10)
+        self.assertCountEqual(
+            os.listdir(self.directory),
+            [f"metrics-{os.getpid()}.json", metrics.ARCHIVE_NAME, metrics.LOCK_NAME],
+        )
+
+    def test_metrics_view_requires_token(self):
+        url = reverse("metrics")
+        with override_settings(METRICS_TOKEN=None):
+            self.assertEqual(self.client.get(url, secure=True).status_code, 403)
+        with override_settings(METRICS_TOKEN="secret"):
+            self.assertEqual(self.client.get(url, secure=True).status_code, 403)
+            self.assertEqual(
+                self.client.get(url, secure=True, HTTP_AUTHORIZATION="Bearer wrong").status_code, 403
+            )
+            response = self.client.get(url, secure=True, HTTP_AUTHORIZATION="Bearer secret")
+            self.assertEqual(response.status_code, 200)
+            self.assertIn(b"http_requests_total", response.content)
+
+
+class SearchIndexTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        search.rebuild()
+        cls.passage = Passage.objects.create(
+            test=ReadingTest.objects.create(title="Reading"), title="Harbour", text="Ships", order=1,
+        )
+        # pk bir xil, kind boshqa — rowid lar to'qnashmasligi kerak
+        cls.task = WritingTask2.objects.create(
+            pk=cls.passage.pk, test=WritingTest.objects.create(title="Writing"), question_text="Ships",
+        )
+
+    def hits(self, query):
+        return [(hit["kind"], hit["id"]) for hit in search.search(query)]
+
+    def test_rows_are_replaced_by_rowid(self):
+        self.passage.title = "Lighthouse"
+        with CaptureQueriesContext(connection) as queries:
+            self.passage.save()
+        deletes = [query["sql"] for query in queries if "DELETE FROM testapp_search" in query["sql"]]
+        self.assertEqual(len(deletes), 1)
+        self.assertIn("WHERE rowid =", deletes[0])
+        self.assertEqual(self.hits("harbour"), [])
+        self.assertEqual(self.hits("lighthouse"), [("passage", self.passage.pk)])
+        self.assertCountEqual(self.hits("ships"), [("passage", self.passage.pk), ("writing_task2", self.passage.pk)])
+
+    def test_delete_removes_only_that_kind(self):
+        self.passage.delete()
+        self.assertEqual(self.hits("ships"), [("writing_task2", self.task.pk)])
+
+    def test_search_view(self):
+        url = reverse("content-search")
+        self.assertEqual(self.client.get(url, {"q": "ships"}, secure=True).status_code, 403)
+        self.client.force_login(User.objects.create_superuser("admin", password="x"))
+        response = self.client.get(url, {"q": "ships", "kind": "passage"}, secure=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([hit["id"] for hit in response.json()["results"]], [self.passage.pk])
+        for params, field in (({}, "q"), ({"q": "ships", "kind": "essay"}, "kind"), ({"q": "ships", "limit": "x"}, "limit")):
+            with self.subTest(params=params):
+                response = self.client.get(url, params, secure=True)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn(field, response.json())
+
+
+class AudioSegmentTests(TestCase):
+    def setUp(self):
+        self.section = AudioSection.objects.create(
+            test=ListeningTest.objects.create(title="Listening"), section_number=1,
+            audio_file="listening/full.mp3", start_time=timedelta(0), end_time=timedelta(seconds=30),
+        )
+
+    def test_save_does_not_run_ffmpeg(self):
+        with mock.patch.object(audio, "cut") as cut, self.captureOnCommitCallbacks(execute=True):
+            self.section.end_time = timedelta(seconds=40)
+            self.section.save()
+        cut.assert_not_called()
+        self.assertTrue(audio.segment_is_stale(self.section))  # build_audio_segments kesadi
+
+    def test_without_ffmpeg(self):
+        with mock.patch.object(audio, "ffmpeg_available", return_value=False):
+            self.assertFalse(audio.build_segment(self.section))
+        self.section.refresh_from_db()
+        self.assertEqual(self.section.segment_source, audio.failed_marker(audio.segment_source(self.section)))
+        self.assertFalse(audio.segment_is_stale(self.section))
+        self.assertTrue(audio.segment_is_stale(self.section, retry_failed=True))
+
+        # Keyingi saqlash qayta urinmaydi va bundle/ETag larni eskirtirmaydi
+        version = get_content_version()
+        with mock.patch.object(audio, "ffmpeg_available", return_value=False):
+            audio.build_segment(self.section)
+        self.assertEqual(get_content_version(), version)
+
+        self.section.end_time = timedelta(seconds=40)
+        self.assertTrue(audio.segment_is_stale(self.section))
+
+    def test_failed_cut_is_recorded(self):
+        with mock.patch.object(audio, "ffmpeg_available", return_value=True), \
+                mock.patch.object(audio, "_local_copy", return_value="/missing.mp3"), \
+                mock.patch.object(audio, "cut", side_effect=audio.SegmentError("bad file")):
+            with self.assertRaises(audio.SegmentError):
+                audio.build_segment(self.section)
+        self.assertFalse(audio.segment_is_stale(self.section))
+
+    def test_stale_segment_is_cleared_on_commit(self):
+        AudioSection.objects.filter(pk=self.section.pk).update(
+            segment_file="listening/segments/old.mp3", segment_size=10,
+            segment_source=audio.segment_source(self.section),
+        )
+        self.section.refresh_from_db()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.section.start_time = timedelta(seconds=5)
+            self.section.save()
+        self.section.refresh_from_db()
+        self.assertFalse(self.section.segment_file)
+        self.assertTrue(audio.segment_is_stale(self.section))
+
+
+class PackageTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        search.rebuild()
+        cls.mock = build_exam(1)
+
+    def export(self, tests=None):
+        package = {"format": packages.FORMAT, "version": packages.VERSION, "media": [], "tests": []}
+        for test_type in packages.TREES:
+            ids = [obj.pk for kind, obj in tests if kind == test_type] if tests is not None else None
+            if ids == []:
+                continue
+            package["tests"].extend(packages.export_tests(test_type, ids)["tests"])
+        return package
+
+    def count(self):
+        return {node.model.__name__: node.model.objects.count() for node in self.nodes(packages.TREES.values())}
+
+    def nodes(self, nodes):
+        for node in nodes:
+            yield node
+            yield from self.nodes(node.children.values())
+
+    def test_round_trip(self):
+        package = json.loads(json.dumps(self.export()))
+        self.assertEqual(len(package["tests"]), 4)
+        before = self.count()
+        with self.captureOnCommitCallbacks(execute=True):
+            report = packages.import_package(package, check_media=False)
+        self.assertEqual(self.count(), {name: count * 2 for name, count in before.items()})
+        self.assertEqual(sum(report.counts.values()), sum(before.values()))
+        # Yangi testlarni qayta eksport qilsak — xuddi shu paket
+        self.assertEqual(self.export(report.tests)["tests"], package["tests"])
+        # bulk_create signallarsiz — import indeksni o'zi yangilaydi
+        self.assertEqual(len(search.search("Describe trip", kinds=["speaking_part2"])), 2)
+
+    def test_invalid_package_writes_nothing(self):
+        package = self.export()
+        reading = package["tests"][0]
+        reading["passages"][0]["questions"][1]["question_type"] = "essay"
+        reading["passages"][1]["questions"][0]["question_number"] = "x"
+        package["tests"][1]["sections"][0]["questions"][1]["question_number"] = 1
+        package["tests"].append({"type": "grammar"})
+        before = self.count()
+        with self.assertRaises(packages.PackageError) as context:
+            packages.import_package(package, check_media=False)
+        errors = context.exception.errors
+        self.assertIn("tests[0].passages[0].questions[1].question_type: Noto'g'ri qiymat 'essay'.", errors)
+        self.assertTrue(any(error.startswith("tests[0].passages[1].questions[0].question_number:") for error in errors))
+        self.assertIn("tests[1].sections[0].questions: question_number=1 takrorlangan.", errors)
+        self.assertTrue(any(error.startswith("tests[4].type:") for error in errors))
+        self.assertEqual(self.count(), before)
+
+    def test_missing_media(self):
+        package = self.export()
+        package["tests"][1]["sections"][0]["audio_file"] = "listening/audio/missing.mp3"
+        with self.assertRaises(packages.PackageError) as context:
+            packages.import_package(package)
+        self.assertEqual(context.exception.errors, ["media: 'listening/audio/missing.mp3' storage da topilmadi."])
+
+    def test_failed_write_rolls_back(self):
+        package = self.export()
+        before = self.count()
+        with mock.patch.object(search, "index_many", side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                packages.import_package(package, check_media=False)
+        self.assertEqual(self.count(), before)
+
+        report = packages.import_package(package, check_media=False, dry_run=True)
+        self.assertEqual(len(report.tests), 4)
+        self.assertEqual(self.count(), before)
+
+
+class OfflinePackageTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        search.rebuild()
+        cls.mock = build_exam(1)
+        cls.admin = User.objects.create_superuser("admin", password="x")
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = override_settings(MEDIA_ROOT=directory.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        offline._content_keys.clear()
+        self.addCleanup(offline._content_keys.clear)
+        # Ikki bo'lim bir xil audio (turli nomlar bilan) — arxivda bitta nusxa
+        sections = AudioSection.objects.filter(test__mocks=self.mock).order_by("section_number")
+        for section, name in zip(sections, ("listening/sections/a.mp3", "listening/sections/b.mp3")):
+            path = os.path.join(directory.name, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as fileobj:
+                fileobj.write(b"audio")
+            AudioSection.objects.filter(pk=section.pk).update(audio_file=name)
+
+    def test_archive_contents(self):
+        package = offline.get_package(self.mock.pk)
+        with zipfile.ZipFile(package.path) as archive:
+            manifest = json.loads(archive.read("manifest.json"))
+            self.assertEqual(manifest["format"], offline.FORMAT)
+            self.assertEqual(manifest["mock"]["id"], self.mock.pk)
+            self.assertEqual(set(manifest["sections"]), {"reading", "listening", "speaking", "writing"})
+            for member, info in manifest["files"].items():
+                data = archive.read(member)
+                self.assertEqual((hashlib.sha256(data).hexdigest(), len(data)), (info["sha256"], info["size"]))
+            media = manifest["media"]
+            self.assertEqual(set(media), {"/media/listening/sections/a.mp3", "/media/listening/sections/b.mp3"})
+            self.assertEqual(len(set(media.values())), 1)
+            self.assertEqual(archive.getinfo(next(iter(media.values()))).compress_type, zipfile.ZIP_STORED)
+        with open(package.path, "rb") as fileobj:
+            self.assertEqual(package.sha256, hashlib.sha256(fileobj.read()).hexdigest())
+
+    def test_key_is_stable(self):
+        first = offline.get_package(self.mock.pk)
+        self.assertEqual(offline.get_package(self.mock.pk), first)
+        # Boshqa Mock dagi o'zgarish versiyani oshiradi, lekin arxiv o'sha
+        with self.captureOnCommitCallbacks(execute=True):
+            WritingTest.objects.create(title="Unrelated").task2.create(question_text="Other")
+        self.assertEqual(offline.get_package(self.mock.pk), first)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            passage = Passage.objects.filter(test__mocks=self.mock).first()
+            passage.text = "Changed"
+            passage.save()
+        second = offline.get_package(self.mock.pk)
+        self.assertNotEqual(second.filename, first.filename)
+        self.assertFalse(os.path.exists(first.path))  # eski arxiv tozalandi
+
+    def test_view(self):
+        url = reverse("mocks-offline-package", kwargs={"mock_id": self.mock.pk})
+        self.assertEqual(self.client.get(url, secure=True).status_code, 403)
+        self.client.force_login(self.admin)
+        response = self.client.get(url, secure=True)
+        self.assertEqual(response.status_code, 200)
+        body = b"".join(response.streaming_content)
+        digest = base64.b64encode(hashlib.sha256(body).digest()).decode()
+        self.assertEqual(response["Repr-Digest"], f"sha-256=:{digest}:")
+        response = self.client.get(url, secure=True, headers={"range": "bytes=0-3"})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b"".join(response.streaming_content), body[:4])
+        self.assertEqual(self.client.get(reverse("mocks-offline-package", kwargs={"mock_id": 0}),
+                                         secure=True).status_code, 404)
+
+
+class SimilarityTests(TestCase):
+    TEXT = (
+        "Some people believe that university education should be free for every student, while others "
+        "think that students should pay tuition fees because they benefit personally. Discuss both views "
+        "and give your own opinion."
+    )
+
+    @classmethod
+    def setUpTestData(cls):
+        search.rebuild()
+        cls.writing = WritingTest.objects.create(title="Writing")
+
+    def create(self, text):
+        return WritingTask2.objects.create(test=self.writing, question_text=text)
+
+    def record(self, task):
+        return ContentFingerprint.objects.get(kind="writing_task2", object_id=task.pk)
+
+    def test_signatures(self):
+        signature = similarity.fingerprint("writing_task2", SimpleNamespace(question_text=self.TEXT))[1]
+        self.assertEqual(len(signature), similarity.NUM_PERM)
+        same = similarity.fingerprint("writing_task2", SimpleNamespace(question_text=self.TEXT.upper() + "!!"))
+        self.assertEqual(same[1], signature)  # katta harf va tinish belgilari farq qilmaydi
+        near = similarity.minhash(similarity.char_shingles(similarity.normalize(self.TEXT.replace("free", "cheap"))))
+        self.assertGreaterEqual(similarity.similarity(signature, near), similarity.THRESHOLD)
+        other = similarity.minhash(similarity.char_shingles("describe the chart showing rainfall in three cities"))
+        self.assertLess(similarity.similarity(signature, other), 0.3)
+
+    def test_near_duplicate_is_flagged_on_save(self):
+        original = self.create(self.TEXT)
+        copy = self.create(self.TEXT.replace("  ", " ").replace("free", "cheap"))
+        unrelated = self.create("Describe a time when you helped a friend with a difficult task.")
+        self.assertIsNone(self.record(original).duplicate_of)
+        self.assertEqual(self.record(copy).duplicate_of, original.pk)
+        self.assertGreaterEqual(self.record(copy).similarity, similarity.THRESHOLD)
+        self.assertIsNone(self.record(unrelated).duplicate_of)
+
+        original.delete()
+        self.assertIsNone(self.record(copy).duplicate_of)
+
+    def test_find_near_duplicates(self):
+        tasks = [self.create(self.TEXT), self.create(self.TEXT + " Write 250 words."), self.create("Unrelated topic")]
+        ContentFingerprint.objects.all().delete()  # import kabi signallarsiz yaratilgan
+        call_command("find_near_duplicates", kind=["writing_task2"], stdout=io.StringIO())
+        self.assertEqual(self.record(tasks[1]).duplicate_of, tasks[0].pk)
+        self.assertIsNone(self.record(tasks[0]).duplicate_of)
+        self.assertIsNone(self.record(tasks[2]).duplicate_of)
+        groups = similarity.clusters(similarity.refresh_kind("writing_task2"))
+        self.assertEqual([[pk for pk, _ in members] for members in groups], [[tasks[0].pk, tasks[1].pk]])
@@ -1,32 +1,59 @@
+from django.conf import settings
 from django.urls import path
 from .views import *
 
+
+if settings.ASYNC_EXAM_VIEWS:
+    # ⚡ ASGI rejimi: URL lar o'sha, view lar async
+    reading_list = AsyncExamSectionView.as_view(bundle_section="reading")
+    reading_passages = AsyncReadingTestPassageListView.as_view()
+    reading_single_passage = AsyncReadingTestSinglePassageView.as_view()
+    speaking_list = AsyncExamSectionView.as_view(bundle_section="speaking")
+    writing_list = AsyncExamSectionView.as_view(bundle_section="writing")
+    listening_list = AsyncExamSectionView.as_view(bundle_section="listening")
+    listening_section = AsyncListeningSectionDetailView.as_view()
+else:
+    reading_list = ReadingTestListView.as_view()
+    reading_passages = ReadingTestPassageListView.as_view()
+    reading_single_passage = ReadingTestSinglePassageView.as_view()
+    speaking_list = SpeakingTestListView.as_view()
+    writing_list = WritingTestListView.as_view()
+    listening_list = ListeningTestListView.as_view()
+    listening_section = ListeningSectionDetailView.as_view()
+
+
 urlpatterns = [
     # ============================
     # 🟢 MOCKS (Admin uchun)
     # ============================
     path("api/mocks/", MockListView.as_view(), name="mocks-list"),
+    path("api/mocks/<int:mock_id>/offline/", OfflinePackageView.as_view(), name="mocks-offline-package"),
 
     # ============================
     # 📘 READING (faqat active mock)
     # ============================
-    path("api/mocks/reading/", ReadingTestListView.as_view(), name="mocks-reading-list"),
-    path("api/mocks/reading/<int:test_id>/passages/", ReadingTestPassageListView.as_view(), name="mocks-reading-passages"),
-    path("api/mocks/reading/<int:test_id>/passage/<int:order>/", ReadingTestSinglePassageView.as_view(), name="mocks-reading-single-passage"),
+    path("api/mocks/reading/", reading_list, name="mocks-reading-list"),
+    path("api/mocks/reading/<int:test_id>/passages/", reading_passages, name="mocks-reading-passages"),
+    path("api/mocks/reading/<int:test_id>/passage/<int:order>/", reading_single_passage, name="mocks-reading-single-passage"),
 
     # ============================
     # 🎙️ SPEAKING (faqat active mock)
     # ============================
-    path("api/mocks/speaking/", SpeakingTestListView.as_view(), name="mocks-speaking-list"),
+    path("api/mocks/speaking/", speaking_list, name="mocks-speaking-list"),
 
     # ============================
     # ✍️ WRITING (faqat active mock)
     # ============================
-    path("api/mocks/writing/", WritingTestListView.as_view(), name="mocks-writing-list"),
+    path("api/mocks/writing/", writing_list, name="mocks-writing-list"),
 
     # ============================
     # 🎧 LISTENING (faqat active mock)
     # ============================
-    path("api/mocks/listening/", ListeningTestListView.as_view(), name="mocks-listening-list"),
-    path("api/mocks/listening/<int:test_id>/section/<int:section_number>/", ListeningSectionDetailView.as_view(), name="mocks-listening-section-detail"),
+    path("api/mocks/listening/", listening_list, name="mocks-listening-list"),
+    path("api/mocks/listening/<int:test_id>/section/<int:section_number>/", listening_section, name="mocks-listening-section-detail"),
+
+    # ============================
+    # 🔎 KONTENT QIDIRUVI (staff)
+    # ============================
+    path("api/search/", ContentSearchView.as_view(), name="content-search"),
 ]
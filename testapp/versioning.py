@@ -0,0 +1,38 @@
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+
+
+CONTENT_VERSION_KEY = "testapp:content-version"
+
+
+def get_content_version():
+    """Test kontentining joriy versiyasi (barcha workerlar uchun umumiy)"""
+    version = cache.get(CONTENT_VERSION_KEY)
+    if version is None:
+        # add() — bir vaqtda ishga tushgan workerlar bitta qiymatga kelishadi
+        cache.add(CONTENT_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+        version = cache.get(CONTENT_VERSION_KEY)
+    return version
+
+
+async def aget_content_version():
+    """get_content_version ning async varianti (ASGI view lar uchun)"""
+    version = await cache.aget(CONTENT_VERSION_KEY)
+    if version is None:
+        await cache.aadd(CONTENT_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+        version = await cache.aget(CONTENT_VERSION_KEY)
+    return version
+
+
+def bump_content_version():
+    """
+    Kontent o'zgarganda yangi versiya beradi.
+    Har safar yangi token yoziladi (incr emas), shuning uchun parallel
+    o'zgarishlarda ham eski versiya qayta ishlatilmaydi. Tranzaksiya
+    commit bo'lgandan keyingina yoziladi.
+    """
+    transaction.on_commit(
+        lambda: cache.set(CONTENT_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+    )
@@ -1,10 +1,31 @@
-from django.shortcuts import get_object_or_404
+import base64
+import hashlib
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse, JsonResponse
+from django.shortcuts import aget_object_or_404, get_object_or_404
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import quote_etag
+from django.views import View
+from rest_framework import serializers
 from rest_framework.generics import ListAPIView, RetrieveAPIView
-from rest_framework.exceptions import NotFound
+from rest_framework.exceptions import APIException, NotFound
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework.renderers import JSONRenderer
 from django.utils import timezone
 
+from backend.listing import IdCursorPagination, ListFilterMixin
+from backend.media import serve_file
+
 from .models import *
 from .serializers import *
+from .bundle import Payload, arender_section, choose_encoding, render_section
+from .fieldsets import FieldSpec
+from .prefetch import apply_plan, prefetch_for
+from .versioning import aget_content_version, get_content_version
+from . import offline, search
 
 
 # ============================
@@ -12,61 +33,158 @@ from .serializers import *
 # ============================
 class ActiveMockMixin:
     """Faqat active va bugungi Mock ni olish"""
-    def get_active_mock(self):
+    # Bundle qurilganda (sovuq kesh) butun Mock uchun so'rovlar soni
+    query_budget = 15
+
+    def active_mock_queryset(self):
         today = timezone.now().date()
-        mock = (
+        return (
             Mock.objects
             .filter(status="active", exam_date=today)
             .prefetch_related(
+                # Har bir bo'lim uchun reja serializer daraxtidan tuziladi
                 # 📘 Reading
-                "reading_tests__passages__questions",
-                # 🎧 Listening
-                "listening_tests__sections__questions",
-                # 🎙️ Speaking
-                "speaking_tests__part1__questions",   # Part 1 + savollari
-                "speaking_tests__part2",              # Part 2 cue card
-                "speaking_tests__part3__questions",   # Part 3 + savollari
+                prefetch_for("reading_tests", ReadingTestSerializer),
+                # 🎧 Listening (section -> question -> table -> rows/answers)
+                prefetch_for("listening_tests", ListeningTestSerializer),
+                # 🎙️ Speaking (part1/part2/part3 + savollari)
+                prefetch_for("speaking_tests", SpeakingTestSerializer),
                 # ✍️ Writing
-                "writing_tests__task1",
-                "writing_tests__task2",
+                prefetch_for("writing_tests", WritingTestSerializer),
             )
-            .first()
         )
+
+    def get_active_mock(self):
+        mock = self.active_mock_queryset().first()
+        if not mock:
+            raise NotFound("Bugungi kunda active mock mavjud emas.")
+        return mock
+
+    async def aget_active_mock(self):
+        """ASGI view lar uchun — async ORM orqali"""
+        mock = await self.active_mock_queryset().afirst()
         if not mock:
             raise NotFound("Bugungi kunda active mock mavjud emas.")
         return mock
 
 
-class MockListView(ListAPIView):
-    """Admin panel uchun barcha Mock ro'yxati (faqat test uchun)"""
-    queryset = Mock.objects.all()
+def _etag(version, request):
+    raw = f"{version}|{timezone.now().date()}|{request.get_full_path()}"
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def content_etag(request, *args, **kwargs):
+    """Kontent versiyasi + sana + URL dan ETag (bazaga so'rovsiz)"""
+    return _etag(get_content_version(), request)
+
+
+async def acontent_etag(request):
+    """content_etag ning async varianti — event loop da sinxron kesh o'qilmaydi"""
+    return _etag(await aget_content_version(), request)
+
+
+def etag_response(request, response, etag):
+    """
+    ETag faqat muvaffaqiyatli (200) javobga beriladi va If-None-Match shundan
+    keyin tekshiriladi: mavjud bo'lmagan test/section 304 emas, 404 oladi.
+    """
+    if response.status_code == 200 and request.method in ("GET", "HEAD"):
+        response.headers.setdefault("ETag", etag)  # siqilgan javobda W/ ETag allaqachon bor
+        response = get_conditional_response(request, etag=response["ETag"], response=response)
+    # Klient har safar ETag bilan qayta tekshirsin
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+class ContentETagMixin:
+    """Kontent o'zgarmagan bo'lsa If-None-Match ga 304 qaytarish"""
+
+    def dispatch(self, request, *args, **kwargs):
+        response = super().dispatch(request, *args, **kwargs)
+        return etag_response(request, response, quote_etag(content_etag(request)))
+
+
+class FieldSpecMixin:
+    """?fields= / ?exclude= / ?profile= ni serializer context ga qo'shish"""
+
+    def get_field_spec(self):
+        if not hasattr(self, "_field_spec"):
+            self._field_spec = FieldSpec.from_request(self.request)
+        return self._field_spec
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["field_spec"] = self.get_field_spec()
+        return context
+
+
+def bundle_response(request, payload, etag=None):
+    """
+    Payload ni Accept-Encoding bo'yicha oldindan siqilgan variant bilan beradi.
+    Siqilgan javobning ETag i kuchsiz (W/) — GZipMiddleware dagi kabi.
+    etag — tayyor (qo'shtirnoqli) ETag; async view lar uni oldindan hisoblaydi.
+    """
+    body, encoding = payload.encoded(choose_encoding(request.META.get("HTTP_ACCEPT_ENCODING")))
+    response = HttpResponse(body, content_type="application/json")
+    patch_vary_headers(response, ("Accept-Encoding",))
+    if encoding:
+        response["Content-Encoding"] = encoding
+        response["ETag"] = f"W/{etag or quote_etag(content_etag(request))}"
+    response["Content-Length"] = len(body)
+    return response
+
+
+class ExamBundleMixin(FieldSpecMixin, ActiveMockMixin):
+    """Bo'lim ro'yxatini oldindan tayyorlangan bundle dan qaytarish"""
+    bundle_section = None
+
+    def list(self, request, *args, **kwargs):
+        payload = render_section(
+            request, self.bundle_section, self.get_active_mock, self.get_field_spec()
+        )
+        return bundle_response(request, payload)
+
+
+class MockListView(ListFilterMixin, ListAPIView):
+    """
+    Admin panel uchun barcha Mock ro'yxati (faqat test uchun).
+    ?date_from= / ?date_to= — exam_date bo'yicha, cursor pagination.
+    """
+    queryset = apply_plan(Mock.objects.all(), MockSerializer)
     serializer_class = MockSerializer
+    pagination_class = IdCursorPagination
+    date_filter_field = "exam_date"
+    query_budget = 5
 
 
 # ============================
 # 📘 READING TEST VIEWS
 # ============================
-class ReadingTestListView(ActiveMockMixin, ListAPIView):
+class ReadingTestListView(ContentETagMixin, ExamBundleMixin, ListAPIView):
     serializer_class = ReadingTestSerializer
+    bundle_section = "reading"
 
     def get_queryset(self):
         mock = self.get_active_mock()
         return mock.reading_tests.all()
 
 
-class ReadingTestPassageListView(ListAPIView):
+class ReadingTestPassageListView(ContentETagMixin, FieldSpecMixin, ListAPIView):
     serializer_class = PassageSerializer
+    query_budget = 2
 
     def get_queryset(self):
-        return Passage.objects.filter(test__id=self.kwargs["test_id"]).order_by("order")
+        queryset = Passage.objects.filter(test__id=self.kwargs["test_id"]).order_by("order")
+        return apply_plan(queryset, self.get_serializer())
 
 
-class ReadingTestSinglePassageView(RetrieveAPIView):
+class ReadingTestSinglePassageView(ContentETagMixin, FieldSpecMixin, RetrieveAPIView):
     serializer_class = PassageSerializer
+    query_budget = 2
 
     def get_object(self):
         return get_object_or_404(
-            Passage,
+            apply_plan(Passage.objects.all(), self.get_serializer()),
             test__id=self.kwargs["test_id"],
             order=self.kwargs["order"]
         )
@@ -75,8 +193,9 @@ class ReadingTestSinglePassageView(RetrieveAPIView):
 # ============================
 # 🎙️ SPEAKING TEST VIEWS
 # ============================
-class SpeakingTestListView(ActiveMockMixin, ListAPIView):
+class SpeakingTestListView(ContentETagMixin, ExamBundleMixin, ListAPIView):
     serializer_class = SpeakingTestSerializer
+    bundle_section = "speaking"
 
     def get_queryset(self):
         mock = self.get_active_mock()
@@ -86,8 +205,9 @@ class SpeakingTestListView(ActiveMockMixin, ListAPIView):
 # ============================
 # ✍️ WRITING TEST VIEWS
 # ============================
-class WritingTestListView(ActiveMockMixin, ListAPIView):
+class WritingTestListView(ContentETagMixin, ExamBundleMixin, ListAPIView):
     serializer_class = WritingTestSerializer
+    bundle_section = "writing"
 
     def get_queryset(self):
         mock = self.get_active_mock()
@@ -97,20 +217,159 @@ class WritingTestListView(ActiveMockMixin, ListAPIView):
 # ============================
 # 🎧 LISTENING TEST VIEWS
 # ============================
-class ListeningTestListView(ActiveMockMixin, ListAPIView):
+class ListeningTestListView(ContentETagMixin, ExamBundleMixin, ListAPIView):
     serializer_class = ListeningTestSerializer
+    bundle_section = "listening"
 
     def get_queryset(self):
         mock = self.get_active_mock()
         return mock.listening_tests.all()
 
 
-class ListeningSectionDetailView(RetrieveAPIView):
+class ListeningSectionDetailView(ContentETagMixin, FieldSpecMixin, RetrieveAPIView):
     serializer_class = ListeningSectionSerializer
+    query_budget = 4
 
     def get_object(self):
         return get_object_or_404(
-            AudioSection,
+            apply_plan(AudioSection.objects.all(), self.get_serializer()),
             test__id=self.kwargs["test_id"],
             section_number=self.kwargs["section_number"]
         )
+
+
+# ============================
+# 📦 OFLAYN PAKET (markazlar uchun)
+# ============================
+class OfflinePackageView(APIView):
+    """
+    Mock ning oflayn arxivi (ZIP). Range / If-Range bilan — uzilgan yuklash
+    davom ettiriladi. Repr-Digest — butun arxivning sha256 i.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, mock_id):
+        try:
+            package = offline.get_package(mock_id)
+        except Mock.DoesNotExist:
+            raise NotFound("Mock topilmadi.")
+        response = serve_file(
+            request, package.path, content_type="application/zip",
+            cache_control="private, no-cache", filename=package.filename,
+        )
+        digest = base64.b64encode(bytes.fromhex(package.sha256)).decode()
+        response["Repr-Digest"] = f"sha-256=:{digest}:"
+        return response
+
+
+# ============================
+# 🔎 KONTENT QIDIRUVI (faqat staff)
+# ============================
+class ContentSearchView(APIView):
+    """
+    ?q=<matn>&kind=passage,reading_question&limit=50
+    Passage va savollar bo'yicha to'liq matnli qidiruv, eng mosi birinchi.
+    """
+    permission_classes = [IsAdminUser]
+    max_limit = 200
+
+    def get(self, request):
+        query = request.query_params.get("q", "").strip()
+        if not query:
+            raise serializers.ValidationError({"q": "Qidiruv matni kiritilmagan."})
+        kinds = [kind for kind in request.query_params.get("kind", "").split(",") if kind]
+        unknown = set(kinds) - set(search.SOURCES)
+        if unknown:
+            raise serializers.ValidationError({"kind": f"Noma'lum tur: {', '.join(sorted(unknown))}"})
+        limit = request.query_params.get("limit", "50")
+        if not limit.isdigit():
+            raise serializers.ValidationError({"limit": "Butun son bo'lishi kerak."})
+        results = search.search(query, kinds=kinds, limit=min(int(limit), self.max_limit))
+        return Response({"query": query, "count": len(results), "results": results})
+
+
+# ============================
+# ⚡ ASYNC (ASGI) VIEWS
+# settings.ASYNC_EXAM_VIEWS = True bo'lganda yuqoridagi view lar o'rniga
+# ishlatiladi (README dagi ASGI rejimiga qarang). Sekin klient payloadni
+# yuklab olayotganda worker band bo'lmaydi.
+# ============================
+def render_json(serializer):
+    return JSONRenderer().render(serializer.data)
+
+
+class AsyncExamView(View):
+    """DRF siz async view lar uchun asos: ETag, fieldset va JSON xatolar"""
+    http_method_names = ["get", "head", "options"]
+    serializer_class = None
+
+    def get_serializer(self, request, field_spec, *args, **kwargs):
+        context = {"request": request, "field_spec": field_spec}
+        return self.serializer_class(*args, context=context, **kwargs)
+
+    async def get(self, request, *args, **kwargs):
+        etag = quote_etag(await acontent_etag(request))
+        try:
+            payload = await self.render(request, FieldSpec.from_request(request), **kwargs)
+        except APIException as exc:
+            detail = exc.detail if isinstance(exc.detail, (dict, list)) else {"detail": exc.detail}
+            response = JsonResponse(detail, status=exc.status_code, safe=False)
+        else:
+            if isinstance(payload, Payload):
+                encoding = choose_encoding(request.META.get("HTTP_ACCEPT_ENCODING"))
+                if not payload.has(encoding):
+                    await sync_to_async(payload.encoded)(encoding)  # birinchi marta siqish — thread da
+                response = bundle_response(request, payload, etag)
+            else:
+                response = HttpResponse(payload, content_type="application/json")
+        return etag_response(request, response, etag)
+
+    async def render(self, request, field_spec, **kwargs):
+        raise NotImplementedError
+
+
+class AsyncExamSectionView(ActiveMockMixin, AsyncExamView):
+    """Active Mock bo'limi (reading/listening/speaking/writing) — bundle dan"""
+    bundle_section = None
+
+    async def render(self, request, field_spec, **kwargs):
+        return await arender_section(request, self.bundle_section, self.aget_active_mock, field_spec)
+
+
+class AsyncReadingTestPassageListView(AsyncExamView):
+    serializer_class = PassageSerializer
+
+    async def render(self, request, field_spec, test_id):
+        queryset = apply_plan(
+            Passage.objects.filter(test__id=test_id).order_by("order"),
+            self.get_serializer(request, field_spec),
+        )
+        passages = [passage async for passage in queryset]
+        serializer = self.get_serializer(request, field_spec, passages, many=True)
+        return await sync_to_async(render_json)(serializer)
+
+
+class AsyncReadingTestSinglePassageView(AsyncExamView):
+    serializer_class = PassageSerializer
+
+    async def render(self, request, field_spec, test_id, order):
+        passage = await aget_object_or_404(
+            apply_plan(Passage.objects.all(), self.get_serializer(request, field_spec)),
+            test__id=test_id,
+            order=order,
+        )
+        serializer = self.get_serializer(request, field_spec, passage)
+        return await sync_to_async(render_json)(serializer)
+
+
+class AsyncListeningSectionDetailView(AsyncExamView):
+    serializer_class = ListeningSectionSerializer
+
+    async def render(self, request, field_spec, test_id, section_number):
+        section = await aget_object_or_404(
+            apply_plan(AudioSection.objects.all(), self.get_serializer(request, field_spec)),
+            test__id=test_id,
+            section_number=section_number,
+        )
+        serializer = self.get_serializer(request, field_spec, section)
+        return await sync_to_async(render_json)(serializer)
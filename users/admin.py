@@ -1,12 +1,26 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.core.exceptions import PermissionDenied
+from django.http import Http404, HttpResponse
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
 from django.utils.html import format_html
-import matplotlib
-matplotlib.use("Agg")  # headless serverlarda ishlashi uchun
-import matplotlib.pyplot as plt
-import base64
-from io import BytesIO
 
-from .models import User, TestResult, OverallScore
+from .models import User, TestResult, OverallScore, AnswerSheet
+from . import charts
+from .grading import grade_sheets
+from .importers import ImportFileError, import_results
+
+
+# ============ BAND CHART ===============
+def band_chart_img(obj, fmt="svg"):
+    """Diagramma base64 emas, keshlanadigan URL orqali yuklanadi"""
+    key = charts.bands_key(obj.reading_band, obj.listening_band, obj.speaking_band, obj.writing_band)
+    url = reverse('admin:users_overallscore_chart', kwargs={'bands': key, 'fmt': fmt})
+    return format_html(
+        '<img src="{}" width="{}" height="{}" loading="lazy" alt="Band chart" />',
+        url, charts.WIDTH, charts.HEIGHT
+    )
 
 
 # ============ INLINE ===============
@@ -25,35 +39,9 @@ class OverallScoreInline(admin.StackedInline):
 
     def band_chart_inline(self, obj):
         """Reading/Listening/Speaking/Writing uchun mini diagramma (bar chart)"""
-        if not obj:
+        if not obj or not obj.pk:
             return "No data"
-
-        try:
-            labels = ["Reading", "Listening", "Speaking", "Writing"]
-            values = [
-                float(obj.reading_band or 0),
-                float(obj.listening_band or 0),
-                float(obj.speaking_band or 0),
-                float(obj.writing_band or 0),
-            ]
-
-            fig, ax = plt.subplots(figsize=(3, 2))
-            ax.bar(labels, values, color=["#007bff", "#28a745", "#ffc107", "#dc3545"])
-            ax.set_ylim(0, 9)
-            ax.set_ylabel("Band")
-            plt.tight_layout()
-
-            buffer = BytesIO()
-            plt.savefig(buffer, format="png")
-            buffer.seek(0)
-            image_png = buffer.getvalue()
-            buffer.close()
-            plt.close(fig)  # memory leak oldini olish
-
-            chart = base64.b64encode(image_png).decode("utf-8")
-            return format_html('<img src="data:image/png;base64,{}" />', chart)
-        except Exception:
-            return "Chart Error"
+        return band_chart_img(obj)
 
     band_chart_inline.short_description = "Band Diagram"
 
@@ -70,11 +58,15 @@ class UserAdmin(admin.ModelAdmin):
 
 
 # ============ TEST RESULT ADMIN ===============
+class ResultImportForm(forms.Form):
+    file = forms.FileField(label="CSV yoki XLSX fayl")
+
+
 @admin.register(TestResult)
 class TestResultAdmin(admin.ModelAdmin):
     list_display = ['user', 'test_date', 'overall_band_preview']
     search_fields = ['user__name', 'user__last_name', 'user__phone']
-    list_filter = ['test_date']
+    list_filter = ['test_date', 'reading_module']
     date_hierarchy = 'test_date'
     inlines = [OverallScoreInline]
 
@@ -89,6 +81,44 @@ class TestResultAdmin(admin.ModelAdmin):
         )
     overall_band_preview.short_description = "Overall Band"
 
+    def get_urls(self):
+        urls = [
+            path(
+                'import/',
+                self.admin_site.admin_view(self.import_view),
+                name='users_testresult_import',
+            ),
+        ]
+        return urls + super().get_urls()
+
+    def import_view(self, request):
+        """Imtihon markazi faylidan natijalarni ommaviy import qilish"""
+        if not self.has_add_permission(request):
+            raise PermissionDenied
+
+        errors = []
+        form = ResultImportForm(request.POST or None, request.FILES or None)
+        if request.method == "POST" and form.is_valid():
+            upload = form.cleaned_data["file"]
+            try:
+                report = import_results(upload, upload.name)
+            except ImportFileError as exc:
+                self.message_user(request, str(exc), messages.ERROR)
+            else:
+                level = messages.WARNING if report.errors else messages.SUCCESS
+                self.message_user(request, str(report), level)
+                errors = report.errors
+
+        context = {
+            **self.admin_site.each_context(request),
+            "title": "Natijalarni import qilish",
+            "opts": self.model._meta,
+            "form": form,
+            "errors": errors[:200],
+            "errors_hidden": len(errors) > 200,
+        }
+        return TemplateResponse(request, "admin/users/testresult/import.html", context)
+
 
 # ============ OVERALL SCORE ADMIN ===============
 @admin.register(OverallScore)
@@ -104,6 +134,7 @@ class OverallScoreAdmin(admin.ModelAdmin):
         'band_chart'
     ]
     search_fields = ['test_result__user__name', 'test_result__user__last_name']
+    list_select_related = ['test_result__user']  # speaking/writing band va __str__ uchun
     readonly_fields = [
         'reading_band',
         'listening_band',
@@ -127,31 +158,45 @@ class OverallScoreAdmin(admin.ModelAdmin):
 
     def band_chart(self, obj):
         """Reading/Listening/Speaking/Writing uchun mini diagramma (bar chart)"""
+        return band_chart_img(obj)
+
+    def get_urls(self):
+        urls = [
+            path(
+                'chart/<str:bands>.<str:fmt>',
+                # cacheable — admin_view never_cache qo'ymasligi uchun
+                self.admin_site.admin_view(self.chart_view, cacheable=True),
+                name='users_overallscore_chart',
+            ),
+        ]
+        return urls + super().get_urls()
+
+    def chart_view(self, request, bands, fmt):
+        """Band qiymatlari URL da — javob hech qachon o'zgarmaydi, uzoq keshlanadi"""
+        if fmt not in charts.RENDERERS:
+            raise Http404
         try:
-            labels = ["Reading", "Listening", "Speaking", "Writing"]
-            values = [
-                float(obj.reading_band or 0),
-                float(obj.listening_band or 0),
-                float(obj.speaking_band or 0),
-                float(obj.writing_band or 0),
-            ]
-
-            fig, ax = plt.subplots(figsize=(3, 2))
-            ax.bar(labels, values, color=["#007bff", "#28a745", "#ffc107", "#dc3545"])
-            ax.set_ylim(0, 9)
-            ax.set_ylabel("Band")
-            plt.tight_layout()
-
-            buffer = BytesIO()
-            plt.savefig(buffer, format="png")
-            buffer.seek(0)
-            image_png = buffer.getvalue()
-            buffer.close()
-            plt.close(fig)
-
-            chart = base64.b64encode(image_png).decode("utf-8")
-            return format_html('<img src="data:image/png;base64,{}" />', chart)
-        except Exception:
-            return "Chart Error"
+            values = charts.parse_bands(bands)
+        except ValueError:
+            raise Http404
+        render, content_type = charts.RENDERERS[fmt]
+        response = HttpResponse(render(values), content_type=content_type)
+        response["Cache-Control"] = "private, max-age=31536000, immutable"
+        return response
 
     band_chart.short_description = "Band Diagram"
+
+
+# ============ ANSWER SHEET ADMIN ===============
+@admin.register(AnswerSheet)
+class AnswerSheetAdmin(admin.ModelAdmin):
+    list_display = ['user', 'reading_test', 'listening_test', 'status', 'submitted_at', 'test_result']
+    list_filter = ['status', 'submitted_at']
+    search_fields = ['user__name', 'user__last_name', 'user__phone']
+    readonly_fields = ['status', 'submitted_at', 'test_result']
+    actions = ['grade_selected']
+
+    @admin.action(description="Tanlangan varaqalarni baholash")
+    def grade_selected(self, request, queryset):
+        graded = grade_sheets(list(queryset.filter(status="pending")))
+        self.message_user(request, f"{graded} ta varaqa baholandi.")
@@ -0,0 +1,112 @@
+"""
+Xom ball (to'g'ri javoblar soni) -> IELTS band jadvallari.
+
+Jadvallar ma'lumot sifatida saqlanadi: (minimal to'g'ri javoblar, band) juftliklari.
+Har bir jadvaldan 0..40 uchun tayyor lookup massivi quriladi, shuning uchun
+ko'plab natijani hisoblash — oddiy indekslash. Jadval o'zgarsa, shu yerda
+tahrirlab, `python manage.py recompute_bands` ni ishga tushiring.
+"""
+from bisect import bisect_right
+from decimal import Decimal, ROUND_HALF_UP
+
+
+MAX_RAW_SCORE = 40
+
+LISTENING = "listening"
+ACADEMIC_READING = "academic"
+GENERAL_READING = "general"
+
+BAND_TABLES = {
+    LISTENING: [
+        (4, "2.5"), (6, "3.0"), (8, "3.5"), (10, "4.0"), (13, "4.5"), (15, "5.0"), (19, "5.5"),
+        (23, "6.0"), (27, "6.5"), (30, "7.0"), (33, "7.5"), (35, "8.0"), (37, "8.5"), (39, "9.0"),
+    ],
+    ACADEMIC_READING: [
+        (4, "2.5"), (6, "3.0"), (8, "3.5"), (10, "4.0"), (13, "4.5"), (15, "5.0"), (19, "5.5"),
+        (23, "6.0"), (27, "6.5"), (30, "7.0"), (33, "7.5"), (35, "8.0"), (37, "8.5"), (39, "9.0"),
+    ],
+    GENERAL_READING: [
+        (6, "2.5"), (9, "3.0"), (12, "3.5"), (15, "4.0"), (19, "4.5"), (23, "5.0"), (27, "5.5"),
+        (30, "6.0"), (32, "6.5"), (34, "7.0"), (36, "7.5"), (37, "8.0"), (39, "8.5"), (40, "9.0"),
+    ],
+}
+ZERO_BAND = Decimal("0.0")
+
+
+def _build_lookup(table):
+    thresholds = [raw for raw, _ in table]
+    bands = [ZERO_BAND] + [Decimal(band) for _, band in table]
+    return tuple(bands[bisect_right(thresholds, raw)] for raw in range(MAX_RAW_SCORE + 1))
+
+
+# {jadval: (band 0 uchun, band 1 uchun, ..., band 40 uchun)}
+LOOKUPS = {name: _build_lookup(table) for name, table in BAND_TABLES.items()}
+
+
+def raw_to_band(raw, table=LISTENING):
+    """Bitta xom ball uchun band (Decimal)"""
+    return LOOKUPS[table][min(max(int(raw), 0), MAX_RAW_SCORE)]
+
+
+def reading_table(reading_module):
+    return GENERAL_READING if reading_module == GENERAL_READING else ACADEMIC_READING
+
+
+def round_band(score):
+    """Eng yaqin 0.5 ga yaxlitlash: .25 -> .5, .75 -> keyingi butun"""
+    halves = (Decimal(score) * 2).quantize(Decimal(1), rounding=ROUND_HALF_UP)
+    return (halves / 2).quantize(Decimal("0.1"))
+
+
+def overall_band(reading, listening, speaking, writing):
+    """To'rt bo'lim o'rtachasi, IELTS qoidasi bo'yicha yaxlitlangan"""
+    total = Decimal(reading) + Decimal(listening) + Decimal(speaking) + Decimal(writing)
+    return round_band(total / 4)
+
+
+def compute_bands(results):
+    """
+    TestResult lar uchun [(reading_band, listening_band, overall_band)] qaytaradi.
+    """
+    listening_lookup = LOOKUPS[LISTENING]
+    bands = []
+    for result in results:
+        reading_lookup = LOOKUPS[reading_table(result.reading_module)]
+        reading = reading_lookup[min(max(result.reading_correct_answers, 0), MAX_RAW_SCORE)]
+        listening = listening_lookup[min(max(result.listening_correct_answers, 0), MAX_RAW_SCORE)]
+        bands.append((
+            reading, listening,
+            overall_band(reading, listening, result.speaking_score, result.writing_score),
+        ))
+    return bands
+
+
+def recompute_chunk(scores):
+    """
+    OverallScore lar (test_result bilan birga yuklangan) bandlarini qayta hisoblaydi.
+    Faqat o'zgarganlarini qaytaradi.
+    """
+    changed = []
+    for score, (reading, listening, overall) in zip(scores, compute_bands(s.test_result for s in scores)):
+        if (score.reading_band, score.listening_band, score.overall_band) != (reading, listening, overall):
+            score.reading_band, score.listening_band, score.overall_band = reading, listening, overall
+            changed.append(score)
+    return changed
+
+
+def bulk_update_bands(scores):
+    """
+    O'zgargan OverallScore larni yozadi. Band kombinatsiyalari kam bo'lgani uchun
+    bir xil bandli qatorlar bitta UPDATE ... WHERE id IN (...) bilan yangilanadi —
+    katta hajmda CASE WHEN li bulk_update dan ancha tez.
+    """
+    from .models import OverallScore
+
+    groups = {}
+    for score in scores:
+        groups.setdefault((score.reading_band, score.listening_band, score.overall_band), []).append(score.pk)
+    for (reading, listening, overall), ids in groups.items():
+        OverallScore.objects.filter(pk__in=ids).update(
+            reading_band=reading, listening_band=listening, overall_band=overall,
+        )
+    return len(groups)
@@ -0,0 +1,90 @@
+"""
+Band diagrammalari (Reading/Listening/Speaking/Writing bar chart).
+
+Diagramma faqat to'rtta band qiymatiga bog'liq va kombinatsiyalar soni bir
+necha mingta, shuning uchun natijalar xotirada keshlanadi. Asosiy format —
+qo'lda yig'iladigan yengil SVG; PNG kerak bo'lsa matplotlib faqat shu
+paytda import qilinadi.
+"""
+from functools import lru_cache
+from io import BytesIO
+
+from .bands import round_band
+
+
+LABELS = ["Reading", "Listening", "Speaking", "Writing"]
+COLORS = ["#007bff", "#28a745", "#ffc107", "#dc3545"]
+MAX_BAND = 9.0
+
+WIDTH, HEIGHT = 300, 200
+PAD_LEFT, PAD_BOTTOM, PAD_TOP = 28, 22, 10
+
+
+def parse_bands(value):
+    """ "6.5-7.0-6.0-5.5" -> (6.5, 7.0, 6.0, 5.5); noto'g'ri bo'lsa ValueError"""
+    parts = value.split("-")
+    if len(parts) != len(LABELS):
+        raise ValueError(value)
+    bands = tuple(float(part) for part in parts)
+    if any(not 0 <= band <= MAX_BAND or (band * 2) % 1 for band in bands):
+        raise ValueError(value)
+    return bands
+
+
+def bands_key(reading, listening, speaking, writing):
+    """URL kaliti; speaking/writing 0.1 qadamli bo'lishi mumkin — eng yaqin yarim bandga"""
+    return "-".join(f"{round_band(band or 0)}" for band in (reading, listening, speaking, writing))
+
+
+@lru_cache(maxsize=4096)
+def render_svg(bands):
+    plot_width = WIDTH - PAD_LEFT - 6
+    plot_height = HEIGHT - PAD_TOP - PAD_BOTTOM
+    slot = plot_width / len(bands)
+    bar_width = slot * 0.6
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{WIDTH}" height="{HEIGHT}" '
+        f'viewBox="0 0 {WIDTH} {HEIGHT}" font-family="sans-serif" font-size="10">',
+    ]
+    for tick in range(0, 10, 3):
+        y = PAD_TOP + plot_height * (1 - tick / MAX_BAND)
+        parts.append(
+            f'<line x1="{PAD_LEFT}" y1="{y:.1f}" x2="{WIDTH - 6}" y2="{y:.1f}" stroke="#ddd"/>'
+            f'<text x="{PAD_LEFT - 4}" y="{y + 3:.1f}" text-anchor="end">{tick}</text>'
+        )
+    for index, (label, color, band) in enumerate(zip(LABELS, COLORS, bands)):
+        height = plot_height * band / MAX_BAND
+        x = PAD_LEFT + slot * index + (slot - bar_width) / 2
+        y = PAD_TOP + plot_height - height
+        center = x + bar_width / 2
+        parts.append(
+            f'<rect x="{x:.1f}" y="{y:.1f}" width="{bar_width:.1f}" height="{height:.1f}" fill="{color}"/>'
+            f'<text x="{center:.1f}" y="{y - 2:.1f}" text-anchor="middle">{band:g}</text>'
+            f'<text x="{center:.1f}" y="{HEIGHT - 8}" text-anchor="middle">{label}</text>'
+        )
+    parts.append("</svg>")
+    return "".join(parts).encode()
+
+
+@lru_cache(maxsize=512)
+def render_png(bands):
+    from matplotlib.figure import Figure
+
+    # pyplot ishlatilmaydi: GUI backend kerak emas, global holat yo'q (thread-safe)
+    fig = Figure(figsize=(3, 2))
+    ax = fig.subplots()
+    ax.bar(LABELS, bands, color=COLORS)
+    ax.set_ylim(0, MAX_BAND)
+    ax.set_ylabel("Band")
+    fig.tight_layout()
+
+    buffer = BytesIO()
+    fig.savefig(buffer, format="png")
+    return buffer.getvalue()
+
+
+RENDERERS = {
+    "svg": (render_svg, "image/svg+xml"),
+    "png": (render_png, "image/png"),
+}
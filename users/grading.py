@@ -0,0 +1,88 @@
+"""
+Reading va Listening javob varaqalarini avtomatik tekshirish.
+
+Javob kalitlari testapp.answer_keys dan olinadi (kompilyatsiya qilingan va
+keshlangan), varaqalar paket (batch) bo'lib baholanadi va TestResult +
+OverallScore lar bulk_create bilan yoziladi.
+"""
+from django.db import transaction
+
+from testapp.answer_keys import get_answer_key
+from testapp.versioning import get_content_version
+from .models import AnswerSheet, TestResult, OverallScore
+from .write_queue import result_writes
+
+
+def grade_sheets(sheets):
+    """
+    Javob varaqalarini baholab, TestResult va OverallScore larni bulk yozadi.
+    Baholangan varaqalar sonini qaytaradi (boshqa jarayon egallaganlari hisobga kirmaydi).
+    """
+    sheets = [sheet for sheet in sheets if sheet.status == "pending"]
+    if not sheets:
+        return 0
+
+    version = get_content_version()
+    results = []
+    for sheet in sheets:
+        reading_correct = listening_correct = 0
+        if sheet.reading_test_id:
+            key = get_answer_key("reading", sheet.reading_test_id, version)
+            reading_correct = key.score(sheet.reading_answers)
+        if sheet.listening_test_id:
+            key = get_answer_key("listening", sheet.listening_test_id, version)
+            listening_correct = key.score(sheet.listening_answers)
+
+        results.append(TestResult(
+            user_id=sheet.user_id,
+            reading_correct_answers=reading_correct,
+            listening_correct_answers=listening_correct,
+        ))
+
+    return result_writes.run(_save_results, sheets, results)
+
+
+def _save_results(sheets, results):
+    """Faqat shu tranzaksiyada egallangan varaqalarni yozadi; ularning sonini qaytaradi"""
+    with transaction.atomic():
+        # Parallel baholash (grade action + grade_pending) bir varaqani ikki marta
+        # baholamasligi uchun: 'pending' -> 'grading' UPDATE bilan egallaymiz.
+        # 'grading' hech qachon commit bo'lmaydi — shu tranzaksiyada 'graded' ga o'tadi.
+        ids = [sheet.pk for sheet in sheets]
+        AnswerSheet.objects.filter(pk__in=ids, status="pending").update(status="grading")
+        claimed = set(AnswerSheet.objects.filter(pk__in=ids, status="grading").values_list("pk", flat=True))
+        pairs = [(sheet, result) for sheet, result in zip(sheets, results) if sheet.pk in claimed]
+        if not pairs:
+            return 0
+        sheets, results = [sheet for sheet, _ in pairs], [result for _, result in pairs]
+
+        # bulk_create signal chaqirmaydi, shuning uchun OverallScore ni o'zimiz yaratamiz
+        TestResult.objects.bulk_create(results)
+
+        scores = []
+        for result in results:
+            score = OverallScore(test_result=result)
+            score.set_bands()
+            scores.append(score)
+        OverallScore.objects.bulk_create(scores)
+
+        for sheet, result in zip(sheets, results):
+            sheet.test_result = result
+            sheet.status = "graded"
+        AnswerSheet.objects.bulk_update(sheets, ["test_result", "status"])
+    return len(sheets)
+
+
+def grade_pending(batch_size=500):
+    """Barcha 'pending' varaqalarni batch_size dan baholaydi"""
+    graded = 0
+    while True:
+        batch = list(
+            AnswerSheet.objects.filter(status="pending").order_by("id")[:batch_size]
+        )
+        if not batch:
+            return graded
+        count = grade_sheets(batch)
+        if not count:
+            return graded  # batchni boshqa jarayon egallagan — o'sha baholaydi
+        graded += count
@@ -0,0 +1,337 @@
+"""
+Imtihon markazlari yuboradigan CSV/XLSX natija fayllarini ommaviy import qilish.
+
+Fayl qatorma-qator (stream) o'qiladi va batch_size lik paketlarga bo'linadi.
+Har bir paket uchun foydalanuvchilar bitta so'rov bilan topiladi, yo'qlari
+bulk_create bilan yaratiladi, TestResult va OverallScore lar esa signalsiz
+bulk_create qilinadi. Xato qatorlar hisobotga yoziladi, import to'xtamaydi.
+
+Ustunlar: name, last_name, middle_name, phone, reading, listening, speaking,
+writing, test_date va module (academic/general, ixtiyoriy). To'liq nomlar (reading_correct_answers,
+speaking_score, ...) ham qabul qilinadi.
+"""
+import csv
+import io
+import os
+import zipfile
+from datetime import datetime, time as dt_time
+from decimal import Decimal, InvalidOperation
+
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from . import bands, lookup
+from .models import User, TestResult, OverallScore
+from .write_queue import result_writes
+
+
+COLUMN_ALIASES = {
+    "name": "name",
+    "first_name": "name",
+    "last_name": "last_name",
+    "surname": "last_name",
+    "middle_name": "middle_name",
+    "phone": "phone",
+    "reading": "reading_correct_answers",
+    "reading_correct_answers": "reading_correct_answers",
+    "listening": "listening_correct_answers",
+    "listening_correct_answers": "listening_correct_answers",
+    "speaking": "speaking_score",
+    "speaking_score": "speaking_score",
+    "writing": "writing_score",
+    "writing_score": "writing_score",
+    "test_date": "test_date",
+    "date": "test_date",
+    "module": "reading_module",
+    "reading_module": "reading_module",
+}
+READING_MODULES = {
+    "": bands.ACADEMIC_READING,
+    "academic": bands.ACADEMIC_READING,
+    "ac": bands.ACADEMIC_READING,
+    "general": bands.GENERAL_READING,
+    "general training": bands.GENERAL_READING,
+    "gt": bands.GENERAL_READING,
+}
+REQUIRED_COLUMNS = {"name", "last_name", "phone"}
+MAX_CORRECT_ANSWERS = 40
+
+
+class ImportFileError(Exception):
+    """Faylni umuman o'qib bo'lmadi (format yoki sarlavha xato)"""
+
+
+class RowError(ValueError):
+    pass
+
+
+class ImportReport:
+    def __init__(self):
+        self.rows = 0
+        self.created = 0
+        self.users_created = 0
+        self.errors = []  # [(qator raqami, xabar)]
+
+    def __str__(self):
+        return (
+            f"{self.rows} qator: {self.created} ta natija, "
+            f"{self.users_created} ta yangi foydalanuvchi, {len(self.errors)} ta xato"
+        )
+
+
+# ============ FAYLNI O'QISH ===============
+# Excel "CSV" ni Windows kodirovkasida (kirill uchun cp1251) saqlaydi
+CSV_ENCODINGS = ("utf-8-sig", "cp1251")
+
+
+def _csv_encoding(fileobj):
+    """
+    CSV ni bir marta to'liq o'qib, kodirovkasini aniqlaydi. Kodirovka yoki CSV
+    xatolari shu yerda chiqadi — birinchi paket yozilishidan oldin.
+    """
+    for encoding in CSV_ENCODINGS:
+        fileobj.seek(0)
+        text = io.TextIOWrapper(fileobj, encoding=encoding, newline="")
+        reader = csv.reader(text)
+        try:
+            for _ in reader:
+                pass
+        except UnicodeDecodeError:
+            continue
+        except csv.Error as exc:
+            raise ImportFileError(f"{reader.line_num}-qator: CSV xatosi ({exc})")
+        finally:
+            text.detach()  # yuklangan faylni yopmaslik uchun
+        fileobj.seek(0)
+        return encoding
+    raise ImportFileError("Fayl kodirovkasi aniqlanmadi: UTF-8 yoki Windows-1251 bo'lishi kerak")
+
+
+def _iter_csv(fileobj):
+    text = io.TextIOWrapper(fileobj, encoding=_csv_encoding(fileobj), newline="")
+    try:
+        yield from csv.reader(text)
+    finally:
+        text.detach()
+
+
+def _iter_xlsx(fileobj):
+    try:
+        from openpyxl import load_workbook
+        from openpyxl.utils.exceptions import InvalidFileException
+    except ImportError:
+        raise ImportFileError("XLSX import uchun openpyxl o'rnatilishi kerak (pip install openpyxl)")
+
+    try:
+        workbook = load_workbook(fileobj, read_only=True, data_only=True)
+    except (zipfile.BadZipFile, InvalidFileException, KeyError, OSError) as exc:
+        raise ImportFileError(f"XLSX faylni o'qib bo'lmadi: {exc}")
+    try:
+        for row in workbook.worksheets[0].iter_rows(values_only=True):
+            yield row
+    finally:
+        workbook.close()
+
+
+def iter_records(fileobj, filename):
+    """(qator raqami, {maydon: qiymat}) juftliklarini birma-bir qaytaradi"""
+    extension = os.path.splitext(filename)[1].lower()
+    if extension == ".csv":
+        rows = _iter_csv(fileobj)
+    elif extension in (".xlsx", ".xlsm"):
+        rows = _iter_xlsx(fileobj)
+    else:
+        raise ImportFileError(f"Qo'llab-quvvatlanmaydigan fayl turi: {extension or filename}")
+
+    header = next(rows, None)
+    if header is None:
+        raise ImportFileError("Fayl bo'sh")
+    columns = [
+        COLUMN_ALIASES.get(str(cell or "").strip().lower().replace(" ", "_"))
+        for cell in header
+    ]
+    missing = REQUIRED_COLUMNS - set(columns)
+    if missing:
+        raise ImportFileError(f"Ustunlar topilmadi: {', '.join(sorted(missing))}")
+
+    for number, row in enumerate(rows, start=2):
+        if not any(cell not in (None, "") for cell in row):
+            continue  # bo'sh qator
+        yield number, {
+            column: value for column, value in zip(columns, row) if column is not None
+        }
+
+
+# ============ QATORNI TEKSHIRISH ===============
+def _text(value):
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)  # Excel telefon raqamini son qilib saqlaydi
+    return str(value).strip()
+
+
+def _correct_answers(record, field):
+    value = _text(record.get(field))
+    if not value:
+        return 0
+    try:
+        number = Decimal(value)
+        if not number.is_finite():  # "nan", "inf" — int() ValueError/OverflowError beradi
+            raise InvalidOperation
+    except InvalidOperation:
+        raise RowError(f"{field}: son emas ({value!r})")
+    # Oraliq int() dan oldin: "1e999999" ni butun songa aylantirmaymiz
+    if not 0 <= number <= MAX_CORRECT_ANSWERS:
+        raise RowError(f"{field}: 0..{MAX_CORRECT_ANSWERS} oralig'ida bo'lishi kerak ({value})")
+    return int(number)
+
+
+def _band(record, field):
+    value = _text(record.get(field))
+    if not value:
+        return Decimal("0.0")
+    try:
+        band = Decimal(value.replace(",", "."))
+        if not band.is_finite():  # "nan" bilan solishtirish InvalidOperation beradi
+            raise InvalidOperation
+    except InvalidOperation:
+        raise RowError(f"{field}: son emas ({value!r})")
+    if not 0 <= band <= 9 or band * 2 % 1:
+        raise RowError(f"{field}: 0..9 oralig'ida, 0.5 qadam bilan bo'lishi kerak ({value})")
+    return band.quantize(Decimal("0.1"))
+
+
+def _reading_module(record):
+    value = _text(record.get("reading_module")).lower().replace("_", " ")
+    if value not in READING_MODULES:
+        raise RowError(f"reading_module: 'academic' yoki 'general' bo'lishi kerak ({value!r})")
+    return READING_MODULES[value]
+
+
+def _test_date(record):
+    value = record.get("test_date")
+    if value in (None, ""):
+        return None
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        value = _text(value)
+        try:
+            parsed = parse_datetime(value) or parse_date(value)
+        except ValueError:
+            # Format to'g'ri, lekin bunday sana yo'q: 2025-02-30
+            raise RowError(f"test_date: mavjud bo'lmagan sana ({value!r})")
+        if parsed is None:
+            raise RowError(f"test_date: sana formati noto'g'ri ({value!r}), YYYY-MM-DD kutiladi")
+        if not isinstance(parsed, datetime):
+            parsed = datetime.combine(parsed, dt_time())
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def user_key(name, last_name, middle_name, phone):
+    return (lookup.search_key(name, last_name, middle_name), lookup.phone_key(phone))
+
+
+def parse_record(record):
+    """Qatorni tekshiradi: (user maydonlari, TestResult maydonlari, test_date)"""
+    user = {field: _text(record.get(field)) for field in ("name", "last_name", "middle_name", "phone")}
+    for field, value in user.items():
+        if field in REQUIRED_COLUMNS and not value:
+            raise RowError(f"{field} bo'sh")
+        if len(value) > 255:
+            raise RowError(f"{field}: 255 belgidan uzun")
+    user["middle_name"] = user["middle_name"] or None
+
+    result = {
+        "reading_correct_answers": _correct_answers(record, "reading_correct_answers"),
+        "listening_correct_answers": _correct_answers(record, "listening_correct_answers"),
+        "speaking_score": _band(record, "speaking_score"),
+        "writing_score": _band(record, "writing_score"),
+        "reading_module": _reading_module(record),
+    }
+    return user, result, _test_date(record)
+
+
+# ============ YOZISH ===============
+def _resolve_users(users):
+    """{user_key: User} — mavjudlarini topadi, yo'qlarini bulk_create qiladi"""
+    phone_keys = {phone_key for _, phone_key in users}
+    found = {}
+    for user in User.objects.filter(phone_key__in=phone_keys):
+        found.setdefault((user.search_key, user.phone_key), user)
+
+    missing = [User(**fields) for key, fields in users.items() if key not in found]
+    for user in missing:
+        user.set_search_keys()
+    User.objects.bulk_create(missing)
+    for user in missing:
+        found[(user.search_key, user.phone_key)] = user
+    return found, len(missing)
+
+
+def _write_batch(batch):
+    """Paketni bitta tranzaksiyada yozadi: (natijalar soni, yangi foydalanuvchilar soni)"""
+    with transaction.atomic():
+        users, users_created = _resolve_users({
+            user_key(**user): user for _, user, _, _ in batch
+        })
+
+        results, dated = [], {}
+        for _, user, fields, test_date in batch:
+            result = TestResult(user=users[user_key(**user)], **fields)
+            results.append(result)
+            if test_date is not None:
+                dated.setdefault(test_date, []).append(result)
+        # bulk_create signal chaqirmaydi — OverallScore ni shu yerda hisoblaymiz
+        TestResult.objects.bulk_create(results)
+
+        scores = []
+        for result in results:
+            score = OverallScore(test_result=result)
+            score.set_bands()
+            scores.append(score)
+        OverallScore.objects.bulk_create(scores)
+
+        # test_date auto_now_add — bulk_create uni hozirgi vaqt bilan yozadi.
+        # Faylda sanalar odatda bir nechta, shuning uchun har sana uchun bitta UPDATE.
+        for test_date, dated_results in dated.items():
+            TestResult.objects.filter(pk__in=[result.pk for result in dated_results]).update(test_date=test_date)
+            for result in dated_results:
+                result.test_date = test_date
+
+    return len(results), users_created
+
+
+def import_results(fileobj, filename, batch_size=2000):
+    """Faylni import qiladi va ImportReport qaytaradi"""
+    report = ImportReport()
+    batch = []
+
+    def flush():
+        try:
+            created, users_created = result_writes.run(_write_batch, batch)
+        except DatabaseError as exc:
+            # Paket to'liq bekor qilindi — uning qatorlarini xato deb belgilaymiz
+            report.errors.extend((number, f"DB xatosi: {exc}") for number, _, _, _ in batch)
+        else:
+            report.created += created
+            report.users_created += users_created
+        batch.clear()
+
+    for number, record in iter_records(fileobj, filename):
+        report.rows += 1
+        try:
+            user, fields, test_date = parse_record(record)
+        except RowError as exc:
+            report.errors.append((number, str(exc)))
+            continue
+        batch.append((number, user, fields, test_date))
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    return report
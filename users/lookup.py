@@ -0,0 +1,66 @@
+"""
+Nomzodni ism-familiya (va ixtiyoriy telefon) bo'yicha topish.
+
+Ismlar bazada normallashtirilgan kalit (User.search_key) sifatida ham
+saqlanadi: katta-kichik harf, apostrof turlari (o‘ / o' / o` / oʻ) va
+ortiqcha bo'shliqlar farq qilmaydi. Kalit va telefon (User.phone_key)
+indekslangan, natijalar esa overall score bilan bitta so'rovda olinadi.
+"""
+import re
+import unicodedata
+
+
+# O'zbek lotin yozuvidagi barcha apostrof / tutuq belgisi variantlari
+APOSTROPHES = "'`´‘’ʻʼʽ′"
+_APOSTROPHE_RE = re.compile(f"[{re.escape(APOSTROPHES)}]")
+_SPACE_RE = re.compile(r"\s+")
+PHONE_KEY_DIGITS = 9  # +998 XX XXX XX XX — mamlakat kodisiz 9 raqam
+
+
+class AmbiguousCandidate(Exception):
+    """Bir nechta nomzod bir xil ism-familiyaga ega (telefon kerak)"""
+
+
+def normalize_name(value):
+    value = unicodedata.normalize("NFKC", value or "").casefold()
+    value = _APOSTROPHE_RE.sub("'", value)
+    return _SPACE_RE.sub(" ", value).strip()
+
+
+def search_key(name, last_name, middle_name=None):
+    return "|".join(normalize_name(part) for part in (last_name, name, middle_name))
+
+
+def phone_key(phone):
+    digits = re.sub(r"\D", "", phone or "")
+    return digits[-PHONE_KEY_DIGITS:]
+
+
+def find_candidate(name, last_name, middle_name=None, phone=None):
+    """
+    (user, [TestResult]) qaytaradi — natijalar eng yangisidan, overall_score bilan.
+    Nomzod topilmasa (None, []). Natijasi bor nomzodda bitta so'rov bajariladi.
+    """
+    from .models import User, TestResult
+
+    filters = {"user__search_key": search_key(name, last_name, middle_name)}
+    if phone:
+        filters["user__phone_key"] = phone_key(phone)
+
+    results = list(
+        TestResult.objects
+        .filter(**filters)
+        .select_related("user", "overall_score")
+        .order_by("-test_date", "-id")
+    )
+    users = {result.user_id: result.user for result in results}
+    if len(users) > 1:
+        raise AmbiguousCandidate
+    if users:
+        return users.popitem()[1], results
+
+    # Natijasi yo'q nomzod — faqat foydalanuvchini qidiramiz
+    candidates = list(User.objects.filter(**{key[len("user__"):]: value for key, value in filters.items()})[:2])
+    if len(candidates) > 1:
+        raise AmbiguousCandidate
+    return (candidates[0] if candidates else None), []
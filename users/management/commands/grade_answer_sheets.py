@@ -0,0 +1,18 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from users.grading import grade_pending
+
+
+class Command(BaseCommand):
+    help = "Baholanmagan Reading/Listening javob varaqalarini paket bo'lib tekshiradi"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        graded = grade_pending(batch_size=options["batch_size"])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"{graded} ta varaqa {elapsed:.2f}s da baholandi."))
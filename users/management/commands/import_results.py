@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from users.importers import ImportFileError, import_results
+
+
+class Command(BaseCommand):
+    help = (
+        "Imtihon markazining CSV/XLSX faylidan test natijalarini ommaviy import qiladi. "
+        "Foydalanuvchilar topiladi yoki yaratiladi, bandlar bir yo'la hisoblanadi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--batch-size", type=int, default=2000)
+        parser.add_argument("--show-errors", type=int, default=50, help="Nechta xato qatorni chiqarish")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        started = time.perf_counter()
+        try:
+            with open(path, "rb") as fileobj:
+                report = import_results(fileobj, path, batch_size=options["batch_size"])
+        except (OSError, ImportFileError) as exc:
+            raise CommandError(str(exc))
+        elapsed = time.perf_counter() - started
+
+        for number, message in report.errors[:options["show_errors"]]:
+            self.stderr.write(f"{number}-qator: {message}")
+        if len(report.errors) > options["show_errors"]:
+            self.stderr.write(f"... yana {len(report.errors) - options['show_errors']} ta xato")
+        self.stdout.write(self.style.SUCCESS(f"{report} ({elapsed:.2f}s)"))
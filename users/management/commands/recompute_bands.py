@@ -0,0 +1,56 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from users.bands import bulk_update_bands, recompute_chunk
+from users.models import OverallScore
+from users.write_queue import result_writes
+
+
+BAND_FIELDS = ["reading_band", "listening_band", "overall_band"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Barcha OverallScore bandlarini users/bands.py dagi jadvallar bo'yicha qayta hisoblaydi. "
+        "Jadval o'zgarganda ishga tushiring; faqat o'zgargan qatorlar chunk larda yangilanadi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=5000)
+        parser.add_argument("--dry-run", action="store_true", help="Faqat nechta qator o'zgarishini ko'rsatish")
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        queryset = (
+            OverallScore.objects
+            .select_related("test_result")
+            .only(
+                "id", *BAND_FIELDS,
+                "test_result__reading_module", "test_result__reading_correct_answers",
+                "test_result__listening_correct_answers", "test_result__speaking_score",
+                "test_result__writing_score",
+            )
+            .order_by("id")
+        )
+
+        started = time.perf_counter()
+        last_id, scanned, updated = 0, 0, 0
+        while True:
+            # Keyset pagination: OFFSET siz, har bir chunk indeks bo'yicha olinadi
+            chunk = list(queryset.filter(id__gt=last_id)[:chunk_size])
+            if not chunk:
+                break
+            last_id = chunk[-1].id
+            scanned += len(chunk)
+
+            changed = recompute_chunk(chunk)
+            if changed and not options["dry_run"]:
+                result_writes.run(bulk_update_bands, changed)
+            updated += len(changed)
+            if options["verbosity"] > 1:
+                self.stdout.write(f"{scanned} ta ko'rildi, {updated} ta o'zgardi")
+
+        elapsed = time.perf_counter() - started
+        verb = "o'zgaradi" if options["dry_run"] else "yangilandi"
+        self.stdout.write(self.style.SUCCESS(f"{scanned} ta natijadan {updated} tasi {verb} ({elapsed:.2f}s)"))
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.4 on 2026-10-18 09:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('testapp', '0016_remove_writingtask1_sample_answer_and_more'),
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnswerSheet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reading_answers', models.JSONField(blank=True, default=dict)),
+                ('listening_answers', models.JSONField(blank=True, default=dict)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('graded', 'Graded')], db_index=True, default='pending', max_length=20)),
+                ('submitted_at', models.DateTimeField(auto_now_add=True)),
+                ('listening_test', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='answer_sheets', to='testapp.listeningtest')),
+                ('reading_test', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='answer_sheets', to='testapp.readingtest')),
+                ('test_result', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='answer_sheet', to='users.testresult')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='answer_sheets', to='users.user')),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 12:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_answersheet'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='testresult',
+            name='reading_module',
+            field=models.CharField(choices=[('academic', 'Academic'), ('general', 'General Training')], default='academic', max_length=20),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.4 on 2026-10-18 13:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_testresult_reading_module'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='testresult',
+            name='test_date',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+        migrations.AddIndex(
+            model_name='testresult',
+            index=models.Index(fields=['user', '-id'], name='testresult_user_id_idx'),
+        ),
+    ]
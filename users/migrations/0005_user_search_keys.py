@@ -0,0 +1,44 @@
+# Generated by Django 5.2.4 on 2026-10-18 14:10
+
+from django.db import migrations, models
+
+
+def fill_search_keys(apps, schema_editor):
+    from users.lookup import phone_key, search_key
+
+    User = apps.get_model('users', 'User')
+    batch = []
+    for user in User.objects.only('id', 'name', 'last_name', 'middle_name', 'phone').iterator(chunk_size=2000):
+        user.search_key = search_key(user.name, user.last_name, user.middle_name)
+        user.phone_key = phone_key(user.phone)
+        batch.append(user)
+        if len(batch) >= 2000:
+            User.objects.bulk_update(batch, ['search_key', 'phone_key'])
+            batch = []
+    if batch:
+        User.objects.bulk_update(batch, ['search_key', 'phone_key'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_testresult_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='search_key',
+            field=models.CharField(default='', editable=False, max_length=800),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='phone_key',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=20),
+        ),
+        migrations.RunPython(fill_search_keys, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['search_key', 'phone_key'], name='user_search_key_idx'),
+        ),
+    ]
@@ -1,7 +1,8 @@
 from django.db import models
 import os
 import uuid
-from decimal import Decimal
+
+from . import bands, lookup
 
 
 class User(models.Model):
@@ -10,19 +11,55 @@ class User(models.Model):
     middle_name = models.CharField(max_length=255, blank=True, null=True)
     phone = models.CharField(max_length=255)
 
+    # Qidiruv uchun normallashtirilgan kalitlar (users/lookup.py), save() da yangilanadi
+    search_key = models.CharField(max_length=800, default='', editable=False)
+    phone_key = models.CharField(max_length=20, default='', editable=False, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['search_key', 'phone_key'], name='user_search_key_idx'),
+        ]
+
+    def set_search_keys(self):
+        """bulk_create dan oldin ham chaqiriladi (save() ishlamaydi)"""
+        self.search_key = lookup.search_key(self.name, self.last_name, self.middle_name)
+        self.phone_key = lookup.phone_key(self.phone)
+
+    def save(self, *args, **kwargs):
+        self.set_search_keys()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'search_key', 'phone_key'}
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.name} {self.last_name}"
 
 
 
 class TestResult(models.Model):
+    READING_MODULE_CHOICES = [
+        (bands.ACADEMIC_READING, "Academic"),
+        (bands.GENERAL_READING, "General Training"),
+    ]
+
     user = models.ForeignKey('User', on_delete=models.CASCADE, related_name='test_results')
-    test_date = models.DateTimeField(auto_now_add=True)
+    test_date = models.DateTimeField(auto_now_add=True, db_index=True)
+    reading_module = models.CharField(
+        max_length=20, choices=READING_MODULE_CHOICES, default=bands.ACADEMIC_READING
+    )
 
     reading_correct_answers = models.PositiveIntegerField(default=0)
     listening_correct_answers = models.PositiveIntegerField(default=0)
     speaking_score = models.DecimalField(max_digits=3, decimal_places=1, default=0.0)
     writing_score = models.DecimalField(max_digits=3, decimal_places=1, default=0.0)
+
+    class Meta:
+        indexes = [
+            # ?user= bilan cursor pagination (ORDER BY id DESC) uchun
+            models.Index(fields=['user', '-id'], name='testresult_user_id_idx'),
+        ]
+
     def __str__(self):
         return f"{self.user.name} - Test on {self.test_date.strftime('%Y-%m-%d')}"
 
@@ -41,58 +78,51 @@ class OverallScore(models.Model):
     def writing_band(self):
         return self.test_result.writing_score
 
-    def calculate_band(self, correct_answers):
-        if correct_answers >= 39:
-            return 9.0
-        elif correct_answers >= 37:
-            return 8.5
-        elif correct_answers >= 35:
-            return 8.0
-        elif correct_answers >= 33:
-            return 7.5
-        elif correct_answers >= 30:
-            return 7.0
-        elif correct_answers >= 27:
-            return 6.5
-        elif correct_answers >= 23:
-            return 6.0
-        elif correct_answers >= 19:
-            return 5.5
-        elif correct_answers >= 15:
-            return 5.0
-        elif correct_answers >= 13:
-            return 4.5
-        elif correct_answers >= 10:
-            return 4.0
-        elif correct_answers >= 8:
-            return 3.5
-        elif correct_answers >= 6:
-            return 3.0
-        elif correct_answers >= 4:
-            return 2.5
-        else:
-            return 0.0
+    def calculate_band(self, correct_answers, table=bands.LISTENING):
+        return bands.raw_to_band(correct_answers, table)
 
     def round_band(self, score):
-        decimal = float(score) % 1
-        if decimal < 0.25:
-            return float(round(score))
-        elif decimal < 0.75:
-            return float(round(score * 2) / 2)
-        else:
-            return float(round(score))
-
-    def save(self, *args, **kwargs):
-        self.reading_band = self.calculate_band(self.test_result.reading_correct_answers)
-        self.listening_band = self.calculate_band(self.test_result.listening_correct_answers)
+        return bands.round_band(score)
 
-        raw_average = (
-            Decimal(self.reading_band) + Decimal(self.listening_band) +
-            Decimal(self.speaking_band) + Decimal(self.writing_band)
-        ) / Decimal(4)
+    def set_bands(self):
+        """Bandlarni hisoblaydi (saqlamasdan) — bulk_create uchun ham ishlatiladi"""
+        self.reading_band, self.listening_band, self.overall_band = bands.compute_bands([self.test_result])[0]
 
-        self.overall_band = self.round_band(raw_average)
+    def save(self, *args, **kwargs):
+        self.set_bands()
         super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.test_result.user.name} - Overall Band: {self.overall_band}"
+
+
+
+class AnswerSheet(models.Model):
+    """Nomzodning Reading/Listening javoblar varaqasi (avtomatik tekshirish uchun)"""
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("graded", "Graded"),
+    ]
+
+    user = models.ForeignKey('User', on_delete=models.CASCADE, related_name='answer_sheets')
+    reading_test = models.ForeignKey(
+        'testapp.ReadingTest', on_delete=models.SET_NULL,
+        blank=True, null=True, related_name='answer_sheets'
+    )
+    listening_test = models.ForeignKey(
+        'testapp.ListeningTest', on_delete=models.SET_NULL,
+        blank=True, null=True, related_name='answer_sheets'
+    )
+    # {"1": "A", "12": "the river", "21": ["A", "C"]}
+    reading_answers = models.JSONField(default=dict, blank=True)
+    listening_answers = models.JSONField(default=dict, blank=True)
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending", db_index=True)
+    submitted_at = models.DateTimeField(auto_now_add=True)
+    test_result = models.OneToOneField(
+        TestResult, on_delete=models.SET_NULL,
+        blank=True, null=True, related_name='answer_sheet'
+    )
+
+    def __str__(self):
+        return f"{self.user.name} - Answer sheet #{self.pk} ({self.get_status_display()})"
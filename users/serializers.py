@@ -1,14 +1,16 @@
 from rest_framework import serializers
-from .models import User, TestResult, OverallScore
 
+from backend.metrics import TimedSerializerMixin
+from .models import User, TestResult, OverallScore, AnswerSheet
 
-class UserSerializer(serializers.ModelSerializer):
+
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = User
-        fields = '__all__'
+        exclude = ['search_key', 'phone_key']  # ichki qidiruv kalitlari
 
 
-class OverallScoreSerializer(serializers.ModelSerializer):
+class OverallScoreSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = OverallScore
         # Biz test_result ni chiqarishni xohlamaymiz, faqat band scoreni beramiz
@@ -22,10 +24,36 @@ class OverallScoreSerializer(serializers.ModelSerializer):
         read_only_fields = fields  # Barchasi readonly, avtomatik hisoblanadi
 
 
-class TestResultSerializer(serializers.ModelSerializer):
+class TestResultSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     user = serializers.PrimaryKeyRelatedField(queryset=User.objects.all())
     overall_score = OverallScoreSerializer(read_only=True)
 
     class Meta:
         model = TestResult
         fields = '__all__'
+
+
+class AnswerSheetSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    user = serializers.PrimaryKeyRelatedField(queryset=User.objects.all())
+
+    class Meta:
+        model = AnswerSheet
+        fields = '__all__'
+        read_only_fields = ['status', 'submitted_at', 'test_result']
+
+    def _validate_answers(self, value):
+        """Javoblar {"savol raqami": "javob" yoki ["A", "C"]} ko'rinishida bo'lishi kerak"""
+        if not isinstance(value, dict):
+            raise serializers.ValidationError("Answers must be an object keyed by question number.")
+        for number, answer in value.items():
+            if not str(number).isdigit():
+                raise serializers.ValidationError(f"Invalid question number: {number}")
+            if not isinstance(answer, (str, int, float, list)):
+                raise serializers.ValidationError(f"Invalid answer for question {number}")
+        return value
+
+    def validate_reading_answers(self, value):
+        return self._validate_answers(value)
+
+    def validate_listening_answers(self, value):
+        return self._validate_answers(value)
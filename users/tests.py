@@ -1,3 +1,264 @@
-from django.test import TestCase
+import io
+from decimal import Decimal
 
-# Create your tests here.
+from django.contrib.auth.models import User as AuthUser
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from . import charts
+from .bands import ACADEMIC_READING, GENERAL_READING, LISTENING, overall_band, raw_to_band
+from .grading import grade_pending, grade_sheets
+from .importers import ImportFileError, RowError, import_results, parse_record
+from .lookup import AmbiguousCandidate, find_candidate, phone_key, search_key
+from .models import AnswerSheet, OverallScore, TestResult, User
+
+
+HEADER = "name,last_name,middle_name,phone,reading,listening,speaking,writing,test_date\n"
+
+
+def csv_file(*rows, encoding="utf-8"):
+    return io.BytesIO((HEADER + "".join(row + "\n" for row in rows)).encode(encoding))
+
+
+class BandTests(SimpleTestCase):
+    def assertBands(self, table, cases):
+        for raw, band in cases.items():
+            with self.subTest(table=table, raw=raw):
+                self.assertEqual(raw_to_band(raw, table), Decimal(band))
+
+    def test_listening_and_academic(self):
+        cases = {0: "0.0", 3: "0.0", 4: "2.5", 15: "5.0", 18: "5.0", 19: "5.5", 23: "6.0", 30: "7.0", 38: "8.5", 39: "9.0",
+                 40: "9.0"}
+        self.assertBands(LISTENING, cases)
+        self.assertBands(ACADEMIC_READING, cases)
+
+    def test_general_reading(self):
+        self.assertBands(GENERAL_READING, {5: "0.0", 6: "2.5", 30: "6.0", 34: "7.0", 39: "8.5", 40: "9.0"})
+
+    def test_out_of_range_raw_scores(self):
+        self.assertEqual(raw_to_band(-3), Decimal("0.0"))
+        self.assertEqual(raw_to_band(55), Decimal("9.0"))
+
+    def test_overall_rounding(self):
+        cases = [
+            (("6.5", "6.5", "5.0", "7.0"), "6.5"),  # 6.25 -> 6.5
+            (("4.0", "3.5", "4.0", "4.0"), "4.0"),  # 3.875 -> 4.0
+            (("6.5", "7.0", "6.5", "6.5"), "6.5"),  # 6.625 -> 6.5
+            (("6.5", "6.5", "7.0", "7.0"), "7.0"),  # 6.75 -> 7.0
+        ]
+        for scores, band in cases:
+            with self.subTest(scores=scores):
+                self.assertEqual(overall_band(*scores), Decimal(band))
+
+
+class ImporterTests(TestCase):
+    def record(self, **values):
+        record = {"name": "Aziz", "last_name": "Karimov", "phone": "+998901234567"}
+        record.update(values)
+        return record
+
+    def assertRowError(self, **values):
+        with self.assertRaises(RowError):
+            parse_record(self.record(**values))
+
+    def test_non_finite_numbers_are_row_errors(self):
+        for value in ("nan", "NaN", "inf", "-Infinity", "1e999999"):
+            with self.subTest(value=value):
+                self.assertRowError(reading_correct_answers=value)
+                self.assertRowError(speaking_score=value)
+
+    def test_impossible_dates_are_row_errors(self):
+        for value in ("2025-02-30", "2025-13-01", "2025-02-30 10:00", "30.02.2025"):
+            with self.subTest(value=value):
+                self.assertRowError(test_date=value)
+
+    def test_valid_row(self):
+        user, result, test_date = parse_record(self.record(
+            reading_correct_answers="30", speaking_score="6,5", test_date="2025-03-01",
+        ))
+        self.assertEqual(result["reading_correct_answers"], 30)
+        self.assertEqual(str(result["speaking_score"]), "6.5")
+        self.assertEqual(test_date.date().isoformat(), "2025-03-01")
+
+    def test_bad_cells_do_not_abort_file(self):
+        report = import_results(csv_file(
+            "Aziz,Karimov,,901,30,31,6.5,6,2025-03-01",
+            "Bekzod,Aliyev,,902,nan,31,6.5,6,2025-03-01",
+            "Dilnoza,Saidov,,903,30,inf,6.5,6,2025-03-01",
+            "Jasur,Nazarov,,904,30,31,nan,6,2025-03-01",
+            "Laziz,Yusupov,,905,30,31,6.5,6,2025-02-30",
+            "Madina,Qodirov,,906,20,25,5,5.5,",
+        ), "results.csv")
+        self.assertEqual(report.rows, 6)
+        self.assertEqual(report.created, 2)
+        self.assertEqual([number for number, _ in report.errors], [3, 4, 5, 6])
+        self.assertEqual(TestResult.objects.count(), 2)
+
+
+    def test_windows_1251_csv(self):
+        report = import_results(csv_file(
+            "Азиз,Каримов,,901,30,31,6.5,6,2025-03-01",
+            "Бекзод,Алиев,,902,20,25,5,5.5,2025-03-01",
+            encoding="cp1251",
+        ), "results.csv")
+        self.assertEqual((report.created, report.errors), (2, []))
+        self.assertTrue(User.objects.filter(name="Азиз", last_name="Каримов").exists())
+
+    def test_unreadable_csv_fails_before_writing(self):
+        good = "Aziz,Karimov,,901,30,31,6.5,6,2025-03-01"
+        cases = {
+            "encoding": csv_file(good, good).getvalue() + b"Bad,\x98\x98,,903,30,31,6,6,\n",
+            "csv": csv_file(good, good).getvalue() + b'Bad,"' + b"x" * 200000 + b'",,903,30,31,6,6,\n',
+        }
+        for name, data in cases.items():
+            with self.subTest(name):
+                with self.assertRaises(ImportFileError):
+                    import_results(io.BytesIO(data), "results.csv", batch_size=1)
+                self.assertEqual(TestResult.objects.count(), 0)
+
+    def test_malformed_xlsx(self):
+        with self.assertRaises(ImportFileError):
+            import_results(io.BytesIO(b"not a zip file"), "results.xlsx")
+
+
+class LookupTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(name="Go‘zal", last_name="  O'ktamova ", phone="+998 (90) 123-45-67")
+        cls.result = TestResult.objects.create(user=cls.user, reading_correct_answers=30)
+
+    def test_keys(self):
+        self.assertEqual(search_key("GOʻZAL", "o`ktamova", None), search_key("go'zal", "O’KTAMOVA  ", ""))
+        self.assertEqual(search_key("Ali  Vali", "X"), "x|ali vali|")
+        self.assertEqual(phone_key("+998 90 123 45 67"), "901234567")
+        self.assertEqual(phone_key("90-123-45-67"), "901234567")
+        self.assertEqual(phone_key(None), "")
+
+    def test_keys_follow_updates(self):
+        self.user.last_name = "Karimova"
+        self.user.save(update_fields=["last_name"])
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.search_key, search_key("Go‘zal", "Karimova"))
+
+    def test_spelling_variants_find_candidate(self):
+        for name, last_name, phone in (
+            ("go'zal", "o'ktamova", None),
+            ("GOʻZAL", "O`ktamova", "901234567"),
+            (" Go’zal ", "o‘ktamova", "+998901234567"),
+        ):
+            with self.subTest(name=name, last_name=last_name, phone=phone):
+                with self.assertNumQueries(1):
+                    user, results = find_candidate(name, last_name, phone=phone)
+                self.assertEqual(user, self.user)
+                self.assertEqual(results, [self.result])
+
+    def test_wrong_phone_or_name(self):
+        self.assertEqual(find_candidate("Go'zal", "O'ktamova", phone="901111111"), (None, []))
+        self.assertEqual(find_candidate("Gozal", "Oktamova"), (None, []))
+
+    def test_namesakes_need_phone(self):
+        namesake = User.objects.create(name="Go'zal", last_name="O'ktamova", phone="933334455")
+        result = TestResult.objects.create(user=namesake)
+        with self.assertRaises(AmbiguousCandidate):
+            find_candidate("Go'zal", "O'ktamova")
+        self.assertEqual(find_candidate("Go'zal", "O'ktamova", phone="93 333 44 55"), (namesake, [result]))
+
+
+class GradingTests(TestCase):
+    def setUp(self):
+        user = User.objects.create(name="Aziz", last_name="Karimov", phone="+998901234567")
+        self.sheets = [AnswerSheet.objects.create(user=user) for _ in range(3)]
+
+    def test_overlapping_runs_grade_each_sheet_once(self):
+        stale = list(AnswerSheet.objects.order_by("pk"))  # ikkinchi jarayon yuklagan nusxa
+        self.assertEqual(grade_pending(), 3)
+        self.assertEqual(grade_sheets(stale), 0)
+        self.assertEqual(TestResult.objects.count(), 3)
+        self.assertEqual(OverallScore.objects.count(), 3)
+        self.assertFalse(AnswerSheet.objects.exclude(status="graded").exists())
+
+    def test_partially_claimed_batch(self):
+        stale = list(AnswerSheet.objects.order_by("pk"))
+        self.assertEqual(grade_sheets(stale[:1]), 1)
+        self.assertEqual(grade_sheets(stale), 2)
+        self.assertEqual(
+            sorted(AnswerSheet.objects.values_list("test_result", flat=True)),
+            sorted(TestResult.objects.values_list("pk", flat=True)),
+        )
+
+
+class ListFilterTests(TestCase):
+    def test_invalid_dates_are_validation_errors(self):
+        url = reverse("test-result-list")
+        for value in ("2025-02-30", "2025-13-01", "01.03.2025"):
+            with self.subTest(value=value):
+                response = self.client.get(url, {"date_from": value}, secure=True)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("date_from", response.json())
+        self.assertEqual(self.client.get(url, {"date_to": "2025-02-28"}, secure=True).status_code, 200)
+
+
+class AnswerSheetPermissionTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(name="Aziz", last_name="Karimov", phone="+998901234567")
+        self.sheet = AnswerSheet.objects.create(user=self.user)
+
+    def test_anonymous_cannot_list_or_grade(self):
+        for method, url in (
+            ("get", reverse("answer-sheet-list")),
+            ("get", reverse("answer-sheet-detail", args=[self.sheet.pk])),
+            ("post", reverse("answer-sheet-grade")),
+        ):
+            with self.subTest(method=method, url=url):
+                self.assertEqual(getattr(self.client, method)(url, secure=True).status_code, 403)
+        self.sheet.refresh_from_db()
+        self.assertEqual(self.sheet.status, "pending")
+
+    def test_candidates_can_submit(self):
+        response = self.client.post(reverse("answer-sheet-list"), {
+            "user": self.user.pk, "reading_answers": {"1": "A"}, "listening_answers": {},
+        }, content_type="application/json", secure=True)
+        self.assertEqual(response.status_code, 201)
+
+    def test_admin_can_grade(self):
+        self.client.force_login(AuthUser.objects.create_user("staff", is_staff=True))
+        response = self.client.post(reverse("answer-sheet-grade"), secure=True)
+        self.assertEqual(response.json(), {"graded": 1})
+
+
+class BandChartTests(TestCase):
+    def setUp(self):
+        self.client.force_login(AuthUser.objects.create_superuser("admin", password="x"))
+
+    def chart_url(self, *bands, fmt="svg"):
+        key = charts.bands_key(*bands)
+        return reverse("admin:users_overallscore_chart", kwargs={"bands": key, "fmt": fmt})
+
+    def test_key_rounds_to_half_bands(self):
+        self.assertEqual(charts.bands_key(Decimal("6.5"), 7, Decimal("6.3"), Decimal("6.2")), "6.5-7.0-6.5-6.0")
+        self.assertEqual(charts.bands_key(None, Decimal("8.75"), 0, 9), "0.0-9.0-0.0-9.0")
+
+    def test_chart_view_and_cache(self):
+        charts.render_svg.cache_clear()
+        url = self.chart_url(Decimal("6.5"), 7, Decimal("6.3"), Decimal("5.5"))
+        for _ in range(2):
+            response = self.client.get(url, secure=True)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response["Content-Type"], "image/svg+xml")
+            self.assertIn("immutable", response["Cache-Control"])
+        info = charts.render_svg.cache_info()
+        self.assertEqual((info.misses, info.hits), (1, 1))
+
+    def test_invalid_keys(self):
+        for bands in ("6.3-7.0-6.0-5.5", "6.5-7.0-6.0", "10.0-7.0-6.0-5.5"):
+            with self.subTest(bands=bands):
+                url = reverse("admin:users_overallscore_chart", kwargs={"bands": bands, "fmt": "svg"})
+                self.assertEqual(self.client.get(url, secure=True).status_code, 404)
+
+
+class WriteQueueStatsTests(TestCase):
+    def test_admin_only(self):
+        url = reverse("write-queue-stats")
+        self.assertIn(self.client.get(url, secure=True).status_code, (401, 403))
+        self.client.force_login(AuthUser.objects.create_user("staff", is_staff=True))
+        self.assertEqual(self.client.get(url, secure=True).status_code, 200)
@@ -1,13 +1,15 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import UserViewSet, TestResultViewSet, OverallScoreViewSet
+from .views import UserViewSet, TestResultViewSet, OverallScoreViewSet, AnswerSheetViewSet, write_queue_stats
 
 router = DefaultRouter()
 router.register(r'users', UserViewSet, basename='user')
 router.register(r'test-results', TestResultViewSet, basename='test-result')
 router.register(r'overall-scores', OverallScoreViewSet, basename='overallscore')
+router.register(r'answer-sheets', AnswerSheetViewSet, basename='answer-sheet')
 
 
 urlpatterns = [
+    path('write-queue/', write_queue_stats, name='write-queue-stats'),
     path('', include(router.urls)),
 ]
@@ -1,9 +1,28 @@
-from django.shortcuts import get_object_or_404
-from rest_framework import viewsets, status
-from rest_framework.decorators import action
+from rest_framework import mixins, viewsets, status
+from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.permissions import AllowAny, IsAdminUser
 from rest_framework.response import Response
-from .models import User, TestResult, OverallScore
-from .serializers import UserSerializer, TestResultSerializer, OverallScoreSerializer
+from .models import User, TestResult, OverallScore, AnswerSheet
+from .serializers import UserSerializer, TestResultSerializer, OverallScoreSerializer, AnswerSheetSerializer
+from .grading import grade_pending
+from .lookup import AmbiguousCandidate, find_candidate
+from .write_queue import result_writes
+from backend.listing import IdCursorPagination, ListFilterMixin
+
+
+def find_user_or_error(request, name, last_name, middle_name):
+    """
+    (user, natijalar) — ixtiyoriy "phone" bir xil ismli nomzodlarni ajratadi.
+    Topilmasa 404, bir nechta nomzod bo'lsa 400.
+    """
+    try:
+        user, results = find_candidate(name, last_name, middle_name, request.data.get('phone'))
+    except AmbiguousCandidate:
+        raise ValidationError({'phone': 'Bir nechta nomzod topildi, telefon raqamini yuboring.'})
+    if user is None:
+        raise NotFound("Foydalanuvchi topilmadi.")
+    return user, results
 
 
 class UserViewSet(viewsets.ModelViewSet):
@@ -12,21 +31,36 @@ class UserViewSet(viewsets.ModelViewSet):
     """
     queryset = User.objects.all()
     serializer_class = UserSerializer
+    pagination_class = IdCursorPagination
 
 
-class TestResultViewSet(viewsets.ModelViewSet):
+class TestResultViewSet(ListFilterMixin, viewsets.ModelViewSet):
     """
     Test natijalarini yaratish, ko'rish, tahrirlash, o'chirish uchun.
+    Ro'yxat: ?user=, ?date_from=, ?date_to= (test_date bo'yicha), cursor pagination.
     """
-    queryset = TestResult.objects.all()
+    queryset = TestResult.objects.select_related('overall_score')
     serializer_class = TestResultSerializer
+    pagination_class = IdCursorPagination
+    date_filter_field = 'test_date'
+    user_filter_field = 'user'
+
+    # Yozuvlar (va post_save dagi OverallScore) navbat orqali paket tranzaksiyada
+    def perform_create(self, serializer):
+        result_writes.run(serializer.save)
+
+    def perform_update(self, serializer):
+        result_writes.run(serializer.save)
+
+    def perform_destroy(self, instance):
+        result_writes.run(instance.delete)
 
     @action(detail=False, methods=['post'], url_path='by-user-info')
     def get_by_user_info(self, request):
         """
         Ism, familiya va otasining ismi orqali foydalanuvchining
         test natijalari va overall scoreni olish.
-        POST body parametrlari: name, last_name, middle_name
+        POST body parametrlari: name, last_name, middle_name (ixtiyoriy: phone)
         """
         name = request.data.get('name')
         last_name = request.data.get('last_name')
@@ -38,17 +72,12 @@ class TestResultViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Foydalanuvchini topamiz
-        user = get_object_or_404(
-            User, name=name, last_name=last_name, middle_name=middle_name
-        )
-
-        # Test natijalari
-        results = TestResult.objects.filter(user=user)
+        # Foydalanuvchi, natijalar va overall score — bitta indekslangan so'rov
+        user, results = find_user_or_error(request, name, last_name, middle_name)
         results_serializer = self.get_serializer(results, many=True)
 
-        # Overall score
-        overall = OverallScore.objects.filter(user=user).first()
+        # Overall score (eng oxirgi natija bo'yicha)
+        overall = getattr(results[0], 'overall_score', None) if results else None
         overall_serializer = OverallScoreSerializer(overall) if overall else None
 
         return Response({
@@ -63,19 +92,24 @@ class TestResultViewSet(viewsets.ModelViewSet):
         })
 
 
-class OverallScoreViewSet(viewsets.ReadOnlyModelViewSet):
+class OverallScoreViewSet(ListFilterMixin, viewsets.ReadOnlyModelViewSet):
     """
     Overall score faqat ko‘rish uchun (read-only).
     Foydalanuvchi fullname yuborganida uning barcha band scorelari qaytadi.
+    Ro'yxat: ?user=, ?date_from=, ?date_to= (test sanasi bo'yicha), cursor pagination.
     """
-    queryset = OverallScore.objects.all()
+    # speaking/writing band test_result dan olinadi
+    queryset = OverallScore.objects.select_related('test_result')
     serializer_class = OverallScoreSerializer
+    pagination_class = IdCursorPagination
+    date_filter_field = 'test_result__test_date'
+    user_filter_field = 'test_result__user'
 
     @action(detail=False, methods=['post'], url_path='by-user-info')
     def get_by_user_info(self, request):
         """
         Foydalanuvchining fullname orqali uning band scorelarini olish.
-        POST body parametrlari: name, last_name, middle_name
+        POST body parametrlari: name, last_name, middle_name (ixtiyoriy: phone)
         """
         name = request.data.get("name")
         last_name = request.data.get("last_name")
@@ -87,13 +121,11 @@ class OverallScoreViewSet(viewsets.ReadOnlyModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Userni topamiz
-        user = get_object_or_404(
-            User, name=name, last_name=last_name, middle_name=middle_name
-        )
-
-        # OverallScore ni olamiz
-        overall = get_object_or_404(OverallScore, user=user)
+        # Userni va uning eng oxirgi OverallScore ini bitta so'rovda olamiz
+        user, results = find_user_or_error(request, name, last_name, middle_name)
+        overall = getattr(results[0], 'overall_score', None) if results else None
+        if overall is None:
+            raise NotFound("Overall score topilmadi.")
         serializer = self.get_serializer(overall)
 
         return Response({
@@ -111,3 +143,35 @@ class OverallScoreViewSet(viewsets.ReadOnlyModelViewSet):
             },
             "overall_band": serializer.data.get("overall_band"),
         })
+
+
+class AnswerSheetViewSet(mixins.CreateModelMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Nomzodning to'liq javob varaqasini qabul qilish va ko'rish.
+    Varaqalar 'grade' action orqali paket bo'lib baholanadi.
+    """
+    queryset = AnswerSheet.objects.all()
+    serializer_class = AnswerSheetSerializer
+    pagination_class = IdCursorPagination
+
+    def get_permissions(self):
+        # Nomzod faqat varaqa yuboradi; ro'yxat, ko'rish va baholash — admin
+        if self.action == 'create':
+            return [AllowAny()]
+        return [IsAdminUser()]
+
+    def perform_create(self, serializer):
+        result_writes.run(serializer.save)
+
+    @action(detail=False, methods=['post'], url_path='grade')
+    def grade(self, request):
+        """Barcha baholanmagan varaqalarni tekshirib, TestResult larni yaratish"""
+        graded = grade_pending()
+        return Response({"graded": graded})
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def write_queue_stats(request):
+    """Natija yozish navbati holati: navbat uzunligi va flush vaqtlari (ms)"""
+    return Response(result_writes.stats())
@@ -0,0 +1,133 @@
+"""
+TestResult / OverallScore yozuvlari uchun ketma-ket yozish navbati.
+
+SQLite bir vaqtda faqat bitta yozuvchiga ruxsat beradi. Imtihondan keyin
+ko'p so'rov bir vaqtda natija yozganda "database is locked" xatolari
+chiqadi. Bu navbat har bir process ichidagi yozuvlarni bitta thread orqali
+o'tkazadi va ularni paket (batch) tranzaksiyalarga birlashtiradi. Chaqiruvchi
+o'z yozuvi commit bo'lguncha kutadi, shuning uchun API javoblari o'zgarmaydi.
+"""
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from django.db import close_old_connections, connection, transaction
+
+
+logger = logging.getLogger(__name__)
+
+
+class WriteQueue:
+    def __init__(self, max_batch=100, max_wait=0.02, maxsize=10000):
+        self.max_batch = max_batch
+        self.max_wait = max_wait  # paketni to'ldirish uchun kutish (soniya)
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "flushes": 0,
+            "jobs": 0,
+            "failed_jobs": 0,
+            "last_batch_size": 0,
+            "last_flush_ms": 0.0,
+            "max_flush_ms": 0.0,
+            "total_flush_ms": 0.0,
+        }
+
+    def submit(self, fn, *args, **kwargs):
+        """Yozuvni navbatga qo'yadi va Future qaytaradi"""
+        self._ensure_started()
+        future = Future()
+        self._queue.put((future, fn, args, kwargs))
+        return future
+
+    def run(self, fn, *args, **kwargs):
+        """Yozuv commit bo'lguncha kutadi va natijasini qaytaradi (xato bo'lsa — raise)"""
+        if threading.current_thread() is self._thread or connection.in_atomic_block:
+            # Navbat ichidan yoki ochiq tranzaksiya ichidan chaqirilsa — to'g'ridan-to'g'ri
+            # (aks holda boshqa connection bu tranzaksiyaning lock ini kutib qoladi)
+            return fn(*args, **kwargs)
+        return self.submit(fn, *args, **kwargs).result()
+
+    def stats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["total_flush_ms"] = round(stats["total_flush_ms"], 3)
+        stats["depth"] = self._queue.qsize()
+        stats["avg_flush_ms"] = (
+            round(stats["total_flush_ms"] / stats["flushes"], 3) if stats["flushes"] else 0.0
+        )
+        return stats
+
+    def _ensure_started(self):
+        # Thread har bir (gunicorn fork qilgan) process da birinchi yozuvda ishga tushadi
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._worker, name="result-write-queue", daemon=True)
+                self._thread.start()
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def _worker(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                self._flush(batch)
+            finally:
+                close_old_connections()
+
+    def _flush(self, batch):
+        started = time.perf_counter()
+        outcomes = []
+        try:
+            with transaction.atomic():
+                for future, fn, args, kwargs in batch:
+                    # Har bir yozuv o'z savepoint ida: bittasi xato bo'lsa, qolganlari yoziladi
+                    try:
+                        with transaction.atomic():
+                            outcomes.append((future, fn(*args, **kwargs), None))
+                    except Exception as exc:
+                        outcomes.append((future, None, exc))
+        except Exception as exc:
+            # Commit ning o'zi muvaffaqiyatsiz bo'ldi — hech narsa yozilmadi
+            logger.exception("Write queue flush failed (%s jobs)", len(batch))
+            outcomes = [(future, None, exc) for future, _, _, _ in batch]
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        failed = sum(1 for _, _, exc in outcomes if exc is not None)
+        with self._stats_lock:
+            self._stats["flushes"] += 1
+            self._stats["jobs"] += len(batch)
+            self._stats["failed_jobs"] += failed
+            self._stats["last_batch_size"] = len(batch)
+            self._stats["last_flush_ms"] = round(elapsed_ms, 3)
+            self._stats["max_flush_ms"] = round(max(self._stats["max_flush_ms"], elapsed_ms), 3)
+            self._stats["total_flush_ms"] += elapsed_ms
+        if elapsed_ms > 1000:
+            logger.warning("Slow write queue flush: %.0f ms for %s jobs", elapsed_ms, len(batch))
+
+        for future, result, exc in outcomes:
+            if exc is not None:
+                future.set_exception(exc)
+            else:
+                future.set_result(result)
+
+
+# Natija yozuvlari uchun umumiy navbat
+result_writes = WriteQueue()